@@ -1,12 +1,12 @@
 from textual.app import ComposeResult, App
 from textual.widgets import Button, Label, Static, Link
-from textual.containers import Vertical
-from textual_pyfiglet import FigletWidget
-import requests
-import time
-import threading
+from textual.containers import Horizontal, Vertical
+from textual.worker import get_current_worker
 import os
 
+from utils import githubAuth
+from utils.cancellation import Cancelled
+
 # Never hard-code secrets; use env vars if needed
 CLIENT_ID = os.environ.get("CLIENT_ID", "Ov23livfQfAoGENnwFcK")
 
@@ -16,20 +16,56 @@ class AuthFlow(App):
     #status { height: auto; }
     #verify_link { padding-top: 1; }
     #code_box { height: 8; }
+    #cancel_auth { display: none; }
     """
 
     def compose(self) -> ComposeResult:
         yield Label("Authenticate with GitHub to continue.")
         with Vertical():
-            yield Button("Start Authentication", id="start_auth", variant="primary")
+            with Horizontal():
+                yield Button("Start Authentication", id="start_auth", variant="primary")
+                yield Button("Cancel", id="cancel_auth", variant="warning")
             yield Static("", id="status")
-            yield Link("Open verification page", url="https://github.com/login/device", id="verify_link")
+            yield Link(
+                "Open verification page",
+                url=f"{githubAuth.GITHUB_URL}/login/device",
+                id="verify_link",
+            )
             yield Static("", id="code_box")
 
+    def on_mount(self) -> None:
+        # A cached token skips the device flow entirely
+        self.run_worker(self._restore_session, thread=True, group="auth", exit_on_error=False)
+
+    def _restore_session(self) -> None:
+        try:
+            user = githubAuth.cached_login()
+        except Exception:
+            return  # Offline or GitHub unavailable; the device flow is still there
+        if user:
+            self.call_from_thread(self._set_status, self._logged_in(user))
+
+    @staticmethod
+    def _logged_in(user) -> str:
+        return f"Logged in as {user.get('login')} (ID: {user.get('id')})"
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "start_auth":
-            self.query_one("#start_auth", Button).disabled = True
-            threading.Thread(target=self._run_device_flow, daemon=True).start()
+            self._set_busy(True)
+            self.run_worker(
+                self._run_device_flow,
+                thread=True,
+                group="auth",
+                exclusive=True,
+                exit_on_error=False,
+            )
+        elif event.button.id == "cancel_auth":
+            # Wakes the poll wait in the worker thread; the finally block frees the UI
+            self.workers.cancel_group(self, "auth")
+
+    def _set_busy(self, busy: bool) -> None:
+        self.query_one("#start_auth", Button).disabled = busy
+        self.query_one("#cancel_auth", Button).display = busy
 
     # UI helpers
     def _set_status(self, text: str) -> None:
@@ -57,6 +93,9 @@ class AuthFlow(App):
                 child.remove()
         except Exception:
             pass
+        # Deferred: only needed once a code is shown
+        from textual_pyfiglet import FigletWidget
+
         # Create figlet and set font without chaining (set_font returns None)
         try:
             fig = FigletWidget(user_code, font="smbraille", justify="center", id="figlet")
@@ -79,14 +118,7 @@ class AuthFlow(App):
     # Worker
     def _run_device_flow(self) -> None:
         try:
-            resp = requests.post(
-                "https://github.com/login/device/code",
-                data={"client_id": CLIENT_ID, "scope": "read:user"},
-                headers={"Accept": "application/json"},
-                timeout=10,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = githubAuth.request_device_code(CLIENT_ID)
             device_code = data["device_code"]
             user_code = data["user_code"]
             verification_uri = data["verification_uri"]
@@ -94,52 +126,21 @@ class AuthFlow(App):
 
             self.call_from_thread(self._show_code, verification_uri, user_code)
 
-            access_token = None
-            while True:
-                auth_resp = requests.post(
-                    "https://github.com/login/oauth/access_token",
-                    data={
-                        "client_id": CLIENT_ID,
-                        "device_code": device_code,
-                        "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
-                    },
-                    headers={"Accept": "application/json"},
-                    timeout=10,
-                )
-                auth_resp.raise_for_status()
-                token_data = auth_resp.json()
-
-                if "access_token" in token_data:
-                    access_token = token_data["access_token"]
-                    break
-                err = token_data.get("error")
-                if err == "authorization_pending":
-                    time.sleep(interval)
-                    continue
-                if err == "slow_down":
-                    interval += 5
-                    time.sleep(interval)
-                    continue
-                raise RuntimeError(f"Device flow error: {token_data}")
-
-            user_resp = requests.get(
-                "https://api.github.com/user",
-                headers={"Authorization": f"Bearer {access_token}"},
-                timeout=10,
-            )
-            user_resp.raise_for_status()
-            user = user_resp.json()
-            self.call_from_thread(
-                self._set_status,
-                f"Logged in as {user.get('login')} (ID: {user.get('id')})",
+            cancel = get_current_worker().cancelled_event
+            access_token = githubAuth.poll_access_token(
+                CLIENT_ID, device_code, interval, cancel=cancel
             )
+            user, etag = githubAuth.fetch_user(access_token)
+            # Kept (0600) so the next launch can skip the device flow
+            githubAuth.save_token(access_token, user, etag)
+            self.call_from_thread(self._set_status, self._logged_in(user))
+        except Cancelled:
+            self.call_from_thread(self._set_status, "Authentication cancelled.")
         except Exception as e:
             self.call_from_thread(self._set_status, f"Auth failed: {e}")
         finally:
             try:
-                self.call_from_thread(
-                    setattr, self.query_one("#start_auth", Button), "disabled", False
-                )
+                self.call_from_thread(self._set_busy, False)
             except Exception:
                 pass
 
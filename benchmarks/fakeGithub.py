@@ -0,0 +1,85 @@
+"""Local stand-in for the GitHub endpoints used by the device flow.
+
+``serve()`` starts a threaded HTTP server on 127.0.0.1 and returns it; point
+TERMINALIK_GITHUB_URL and TERMINALIK_GITHUB_API_URL at ``server.url`` before
+importing ``utils.githubAuth``. The device code is approved after
+``pending_polls`` polls, and ``server.requests`` / ``server.connections`` count
+what the client did.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+TOKEN = "gho_fake_token"
+USER = {"login": "terminalik", "id": 1}
+USER_ETAG = '"user-v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _send(self, status, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self):
+        with self.server.lock:
+            self.server.requests += 1
+
+    def do_POST(self):
+        self._count()
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        if self.path == "/login/device/code":
+            self._send(200, {"device_code": "dev-1", "user_code": "ABCD-1234",
+                             "verification_uri": f"{self.server.url}/login/device",
+                             "interval": self.server.interval})
+        elif self.path == "/login/oauth/access_token":
+            if form.get("device_code") != ["dev-1"]:
+                self._send(200, {"error": "bad_verification_code"})
+                return
+            with self.server.lock:
+                self.server.polls += 1
+                approved = self.server.polls > self.server.pending_polls
+            body = {"access_token": TOKEN} if approved else {"error": "authorization_pending"}
+            self._send(200, body)
+        else:
+            self._send(404, {"message": "Not Found"})
+
+    def do_GET(self):
+        self._count()
+        if self.path != "/user":
+            self._send(404, {"message": "Not Found"})
+        elif self.headers.get("Authorization") != f"Bearer {TOKEN}":
+            self._send(401, {"message": "Bad credentials"})
+        elif self.headers.get("If-None-Match") == USER_ETAG:
+            self._send(304, headers={"ETag": USER_ETAG})
+        else:
+            self._send(200, USER, {"ETag": USER_ETAG})
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(pending_polls=2, interval=0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.pending_polls = pending_polls
+    server.interval = interval
+    server.polls = server.requests = server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
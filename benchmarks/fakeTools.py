@@ -0,0 +1,226 @@
+"""Offline stand-ins for pip, uv, npm, node, django-admin and a venv-creating python.
+
+``install(bin_dir)`` writes small wrapper scripts into ``bin_dir`` that dispatch
+back to this file. Put that directory first on PATH and point TERMINALIK_PYTHON
+at its ``python`` to run the generators without network access.
+
+Output volume and pacing are controlled by FAKE_TOOLS_SCALE (lines multiplier)
+and FAKE_TOOLS_DELAY (seconds per line).
+"""
+import json
+import os
+import stat
+import sys
+import time
+
+TOOLS = ("python", "pip", "uv", "npm", "node", "django-admin")
+
+SETTINGS_PY = '''"""Django settings for core project."""
+
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SECRET_KEY = "django-insecure-benchmark"
+
+DEBUG = True
+
+ALLOWED_HOSTS = []
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "core.urls"
+
+STATIC_URL = "static/"
+'''
+
+URLS_PY = '''from django.contrib import admin
+from django.urls import path
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+]
+'''
+
+INDEX_HTML = '''<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <title>Vite + Vue + TS</title>
+  </head>
+  <body>
+    <div id="app"></div>
+    <script type="module" src="/src/main.ts"></script>
+  </body>
+</html>
+'''
+
+APP_VUE = '''<script setup lang="ts">
+import HelloWorld from './components/HelloWorld.vue'
+</script>
+
+<template>
+  <HelloWorld msg="Vite + Vue" />
+</template>
+'''
+
+
+def install(bin_dir):
+    """Write executable wrappers for every fake tool into ``bin_dir``."""
+    os.makedirs(bin_dir, exist_ok=True)
+    here = os.path.abspath(__file__)
+    for tool in TOOLS:
+        path = os.path.join(bin_dir, tool)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{here}" {tool} "$@"\n')
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
+
+
+def _emit(lines):
+    delay = float(os.environ.get("FAKE_TOOLS_DELAY", "0.0005"))
+    for line in lines:
+        print(line, flush=True)
+        if delay:
+            time.sleep(delay)
+
+
+def _scale(n):
+    return max(1, int(n * float(os.environ.get("FAKE_TOOLS_SCALE", "1"))))
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _make_venv(venv):
+    venv = os.path.abspath(venv)
+    bin_dir = install(os.path.join(venv, "bin"))
+    _write(os.path.join(venv, "pyvenv.cfg"), f"home = {bin_dir}\ncommand = fake -m venv {venv}\n")
+
+
+def fake_python(args):
+    if args[:2] == ["-m", "venv"]:
+        _make_venv(args[2])
+        return 0
+    if args[:1] == ["-c"]:
+        # The interpreter probe in venvCache
+        print(json.dumps(["3.12.0 (fake)", "CPython", "x86_64"]))
+        return 0
+    if args[:2] == ["manage.py", "migrate"]:
+        _emit([
+            "Operations to perform:",
+            "  Apply all migrations: admin, auth, contenttypes, sessions",
+        ])
+        _emit(f"  Applying auth.{i:04d}_migration... OK" for i in range(_scale(18)))
+        return 0
+    return 0
+
+
+def fake_pip(args):
+    if args and args[0] == "install":
+        packages = [a for a in args[1:] if not a.startswith("-")] or ["requirements"]
+        for pkg in packages:
+            _emit([f"Collecting {pkg}", f"  Downloading {pkg}-1.0.0-py3-none-any.whl (1.2 MB)"])
+            _emit(f"  Progress {pkg} {i}%" for i in range(0, 100, max(1, 100 // _scale(40))))
+        _emit(["Installing collected packages: " + ", ".join(packages),
+               "Successfully installed " + " ".join(f"{p}-1.0.0" for p in packages)])
+    return 0
+
+
+def fake_uv(args):
+    if args[:1] == ["venv"]:
+        _make_venv(args[-1])
+    elif args[:2] == ["pip", "install"]:
+        # uv resolves and links in one pass and prints a handful of lines
+        packages = [a for a in args[2:] if not a.startswith("-") and os.path.sep not in a]
+        _emit([
+            f"Resolved {len(packages)} packages in 12ms",
+            f"Installed {len(packages)} packages in 8ms",
+        ])
+        _emit(f" + {pkg}==1.0.0" for pkg in packages)
+    return 0
+
+
+def fake_django_admin(args):
+    if args[:1] == ["startproject"]:
+        name, target = args[1], args[2] if len(args) > 2 else args[1]
+        _write(os.path.join(target, "manage.py"), "#!/usr/bin/env python\n")
+        _write(os.path.join(target, name, "__init__.py"), "")
+        _write(os.path.join(target, name, "settings.py"), SETTINGS_PY)
+        _write(os.path.join(target, name, "urls.py"), URLS_PY)
+    elif args[:1] == ["startapp"]:
+        name = args[1]
+        for module in ("__init__", "apps", "models", "tests", "views"):
+            _write(os.path.join(name, f"{module}.py"), "")
+        _write(os.path.join(name, "admin.py"), "from django.contrib import admin\n")
+    return 0
+
+
+def fake_npm(args):
+    if args[:1] == ["create"]:
+        positional = [a for a in args[1:] if not a.startswith("-")]
+        target = positional[1] if len(positional) > 1 else "vite-project"
+        _write(os.path.join(target, "index.html"), INDEX_HTML)
+        _write(os.path.join(target, "src", "App.vue"), APP_VUE)
+        _write(os.path.join(target, "src", "main.ts"), "import { createApp } from 'vue'\n")
+        pkg = {"name": target, "private": True, "version": "0.0.0", "type": "module",
+               "dependencies": {"vue": "^3.5.0"}, "devDependencies": {"vite": "^7.0.0"}}
+        _write(os.path.join(target, "package.json"), json.dumps(pkg, indent=2))
+        lock = {"name": target, "lockfileVersion": 3}
+        _write(os.path.join(target, "package-lock.json"), json.dumps(lock))
+        _emit([f"Scaffolding project in {os.path.abspath(target)}...", "Done."])
+    elif args[:1] in (["install"], ["ci"]):
+        _emit(
+            f"npm http fetch GET 200 https://registry.npmjs.org/pkg-{i} 12ms (cache hit)"
+            for i in range(_scale(300))
+        )
+        _write(os.path.join("node_modules", ".package-lock.json"), "{}")
+        _emit(["", f"added {_scale(300)} packages in 1s"])
+    elif args[:2] == ["run", "build"]:
+        _write(os.path.join("dist", "index.html"), INDEX_HTML)
+        _write(os.path.join("dist", "assets", "index.js"), "console.log('x');\n" * 2000)
+        _emit(["vite v7.0.0 building for production...", "✓ built in 1.00s"])
+    return 0
+
+
+def fake_node(args):
+    if args[:1] in (["--version"], ["-v"]):
+        print("v22.12.0")
+    return 0
+
+
+def main(argv):
+    tool, args = argv[0], argv[1:]
+    handler = {
+        "python": fake_python,
+        "pip": fake_pip,
+        "uv": fake_uv,
+        "npm": fake_npm,
+        "node": fake_node,
+        "django-admin": fake_django_admin,
+    }[tool]
+    return handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,330 @@
+"""Headless performance benchmarks for Terminalik.
+
+Runs the setup generators against the offline fakes in ``fakeTools.py`` and
+drives ``TerminalikApp`` through Textual's Pilot. Results are written as JSON
+and compared with ``baseline.json``; a metric that regresses by more than the
+tolerance makes the run exit non-zero.
+
+    python benchmarks/run.py                    # run and compare
+    python benchmarks/run.py --update-baseline  # accept current numbers
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks import fakeGithub, fakeTools
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Metric name -> True when bigger is better
+HIGHER_IS_BETTER = {"log_lines_per_s": True}
+
+
+class _Sink:
+    """Generator context that counts log lines instead of printing them."""
+
+    def __init__(self, project_dir: str) -> None:
+        self.project_dir = project_dir
+        self.lines = 0
+
+    def log_line(self, text: str) -> None:
+        self.lines += 1
+
+
+def _fake_env(work: str) -> Dict[str, str]:
+    bin_dir = fakeTools.install(os.path.join(work, "fakebin"))
+    return {
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "TERMINALIK_PYTHON": os.path.join(bin_dir, "python"),
+        "TERMINALIK_CACHE_DIR": os.path.join(work, "cache"),
+    }
+
+
+def _timed(fn: Callable[[], None], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def bench_generators(repeat: int) -> Dict[str, float]:
+    from utils.setups.setupDjango import setup_django
+    from utils.setups.setupDocker import setup_docker
+    from utils.setups.setupPlan import run_plan
+    from utils.setups.setupVue import setup_vue
+    from utils.stepScheduler import Step, run_steps
+
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="terminalik-bench-") as work:
+        saved = dict(os.environ)
+        os.environ.update(_fake_env(work))
+        counter = [0]
+
+        def fresh_project() -> str:
+            counter[0] += 1
+            path = os.path.join(work, f"project{counter[0]}")
+            os.makedirs(path)
+            return path
+
+        def cold_django(installer: str = "pip") -> None:
+            shutil.rmtree(os.environ["TERMINALIK_CACHE_DIR"], ignore_errors=True)
+            setup_django(_Sink(fresh_project()), installer=installer)
+
+        def warm_django() -> None:
+            setup_django(_Sink(fresh_project()), installer="pip")
+
+        def vue() -> None:
+            setup_vue(_Sink(fresh_project()))
+
+        def docker() -> None:
+            project = fresh_project()
+            os.makedirs(os.path.join(project, "backend"))
+            os.makedirs(os.path.join(project, "frontend"))
+            setup_docker(_Sink(project))
+
+        def full_stack() -> None:
+            steps = [
+                Step("django", "Django", lambda ctx: setup_django(ctx, installer="pip")),
+                Step("vue", "Vue", setup_vue),
+                Step("docker", "Docker", setup_docker, depends_on=("django", "vue")),
+            ]
+            run_steps(steps, fresh_project(), lambda _line: None)
+
+        plan = {
+            "backend_framework": "django",
+            "frontend_framework": "vue",
+            "include_docker": True,
+            "installer": "pip",
+        }
+
+        def from_snapshot() -> None:
+            run_plan(plan, fresh_project(), lambda _line: None)
+
+        try:
+            results["setup_django_cold_s"] = _timed(cold_django, repeat)
+            results["setup_django_cold_uv_s"] = _timed(lambda: cold_django("uv"), repeat)
+            warm_django()  # make sure the venv template is cached
+            results["setup_django_warm_s"] = _timed(warm_django, repeat)
+            results["setup_vue_s"] = _timed(vue, repeat)
+            results["setup_docker_s"] = _timed(docker, repeat)
+            results["full_stack_s"] = _timed(full_stack, repeat)
+            from_snapshot()  # the first run stores the snapshot
+            results["full_stack_snapshot_s"] = _timed(from_snapshot, repeat)
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+    return results
+
+
+_FIRST_FRAME_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import asyncio, sys
+sys.path.insert(0, {root!r})
+from main import TerminalikApp
+
+frames = []
+TerminalikApp._report_first_frame = lambda self: frames.append(time.perf_counter() - t0)
+
+async def main():
+    app = TerminalikApp()
+    async with app.run_test() as pilot:
+        while not frames:
+            await pilot.pause(0.005)
+        print(frames[0])
+
+asyncio.run(main())
+"""
+
+
+def bench_first_frame(repeat: int) -> Dict[str, float]:
+    """Cold-interpreter time from process start to the first rendered screen."""
+    script = _FIRST_FRAME_SCRIPT.format(root=str(ROOT))
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=ROOT,
+            env=dict(os.environ, TERMINALIK_STARTUP_PROFILE="1"),
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return {"tui_first_frame_s": statistics.median(samples)}
+
+
+def bench_log_throughput(lines: int) -> Dict[str, float]:
+    from textual.widgets import RichLog
+
+    from main import TerminalikApp
+    from pages.projectSetup import ProjectSetupPane
+
+    async def run() -> float:
+        app = TerminalikApp()
+        async with app.run_test() as pilot:
+            app.query_one("#main_tabs").active = "project_setup"
+            await pilot.pause()
+            pane = app.query_one(ProjectSetupPane)
+            pane._show_output_panel()
+            await pilot.pause()
+            log = app.query_one("#output_log", RichLog)
+            t0 = time.perf_counter()
+            for i in range(lines):
+                pane.log_line(f"[bench] Collecting package-{i} (from -r requirements.txt)")
+            while pane._log_sink.pending:
+                await pilot.pause(0.01)
+            await pilot.pause()
+            elapsed = time.perf_counter() - t0
+            assert log.lines, "log panel rendered nothing"
+            return elapsed
+
+    elapsed = asyncio.run(run())
+    return {"log_lines_per_s": lines / elapsed}
+
+
+def bench_auth(repeat: int) -> Dict[str, float]:
+    """Device flow against the local GitHub stand-in, then warm launches from the token cache."""
+    from utils import githubAuth, httpClient
+
+    server = fakeGithub.serve(pending_polls=2)
+    saved = (githubAuth.GITHUB_URL, githubAuth.GITHUB_API_URL, githubAuth.PROFILE_TTL)
+    githubAuth.GITHUB_URL = githubAuth.GITHUB_API_URL = server.url
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="terminalik-auth-") as work:
+        path = os.path.join(work, githubAuth.TOKEN_FILE)
+
+        def cold() -> None:
+            githubAuth.clear_token(path)
+            data = githubAuth.request_device_code("bench")
+            token = githubAuth.poll_access_token("bench", data["device_code"], 0)
+            assert token == fakeGithub.TOKEN, f"device flow returned {token!r}"
+            user, etag = githubAuth.fetch_user(token)
+            expected = (fakeGithub.USER, fakeGithub.USER_ETAG)
+            assert (user, etag) == expected, f"unexpected profile {user!r}"
+            githubAuth.save_token(token, user, etag, path)
+            cached = githubAuth.load_token(path)
+            assert cached and cached["token"] == token, "token was not cached"
+            if os.name != "nt":
+                mode = os.stat(path).st_mode & 0o777
+                assert mode == 0o600, f"token cache has mode {oct(mode)}, expected 0o600"
+
+        def measure(name: str, fn: Callable[[], None]) -> int:
+            server.polls = server.requests = server.connections = 0
+            results[name] = _timed(fn, repeat)
+            print(f"{name}: {server.requests / repeat:.0f} request(s), "
+                  f"{server.connections} connection(s)")
+            return server.requests
+
+        def login() -> None:
+            assert githubAuth.cached_login(path) == fakeGithub.USER, "cached login lost the profile"
+
+        try:
+            measure("auth_cold_s", cold)
+            githubAuth.PROFILE_TTL = 0  # every launch revalidates: one conditional GET
+            requests = measure("auth_revalidate_s", login)
+            assert requests == repeat, (
+                f"revalidation made {requests} request(s) for {repeat} launch(es)"
+            )
+            githubAuth.PROFILE_TTL = 3600  # fresh profile: no request at all
+            requests = measure("auth_warm_s", login)
+            assert requests == 0, f"warm launches made {requests} request(s); expected none"
+        finally:
+            githubAuth.GITHUB_URL, githubAuth.GITHUB_API_URL, githubAuth.PROFILE_TTL = saved
+            httpClient.close()
+            server.shutdown()
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], tolerance: float, min_delta: float
+) -> list:
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not base:
+            # A metric newer than the baseline is not gated; say so instead of skipping it
+            print(f"{name:<24} {value:12.4f}  no baseline")
+            continue
+        change = (value - base) / base
+        if HIGHER_IS_BETTER.get(name):
+            change = -change
+        marker = ""
+        # Sub-millisecond timings are all noise; only flag slowdowns that matter
+        noise = not HIGHER_IS_BETTER.get(name) and abs(value - base) < min_delta
+        if change > tolerance and not noise:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<24} {value:12.4f}  baseline {base:12.4f}  {change:+7.1%}{marker}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--log-lines", type=int, default=20000)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument(
+        "--min-delta", type=float, default=0.005, help="ignore timing changes below this (s)"
+    )
+    parser.add_argument("--output", default=str(Path(__file__).with_name("results.json")))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--skip-tui", action="store_true", help="only benchmark the generators")
+    args = parser.parse_args(argv)
+
+    results = bench_generators(args.repeat)
+    results.update(bench_auth(args.repeat))
+    if not args.skip_tui:
+        results.update(bench_first_frame(args.repeat))
+        results.update(bench_log_throughput(args.log_lines))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {BASELINE_PATH}")
+        return 0
+    if not BASELINE_PATH.exists():
+        print("No baseline yet; run with --update-baseline to create one.")
+        return 0
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    ungated = [name for name in results if not baseline.get(name)]
+    if ungated:
+        print(f"Not gated (no baseline): {', '.join(ungated)}; refresh with --update-baseline")
+    if regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,22 +20,21 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from utils.setups.setupDjango import setup_django
-from utils.setups.setupVue import setup_vue
-from utils.setups.setupDocker import setup_docker
-
 class ProjectSetupForm(VerticalScroll):
     class Submitted(Message):
         def __init__(self, data: Dict[str, Any]) -> None:
             self.data = data
             super().__init__()
 
+    class Cancelled(Message):
+        pass
+
     def compose(self) -> ComposeResult:
         yield Label("Project Name:")
         # Force name to current directory and make it read-only
         yield Input(
             placeholder="Project folder name",
-            value=os.path.basename(os.getcwd()),
+            value=os.path.basename(getattr(self.app, "work_dir", os.getcwd())),
             id="project_name",
             disabled=False,
         )
@@ -45,10 +44,20 @@ class ProjectSetupForm(VerticalScroll):
         yield Label("Backend Framework:")
         options=["Django", "Flask", "FastAPI", "None"]
         yield Select(options=[(opt, opt.lower()) for opt in options], id="backend_framework")
+        yield Label("Python Installer:")
+        yield Select(
+            options=[("Auto (uv if installed)", "auto"), ("uv", "uv"), ("pip", "pip")],
+            value="auto",
+            allow_blank=False,
+            id="installer",
+        )
         yield Label("Include Options:")
         yield SelectionList(
             ("Docker", 0),
             ("Unfold", 1),
+            ("Offline npm cache", 2),
+            ("Offline wheelhouse", 3),
+            ("Production profile", 4),
             id="include_options",
         )
         with Horizontal(id="buttons"):
@@ -61,19 +70,20 @@ class ProjectSetupForm(VerticalScroll):
         if event.button.id == "submit":
             self.post_message(self.Submitted(self._values()))
         elif event.button.id == "cancel":
-            self.app.exit()
-            # TODO: Back to main page
+            # The parent decides: stop a running setup, or leave
+            self.post_message(self.Cancelled())
 
     def _values(self) -> Dict[str, Any]:
         """Collect normalized values for setups.
 
         Project name is always the current directory.
         """
-        cwd = os.getcwd()
+        cwd = getattr(self.app, "work_dir", os.getcwd())
         name_input = self.query_one("#project_name", Input).value.strip()
         project_name = name_input or os.path.basename(cwd)
         frontend = self.query_one("#frontend_framework", Select).value
         backend = self.query_one("#backend_framework", Select).value
+        installer = self.query_one("#installer", Select).value
         sel_widget = self.query_one("#include_options", SelectionList)
         # SelectionList.selected may be a list of values or Selection objects depending on Textual version
         try:
@@ -90,4 +100,8 @@ class ProjectSetupForm(VerticalScroll):
             "backend_framework": backend,
             "include_docker": 0 in selected,
             "include_unfold": 1 in selected,
+            "vue_offline": 2 in selected,
+            "installer": installer,
+            "pip_offline": 3 in selected,
+            "production": 4 in selected,
         }
\ No newline at end of file
@@ -1,7 +1,22 @@
+import time
+
+# Taken before the heavy imports so --startup-profile measures a cold start
+STARTED = time.perf_counter()
+
+import argparse
+import importlib
+import os
+import sys
+
 from textual.app import App, ComposeResult
-from textual.widgets import Footer, Header, TabbedContent, TabPane, Static
-from pages.projectSetup import ProjectSetupPane
-from pages.readmeMarkdown import ReadmeMarkdown
+from textual.widgets import Footer, Header, TabbedContent, TabPane
+
+# Tab id -> (module, widget class). Imported and mounted on first activation.
+TAB_CONTENT = {
+    "general": ("pages.readmeMarkdown", "ReadmeMarkdown"),
+    "project_setup": ("pages.projectSetup", "ProjectSetupPane"),
+    "settings": ("pages.settings", "SettingsPane"),
+}
 
 
 class TerminalikApp(App):
@@ -10,23 +25,211 @@ class TerminalikApp(App):
     CSS_PATH = "terminalik.css"
     BINDINGS = [("d", "toggle_dark", "Toggle dark mode")]
 
+    def __init__(
+        self, work_dir=None, session_limit=None, shared=False, on_first_frame=None, **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+        # Where Project Setup creates projects; each session of `serve` has its own
+        self.work_dir = work_dir or os.getcwd()
+        # Heavy commands this session may run at once (resourceLimiter.SessionLimit)
+        self.session_limit = session_limit
+        # Served to many users by one process: host-wide settings are read-only
+        self.shared = shared
+        self._on_first_frame = on_first_frame
+
     def compose(self) -> ComposeResult:
         yield Header()
         with TabbedContent(id="main_tabs"):
-            with TabPane("General", id="general"):
-                yield ReadmeMarkdown()
-            with TabPane("Project Setup", id="project_setup"):
-                yield ProjectSetupPane()
-            with TabPane("Settings", id ="settings"):
-                yield Static("Settings will be here.")
+            # Panes start empty; see on_tabbed_content_tab_activated
+            yield TabPane("General", id="general")
+            yield TabPane("Project Setup", id="project_setup")
+            yield TabPane("Settings", id="settings")
         yield Footer()
 
+    def on_mount(self) -> None:
+        if self._on_first_frame is not None or os.environ.get("TERMINALIK_STARTUP_PROFILE"):
+            self.call_after_refresh(self._report_first_frame)
+
+    def on_tabbed_content_tab_activated(self, event: TabbedContent.TabActivated) -> None:
+        pane = event.pane
+        spec = TAB_CONTENT.get(pane.id or "")
+        if spec is None or pane.children:
+            return
+        module, name = spec
+        pane.mount(getattr(importlib.import_module(module), name)())
+
+    def _report_first_frame(self) -> None:
+        if self._on_first_frame is not None:
+            self._on_first_frame()
+        profile = os.environ.get("TERMINALIK_STARTUP_PROFILE")
+        if profile:
+            # Read back by utils.startupProfile; stderr belongs to the UI
+            with open(profile, "a", encoding="utf-8") as f:
+                f.write(f"terminalik: first frame {time.perf_counter() - STARTED:.4f}s\n")
+
     def action_toggle_dark(self) -> None:
         self.theme = (
             "textual-dark" if self.theme == "textual-light" else "textual-light"
         )
 
 
-if __name__ == "__main__":
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="terminalik")
+    sub = parser.add_subparsers(dest="command")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Report per-module import time and time to first frame",
+    )
+    sub.add_parser("warm-cache", help="Prefetch the pinned Vite template and its npm packages")
+    wheelhouse = sub.add_parser(
+        "build-wheelhouse", help="Build wheels for the Django backend for offline installs"
+    )
+    wheelhouse.add_argument(
+        "--dest",
+        default=None,
+        help="Wheel directory (default: TERMINALIK_WHEELHOUSE or the cache)",
+    )
+    purge = sub.add_parser("purge-snapshots", help="Delete stored project snapshots")
+    purge.add_argument(
+        "--keep-mb",
+        type=int,
+        default=0,
+        help="Keep the most recently used snapshots up to this size",
+    )
+    cache = sub.add_parser("cache", help="Show cache usage and hit rates, or purge a cache")
+    cache.add_argument(
+        "--purge", metavar="NAMESPACE", default=None, help="Namespace to empty, or 'all'"
+    )
+    loadtest = sub.add_parser(
+        "loadtest", help="Serve a scaffolded backend on localhost and load-test it"
+    )
+    loadtest.add_argument("--project", default=".", help="Project folder (containing backend/)")
+    loadtest.add_argument("--duration", type=float, default=None, help="Seconds per endpoint")
+    loadtest.add_argument("--concurrency", type=int, default=None, help="Concurrent connections")
+    serve = sub.add_parser("serve", help="Serve Terminalik to many users over SSH from one process")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    serve.add_argument("--port", type=int, default=2222, help="SSH port")
+    serve.add_argument("--root", default=".", help="Each SSH user works in <root>/<user>")
+    serve.add_argument(
+        "--host-key", default=None, help="Host key (default: generated in the config directory)"
+    )
+    serve.add_argument(
+        "--authorized-keys",
+        default=None,
+        help="Client public keys (default: ~/.ssh/authorized_keys)",
+    )
+    serve.add_argument(
+        "--no-auth", action="store_true", help="Let anyone in without a key (trusted networks only)"
+    )
+    serve.add_argument(
+        "--max-sessions", type=int, default=None, help="Sessions at once (default: 32)"
+    )
+    serve.add_argument(
+        "--session-heavy-jobs",
+        type=int,
+        default=None,
+        help="Heavy commands per session (default: settings)",
+    )
+    scaffold = sub.add_parser(
+        "scaffold", help="Scaffold many projects from a spec file, without the TUI"
+    )
+    scaffold.add_argument("--spec", required=True, help="JSON list of Project Setup form values")
+    scaffold.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel projects")
+    scaffold.add_argument("--output-dir", default=".", help="Where project folders are created")
+    scaffold.add_argument(
+        "--log-dir", default=None, help="Per-project logs (default: <output-dir>/.terminalik-batch)"
+    )
+    scaffold.add_argument(
+        "--installer",
+        choices=("auto", "uv", "pip"),
+        default=None,
+        help="Override the spec's Python installer",
+    )
+    args = parser.parse_args(argv)
+
+    if args.startup_profile:
+        from utils.startupProfile import profile_startup
+        return profile_startup(os.path.abspath(__file__))
+
+    if args.command == "warm-cache":
+        from utils.npmCache import warm_cache
+        return 0 if warm_cache(print) else 1
+    if args.command == "build-wheelhouse":
+        from utils.installers import build_wheelhouse
+        from utils.setups.setupDjango import (
+            DEPENDENCIES,
+            PRODUCTION_DEPENDENCIES,
+            UNFOLD_DEPENDENCIES,
+        )
+        packages = DEPENDENCIES + UNFOLD_DEPENDENCIES + PRODUCTION_DEPENDENCIES
+        return 0 if build_wheelhouse(packages, print, dest=args.dest) else 1
+    if args.command == "purge-snapshots":
+        from utils import snapshotStore
+        removed, freed = snapshotStore.evict(max(0, args.keep_mb))
+        print(f"Removed {removed} snapshot(s), freed {freed / (1024 * 1024):.1f} MB")
+        return 0
+    if args.command == "cache":
+        from utils import cacheManager
+        from utils.telemetry import format_bytes
+        if args.purge:
+            known = [ns.name for ns in cacheManager.NAMESPACES]
+            names = known if args.purge == "all" else [args.purge]
+            for name in names:
+                if name not in known:
+                    print(f"Unknown cache {name!r}", file=sys.stderr)
+                    return 2
+                try:
+                    removed, freed = cacheManager.purge(name)
+                except ValueError as e:
+                    print(f"{name}: skipped, {e}", file=sys.stderr)
+                    continue
+                entries = f"{removed} entr{'y' if removed == 1 else 'ies'}"
+                print(f"{name}: removed {entries}, freed {format_bytes(freed)}")
+            return 0
+        for row in cacheManager.usage():
+            rate = f"{row['hit_rate']:.0%}" if row["hit_rate"] is not None else "-"
+            lookups = row["hits"] + row["misses"]
+            print(f"{row['name']:<11} {format_bytes(row['size']):>9} {row['entries']:>5} entries  "
+                  f"hit rate {rate:>4} ({row['hits']}/{lookups})  {row['path']}")
+        return 0
+    if args.command == "loadtest":
+        from utils import loadTest
+        report = loadTest.run_benchmark(
+            args.project,
+            print,
+            duration=args.duration or loadTest.DEFAULT_DURATION,
+            concurrency=max(1, args.concurrency or loadTest.DEFAULT_CONCURRENCY),
+        )
+        return 0 if report is not None else 1
+    if args.command == "serve":
+        from utils import sshServer
+        return sshServer.serve(
+            TerminalikApp,
+            host=args.host,
+            port=args.port,
+            root=args.root,
+            host_key=args.host_key,
+            authorized_keys=args.authorized_keys,
+            no_auth=args.no_auth,
+            max_sessions=max(1, args.max_sessions or sshServer.DEFAULT_MAX_SESSIONS),
+            session_heavy_jobs=args.session_heavy_jobs,
+        )
+    if args.command == "scaffold":
+        from utils.batchScaffold import run_batch
+        log_dir = args.log_dir or os.path.join(args.output_dir, ".terminalik-batch")
+        try:
+            return run_batch(
+                args.spec, max(1, args.jobs), args.output_dir, log_dir, installer=args.installer
+            )
+        except (OSError, ValueError) as e:
+            print(f"Invalid spec {args.spec}: {e}", file=sys.stderr)
+            return 2
+
     app = TerminalikApp()
     app.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,47 @@
 from __future__ import annotations
 
 import os
+import re
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict
+from collections import deque
+from functools import partial
+from typing import Any, Dict, Optional
 
 from textual.app import App, ComposeResult
-from textual.containers import Vertical, VerticalScroll
+from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.widgets import (
     Button,
+    Input,
     Static,
     Label,
     RichLog,
 )
 from textual.screen import Screen
+from textual.worker import Worker, WorkerState
 import threading
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from utils.setups.setupDjango import setup_django
-from utils.setups.setupVue import setup_vue
-from utils.setups.setupDocker import setup_docker
+from utils.cancellation import CancelScope
+from utils.logSink import BatchedLogSink, LOG_REFRESH_HZ
+from utils.logStore import RunLog
+from utils.telemetry import ResourceMonitor, format_panel
+from utils.tracing import Tracer
 from components.projectSetupForm import ProjectSetupForm
 
+# Lines kept in memory for the visible log; the full log lives in the run's file
+LOG_MAX_LINES = 5000
+# Lines shown around a ":N" jump and the most hits shown for a search
+LOG_JUMP_WINDOW = 200
+LOG_SEARCH_LIMIT = 1000
+# Slowest operations listed after each run
+TRACE_TOP_N = 10
+
+
 class ProjectSetupPane(VerticalScroll):
     """A non-Screen widget version suitable for Tab panes in the main app."""
 
@@ -33,20 +50,203 @@ class ProjectSetupPane(VerticalScroll):
         with VerticalScroll(id="form_container"):
             yield ProjectSetupForm()
         yield Label("Output", id="output_title")
-        # Scrollable log box
-        yield RichLog(highlight=False, markup=False, wrap=False, id="output_log")
+        with Horizontal(id="run_buttons"):
+            yield Button("Cancel run", id="cancel_run", variant="error")
+            # Load-test the generated backend on localhost once it exists
+            yield Button("Benchmark", id="run_benchmark", variant="primary")
+        yield Input(placeholder="Search full log (regex), or :N to jump to line N", id="log_query")
+        with Horizontal(id="output_row"):
+            # Scrollable log box (bounded) and the viewer for search/jump results
+            yield RichLog(
+                highlight=False, markup=False, wrap=False, max_lines=LOG_MAX_LINES, id="output_log"
+            )
+            yield RichLog(highlight=False, markup=False, wrap=False, id="log_view")
+            # Live CPU/RSS/disk of the running steps' processes
+            yield Static("", id="telemetry")
 
     def on_mount(self) -> None:
-        self._output_lines: list[str] = []
+        self._output_lines: deque[str] = deque(maxlen=LOG_MAX_LINES)
+        self._run_log: Optional[RunLog] = None
+        self._log_sink = BatchedLogSink(self._write_lines)
+        self.set_interval(1 / LOG_REFRESH_HZ, self._log_sink.flush)
+        self._cancel_scope: Optional[CancelScope] = None
+        self._monitor: Optional[ResourceMonitor] = None
+        self.set_interval(1.0, self._refresh_telemetry)
+        # Set once the previous run's thread (including its cleanup) has returned
+        self._run_done = threading.Event()
+        self._run_done.set()
+        # An existing project can be benchmarked without scaffolding it again
+        self._follow_project_name(self.query_one("#project_name", Input).value)
+
+    def on_unmount(self) -> None:
+        # Do not leave npm/pip process groups running after the app exits
+        self.cancel_run()
+
+    def cancel_run(self) -> None:
+        """Stop the running setup: kill its process groups and free the UI."""
+        scope = self._cancel_scope
+        if scope is None or scope.cancelled:
+            return
+        self.log_line("Cancelling...")
+        scope.cancel()
+        self.workers.cancel_group(self, "setup")
+        self.workers.cancel_group(self, "benchmark")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel_run":
+            event.stop()
+            self.cancel_run()
+        elif event.button.id == "run_benchmark":
+            event.stop()
+            self.run_benchmark()
+
+    def run_benchmark(self) -> None:
+        """Serve the scaffolded backend locally and load-test it on a worker thread."""
+        project_dir = getattr(self, "project_dir", None)
+        if not project_dir:
+            return
+        self._set_running(True)
+        self._show_output_panel()
+        scope, previous, done = CancelScope(), self._run_done, threading.Event()
+        self._cancel_scope, self._run_done = scope, done
+        self.run_worker(
+            partial(self._run_benchmark_worker, project_dir, scope, previous, done),
+            name="benchmark",
+            group="benchmark",
+            thread=True,
+            exit_on_error=False,
+        )
+
+    def _run_benchmark_worker(
+        self, project_dir: str, scope: CancelScope, previous: threading.Event, done: threading.Event
+    ) -> None:
+        from utils.loadTest import run_benchmark
+
+        try:
+            previous.wait()
+            if not scope.cancelled:
+                run_benchmark(project_dir, self.log_line, scope=scope)
+        except Exception as e:
+            self.log_line(f"Benchmark failed: {e}")
+        finally:
+            done.set()
+
+    def on_project_setup_form_cancelled(self, message: ProjectSetupForm.Cancelled) -> None:
+        if self._cancel_scope is not None and not self._cancel_scope.cancelled:
+            self.cancel_run()
+        else:
+            self.app.exit()
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        if event.worker.group not in ("setup", "benchmark") or not event.worker.is_finished:
+            return
+        # A cancelled worker finishes at once; its thread winds down in the background
+        # and the next run waits for it (see _run_done)
+        self._set_running(False)
+        if event.state == WorkerState.ERROR:
+            self.log_line(f"Setup failed: {event.worker.error}")
+
+    def _set_running(self, running: bool) -> None:
+        try:
+            self.query_one("#cancel_run", Button).display = running
+            self.query_one("#submit", Button).disabled = running
+            project_dir = getattr(self, "project_dir", None)
+            has_backend = bool(project_dir) and os.path.isfile(
+                os.path.join(project_dir, "backend", "manage.py")
+            )
+            self.query_one("#run_benchmark", Button).display = has_backend and not running
+        except Exception:
+            pass
 
     def log_line(self, text: str) -> None:
+        """Queue a line for the output log. Safe to call from any thread."""
+        run_log = self._run_log
+        if run_log is not None:
+            run_log.append(text)
+        self._log_sink.push(text)
+
+    def _refresh_telemetry(self) -> None:
+        monitor = self._monitor
+        if monitor is None:
+            return
+        try:
+            panel = self.query_one("#telemetry", Static)
+        except Exception:
+            return
+        if monitor.enabled:
+            panel.update(format_panel(monitor.usage()))
+        else:
+            panel.update("Resources\n\nNot available: no /proc on this system")
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        # A running setup or benchmark keeps the directory it started with
+        if event.input.id == "project_name" and self._run_done.is_set():
+            self._follow_project_name(event.value)
+
+    def _follow_project_name(self, name: str) -> None:
+        try:
+            self.project_dir = self._project_root(name)
+        except ValueError:
+            self.project_dir = None
+        self._set_running(False)
+
+    def _project_root(self, name: str) -> str:
+        """Where a project called ``name`` lives: the working directory itself if it has that name.
+
+        Raises ``ValueError`` unless ``name`` is one directory inside the
+        working directory; SSH sessions must not reach each other's.
+        """
+        current_dir = getattr(self.app, "work_dir", os.getcwd())
+        chosen_name = (name or "").strip() or os.path.basename(current_dir)
+        if os.path.basename(current_dir) == chosen_name:
+            return current_dir
+        if os.path.basename(chosen_name) != chosen_name or chosen_name in (".", ".."):
+            raise ValueError(f"Project name {chosen_name!r} must be a single folder name")
+        project_root = os.path.join(current_dir, chosen_name)
+        real_dir = os.path.realpath(current_dir)
+        if os.path.dirname(os.path.realpath(project_root)) != real_dir:
+            raise ValueError(f"{project_root} leads outside {current_dir}")
+        return project_root
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id != "log_query":
+            return
+        event.stop()
+        query = event.value.strip()
+        output = self.query_one("#output_log", RichLog)
+        view = self.query_one("#log_view", RichLog)
+        if not query or self._run_log is None:
+            # Back to the live tail
+            view.display = False
+            output.display = True
+            return
+        view.clear()
+        if query.startswith(":") and query[1:].isdigit():
+            start = max(0, int(query[1:]) - 1)
+            lines = self._run_log.lines(start, LOG_JUMP_WINDOW)
+            numbered = "\n".join(f"{start + i + 1:>7}  {line}" for i, line in enumerate(lines))
+            view.write(numbered or "(no such line)")
+        else:
+            try:
+                hits = self._run_log.search(query, limit=LOG_SEARCH_LIMIT)
+            except re.error as e:
+                view.write(f"Invalid pattern: {e}")
+                hits = None
+            if hits is not None:
+                view.write(f"{len(hits)} match(es) for /{query}/ in {self._run_log.path}")
+                if hits:
+                    view.write("\n".join(f"{n + 1:>7}  {line}" for n, line in hits))
+        output.display = False
+        view.display = True
+
+    def _write_lines(self, lines: list[str]) -> None:
         out = self.query_one("#output_log", RichLog)
-        # Write line and keep autoscroll
+        # One write per batch and keep autoscroll
         try:
-            out.write(text)
+            out.write("\n".join(lines))
         except Exception:
             # Fallback to update
-            self._output_lines.append(text)
+            self._output_lines.extend(lines)
             out.update("\n".join(self._output_lines))
 
     def _show_output_panel(self) -> None:
@@ -66,8 +266,8 @@ class ProjectSetupPane(VerticalScroll):
                 self.query_one("#title", Label).styles.display = "none"  # type: ignore[attr-defined]
             except Exception:
                 pass
-        # Show output title and log
-        for sel in ("#output_title", "#output_log"):
+        # Show output title, search box and log
+        for sel in ("#output_title", "#log_query", "#output_row", "#output_log", "#telemetry"):
             try:
                 self.query_one(sel).display = True  # type: ignore[attr-defined]
             except Exception:
@@ -78,74 +278,107 @@ class ProjectSetupPane(VerticalScroll):
 
     # Progress bar removed
 
-    def _run_setups_worker(self, data: Dict[str, Any]) -> None:
-        current_dir = os.getcwd()
-        chosen_name = (data.get("project_name") or os.path.basename(current_dir)).strip()
-        if os.path.basename(current_dir) == chosen_name:
-            project_root = current_dir
-        else:
-            project_root = os.path.join(current_dir, chosen_name)
-            os.makedirs(project_root, exist_ok=True)
+    def _run_setups_worker(
+        self,
+        data: Dict[str, Any],
+        scope: CancelScope,
+        previous: threading.Event,
+        done: threading.Event,
+    ) -> None:
+        try:
+            # Never overlap with a cancelled run that is still cleaning up
+            previous.wait()
+            if not scope.cancelled:
+                self._run_setups(data, scope)
+        finally:
+            done.set()
+
+    def _run_setups(self, data: Dict[str, Any], scope: CancelScope) -> None:
+        # Sessions of the SSH server each work in their own directory
+        try:
+            project_root = self._project_root(data.get("project_name") or "")
+        except ValueError as e:
+            self.log_line(str(e))
+            return
+        os.makedirs(project_root, exist_ok=True)
         self.project_dir = project_root
         project_name = os.path.basename(self.project_dir)
 
-        steps: list[tuple[str, str]] = []
-        if data.get("backend_framework") == "django":
-            steps.append(("django", "Setting up Django"))
-        if data.get("frontend_framework") == "vue":
-            steps.append(("vue", "Setting up Vue + Vite"))
-        if data.get("include_docker"):
-            steps.append(("docker", "Creating Docker files"))
-
-        total = len(steps)
+        from utils.setups.setupPlan import build_steps, run_plan
+        from utils.stepManifest import StepManifest
 
-        def do_log(text: str) -> None:
-            self.app.call_from_thread(self.log_line, text)
+        is_unfold = bool(data.get("include_unfold"))
+        steps = build_steps(data)
 
-        if total == 0:
-            do_log("No setup steps selected.")
-            def _enable_submit() -> None:
-                try:
-                    self.query_one("#submit", Button).disabled = False
-                except Exception:
-                    pass
-            self.app.call_from_thread(_enable_submit)
+        if not steps:
+            self.log_line("No setup steps selected.")
             return
 
-        do_log(f"Project: {project_name} — at {self.project_dir}")
-        completed = 0
-        for key, title in steps:
-            try:
-                if key == "django":
-                    if data.get("include_unfold") and data.get("backend_framework") != "django":
-                        do_log("Warning: 'Unfold' option requires Django backend; ignoring.")
-                    setup_django(self, is_unfold=bool(data.get("include_unfold")))
-                    do_log("Django setup completed.")
-                elif key == "vue":
-                    setup_vue(self)
-                    do_log("Vue setup completed.")
-                elif key == "docker":
-                    setup_docker(self)
-                    do_log("Docker files created.")
-            except Exception as e:
-                do_log(f"{title} failed: {e}")
-            finally:
-                completed += 1
-                # No progress bar
-
-        do_log("All requested setup steps finished.")
-        def _enable_submit() -> None:
+        if is_unfold and data.get("backend_framework") != "django":
+            self.log_line("Warning: 'Unfold' option requires Django backend; ignoring.")
+
+        if self._run_log is not None:
+            self._run_log.close()
+        try:
+            self._run_log = RunLog.for_project(self.project_dir)
+        except OSError as e:
+            self.log_line(f"Could not open run log file: {e}")
+        self.log_line(f"Project: {project_name} — at {self.project_dir}")
+        tracer = Tracer()
+        monitor = self._monitor = ResourceMonitor().start()
+        try:
+            # The manifest lets a rerun skip steps that are already done
+            manifest = StepManifest(self.project_dir)
+            run_plan(
+                data,
+                self.project_dir,
+                self.log_line,
+                tracer=tracer,
+                manifest=manifest,
+                cancel=scope,
+                monitor=monitor,
+                limit=getattr(self.app, "session_limit", None),
+            )
+        except Exception as e:
+            self.log_line(f"Setup failed: {e}")
+        finally:
+            monitor.stop()
+
+        if scope.cancelled:
+            self.log_line("Setup cancelled; partial outputs removed. Submit again to resume.")
+        else:
+            self.log_line("All requested setup steps finished.")
+        self.log_line(tracer.format_top(TRACE_TOP_N))
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if monitor.enabled and monitor.usage():
             try:
-                self.query_one("#submit", Button).disabled = False
-            except Exception:
-                pass
-        self.app.call_from_thread(_enable_submit)
+                report_path = os.path.join(
+                    self.project_dir, ".terminalik", "telemetry", f"resources-{stamp}.json"
+                )
+                self.log_line(f"Resource report written to {monitor.write_report(report_path)}")
+            except OSError as e:
+                self.log_line(f"Could not write resource report: {e}")
+        try:
+            trace_path = os.path.join(
+                self.project_dir, ".terminalik", "traces", f"trace-{stamp}.json"
+            )
+            written = tracer.export_chrome(trace_path)
+            self.log_line(f"Trace written to {written} (open in ui.perfetto.dev)")
+        except OSError as e:
+            self.log_line(f"Could not write trace: {e}")
+        if self._run_log is not None:
+            self.log_line(f"Full log: {self._run_log.path}")
 
     def on_project_setup_form_submitted(self, message: ProjectSetupForm.Submitted) -> None:
-        try:
-            self.query_one("#submit", Button).disabled = True
-        except Exception:
-            pass
+        self._set_running(True)
         # Switch UI to output-focused view
         self._show_output_panel()
-        threading.Thread(target=self._run_setups_worker, args=(message.data,), daemon=True).start()
+        scope, previous, done = CancelScope(), self._run_done, threading.Event()
+        self._cancel_scope, self._run_done = scope, done
+        self.run_worker(
+            partial(self._run_setups_worker, message.data, scope, previous, done),
+            name="project-setup",
+            group="setup",
+            thread=True,
+            exit_on_error=False,
+        )
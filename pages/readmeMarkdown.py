@@ -3,14 +3,25 @@ from textual.containers import VerticalScroll
 from textual.widgets import Markdown
 
 import os
+import sys
 import threading
-import requests
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import cacheManager
+from utils.httpCache import HttpCache
+from utils.markdownCache import CachedMarkdownIt
 
 README_URL = "https://raw.githubusercontent.com/terminalik/TerminalikSSH/main/README.md"
+# Sessions of one server process revalidate a stale README one at a time; the
+# others then find it fresh on disk instead of each asking GitHub
+_revalidate_lock = threading.Lock()
 
 
-def fetch_readme(url: str) -> str:
-    # Prefer local README if exists
+def read_local_readme():
     for name in ("README.md", "readme.md"):
         if os.path.exists(name):
             try:
@@ -18,25 +29,48 @@ def fetch_readme(url: str) -> str:
                     return f.read()
             except Exception:
                 pass
-    try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        return resp.text
-    except Exception as e:
-        return f"Failed to load README (\n{e}\n)"
+    return None
 
 
 class ReadmeMarkdown(VerticalScroll):
     def compose(self) -> ComposeResult:
         # Show placeholder and load in background
-        yield Markdown("Loading README...", id="md")
+        yield Markdown("Loading README...", id="md", parser_factory=CachedMarkdownIt)
 
     def on_mount(self) -> None:
-        threading.Thread(target=self._load, daemon=True).start()
+        # Start loading after the first frame so the placeholder paints immediately
+        self.call_after_refresh(lambda: threading.Thread(target=self._load, daemon=True).start())
 
     def _load(self) -> None:
-        text = fetch_readme(README_URL)
+        local = read_local_readme()
+        if local is not None:
+            self._show(local)
+            return
+        # Render the cached copy right away, then revalidate if it is stale
+        cache = HttpCache("readme")
+        cached, meta = cache.load(README_URL)
+        if cached is not None:
+            self._show(cached)
+            if cache.is_fresh(meta):
+                cacheManager.record_hit(cache.namespace, len(cached))
+                return
+        with _revalidate_lock:
+            latest, meta = cache.load(README_URL)
+            if latest is not None and cache.is_fresh(meta):
+                # Another session fetched it while this one waited
+                if latest != cached:
+                    self._show(latest)
+                return
+            try:
+                text, _ = cache.fetch(README_URL)
+            except Exception as e:
+                if cached is None:
+                    self._show(f"Failed to load README (\n{e}\n)")
+                return
+        if text != cached:
+            self._show(text)
 
+    def _show(self, text: str) -> None:
         def _update() -> None:
             self.query_one("#md", Markdown).update(text)
 
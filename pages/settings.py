@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from textual.app import ComposeResult
+from textual.containers import Horizontal, VerticalScroll
+from textual.widgets import Button, Input, Label, Select, Static
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import cacheManager, resourceLimiter, settings
+from utils.telemetry import format_bytes
+
+# Text inputs saved by the Save button, in settings.DEFAULTS
+_NUMBER_FIELDS = (
+    "max_heavy_jobs",
+    "session_heavy_jobs",
+    "memory_per_job_mb",
+    "nice",
+    "cache_budget_mb",
+)
+
+
+class SettingsPane(VerticalScroll):
+    """Limits for heavy setup commands and the cache dashboard, saved between sessions."""
+
+    def compose(self) -> ComposeResult:
+        values = settings.load()
+        yield Label("Resource limits", classes="settings_title")
+        yield Label("Heavy commands at once (npm/pip/uv installs and builds; 0 = one per CPU):")
+        yield Input(str(values["max_heavy_jobs"]), id="max_heavy_jobs", type="integer")
+        yield Label("Of those, per session of the SSH server (main.py serve; 0 = no own limit):")
+        yield Input(str(values["session_heavy_jobs"]), id="session_heavy_jobs", type="integer")
+        yield Label("Free memory each extra heavy command needs (MB):")
+        yield Input(str(values["memory_per_job_mb"]), id="memory_per_job_mb", type="integer")
+        yield Label("CPU priority of heavy commands (nice 0-19, 0 = unchanged):")
+        yield Input(str(values["nice"]), id="nice", type="integer")
+        yield Label("I/O priority of heavy commands:")
+        yield Select(
+            options=[
+                ("Unchanged", "none"),
+                ("Best effort, lowest", "best-effort"),
+                ("Idle only", "idle"),
+            ],
+            value=values["ionice"],
+            allow_blank=False,
+            id="ionice",
+        )
+        yield Label("Caches", classes="settings_title")
+        yield Label(
+            "Size budget for all caches together "
+            "(MB; least recently used entries are evicted past it):"
+        )
+        yield Input(str(values["cache_budget_mb"]), id="cache_budget_mb", type="integer")
+        with Horizontal(id="settings_buttons"):
+            yield Button("Save", id="save_settings", variant="success")
+            yield Button("Reset to defaults", id="reset_settings")
+            yield Button("Refresh usage", id="refresh_caches")
+        yield Static("", id="settings_status")
+        yield Static("", id="cache_total")
+        for ns in cacheManager.NAMESPACES:
+            with Horizontal(classes="cache_row"):
+                yield Static(ns.title, id=f"cache_{ns.name}", classes="cache_usage")
+                yield Button("Purge", id=f"purge_{ns.name}", variant="warning")
+
+    def on_mount(self) -> None:
+        note = ""
+        if getattr(self.app, "shared", False):
+            # One server serves many users; only its operator changes host-wide limits
+            editable = "Input, Select, #save_settings, #reset_settings, .cache_row Button"
+            for widget in self.query(editable):
+                widget.disabled = True
+            note = "Read-only: these settings are shared by every session of this server"
+        self._show_effective(settings.load(), note)
+        self._refresh_caches()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        button = event.button.id or ""
+        if getattr(self.app, "shared", False) and button != "refresh_caches":
+            return
+        if button == "save_settings":
+            event.stop()
+            if self._save(self._values()) is not None:
+                # A lower budget takes effect now rather than at the next store
+                self._refresh_caches(enforce=True)
+        elif button == "reset_settings":
+            event.stop()
+            values = self._save(dict(settings.DEFAULTS))
+            if values is not None:
+                for name in _NUMBER_FIELDS:
+                    self.query_one(f"#{name}", Input).value = str(values[name])
+                self.query_one("#ionice", Select).value = values["ionice"]
+        elif button == "refresh_caches":
+            event.stop()
+            self._refresh_caches()
+        elif button.startswith("purge_"):
+            event.stop()
+            self._refresh_caches(purge=button[len("purge_"):])
+
+    def _refresh_caches(self, purge: str = "", enforce: bool = False) -> None:
+        # Sizing npm's cache walks thousands of files; keep it off the UI thread
+        self.run_worker(
+            lambda: self._load_caches(purge, enforce), group="caches", thread=True, exclusive=True
+        )
+
+    def _load_caches(self, purge: str, enforce: bool) -> None:
+        note = ""
+        if purge:
+            try:
+                removed, freed = cacheManager.purge(purge)
+                entries = f"{removed} entr{'y' if removed == 1 else 'ies'}"
+                note = f"Purged {purge}: {entries}, {format_bytes(freed)} freed"
+            except ValueError as e:
+                note = f"Did not purge {purge}: {e}"
+        elif enforce:
+            removed, freed = cacheManager.enforce_budget()
+            if removed:
+                entries = f"{removed} entr{'y' if removed == 1 else 'ies'}"
+                note = f"Evicted {entries} over budget, {format_bytes(freed)} freed"
+        rows = cacheManager.usage()
+        self.app.call_from_thread(self._show_caches, rows, note)
+
+    def _show_caches(self, rows: list, note: str) -> None:
+        for row in rows:
+            rate = f"{row['hit_rate']:.0%}" if row["hit_rate"] is not None else "-"
+            pinned = "" if row["evictable"] else ", pinned"
+            self.query_one(f"#cache_{row['name']}", Static).update(
+                f"{row['title']}: {format_bytes(row['size'])} in {row['entries']} entr"
+                f"{'y' if row['entries'] == 1 else 'ies'}{pinned}\n"
+                f"  hits {row['hits']} / misses {row['misses']} ({rate}), "
+                f"served {format_bytes(row['bytes_served'])}, "
+                f"stored {format_bytes(row['bytes_stored'])}"
+            )
+        total = sum(row["size"] for row in rows)
+        budget = settings.load()["cache_budget_mb"]
+        lines = [f"Caches use {format_bytes(total)} of {budget} MB in {cacheManager.cache_root()}"]
+        if note:
+            lines.append(note)
+        self.query_one("#cache_total", Static).update("\n".join(lines))
+
+    def _values(self) -> dict:
+        values = {name: self.query_one(f"#{name}", Input).value.strip() for name in _NUMBER_FIELDS}
+        values["ionice"] = self.query_one("#ionice", Select).value
+        return values
+
+    def _save(self, values: dict):
+        status = self.query_one("#settings_status", Static)
+        try:
+            saved = settings.save(values)
+        except (OSError, ValueError) as e:
+            status.update(f"Not saved: {e}")
+            return None
+        self._show_effective(saved, f"Saved to {settings.settings_path()}")
+        return saved
+
+    def _show_effective(self, values: dict, note: str = "") -> None:
+        free = resourceLimiter.available_memory()
+        memory = f", {free / 2 ** 30:.1f} GB free now" if free is not None else ""
+        prefix = " ".join(resourceLimiter.priority_prefix(values)) or "normal priority"
+        lines = [
+            f"Effective: {resourceLimiter.capacity(values)} heavy command(s) at once "
+            f"({resourceLimiter.cpu_count()} CPUs{memory}), run as: {prefix}",
+        ]
+        if note:
+            lines.append(note)
+        self.query_one("#settings_status", Static).update("\n".join(lines))
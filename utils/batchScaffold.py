@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+# Same keys ProjectSetupForm._values() returns
+SPEC_DEFAULTS: Dict[str, Any] = {
+    "project_name": None,
+    "frontend_framework": "none",
+    "backend_framework": "none",
+    "include_docker": False,
+    "include_unfold": False,
+    "vue_offline": False,
+    "installer": "auto",
+    "pip_offline": False,
+    "production": False,
+}
+
+
+def load_spec(path: str) -> List[Dict[str, Any]]:
+    """Read a spec file: a JSON list of form values, or ``{"projects": [...]}``."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("projects", [])
+    if not isinstance(data, list):
+        raise ValueError("spec must be a list of projects")
+    projects = []
+    seen = set()
+    for i, item in enumerate(data):
+        if not isinstance(item, dict) or not item.get("project_name"):
+            raise ValueError(f"project #{i + 1} has no project_name")
+        name = str(item["project_name"]).strip()
+        if os.path.basename(name) != name or name in (".", ".."):
+            raise ValueError(f"project_name must be a plain folder name: {name!r}")
+        if name in seen:
+            raise ValueError(f"duplicate project_name: {name}")
+        seen.add(name)
+        values = {**SPEC_DEFAULTS, **{k: v for k, v in item.items() if k in SPEC_DEFAULTS}}
+        values["project_name"] = name
+        projects.append(values)
+    return projects
+
+
+def scaffold_project(values: Dict[str, Any], output_dir: str, log_dir: str) -> Dict[str, Any]:
+    """Scaffold one project in the current process, logging to its own file."""
+    from utils.setups.setupPlan import run_plan
+    from utils.stepManifest import StepManifest
+    from utils.telemetry import ResourceMonitor
+
+    name = values["project_name"]
+    project_dir = os.path.join(output_dir, name)
+    log_path = os.path.join(log_dir, f"{name}.log")
+    os.makedirs(project_dir, exist_ok=True)
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8", buffering=1) as log:
+        def logger(text: str) -> None:
+            log.write(text + "\n")
+
+        logger(f"Project: {name} — at {project_dir}")
+        monitor = ResourceMonitor().start()
+        try:
+            results = run_plan(
+                values, project_dir, logger, manifest=StepManifest(project_dir), monitor=monitor
+            )
+            failed = [r.key for r in results if not r.ok]
+            error = None
+        except Exception as e:
+            logger(f"Setup failed: {e}")
+            failed, error = ["*"], str(e)
+        finally:
+            monitor.stop()
+        if monitor.enabled and monitor.usage():
+            try:
+                report = os.path.join(
+                    project_dir, ".terminalik", "telemetry", "resources-batch.json"
+                )
+                logger(f"Resource report written to {monitor.write_report(report)}")
+            except OSError as e:
+                logger(f"Could not write resource report: {e}")
+    return {
+        "project": name,
+        "ok": not failed,
+        "failed_steps": failed,
+        "error": error,
+        "duration": time.perf_counter() - started,
+        "log": log_path,
+    }
+
+
+def run_batch(
+    spec_path: str, jobs: int, output_dir: str, log_dir: str, out=print, installer: str = None
+) -> int:
+    """Scaffold every project in ``spec_path`` across ``jobs`` processes.
+
+    ``installer`` overrides the Python installer chosen in the spec.
+    Returns the process exit code: 0 when every project succeeded.
+    """
+    projects = load_spec(spec_path)
+    if installer:
+        for values in projects:
+            values["installer"] = installer
+    output_dir = os.path.abspath(output_dir)
+    log_dir = os.path.abspath(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
+    out(f"Scaffolding {len(projects)} project(s) into {output_dir} with {jobs} job(s)")
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(scaffold_project, values, output_dir, log_dir): values
+            for values in projects
+        }
+        for fut in as_completed(futures):
+            name = futures[fut]["project_name"]
+            try:
+                res = fut.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed); there may be no log
+                res = {"project": name, "ok": False, "failed_steps": ["*"], "error": str(e),
+                       "duration": 0.0, "log": os.path.join(log_dir, f"{name}.log")}
+            results.append(res)
+            out(f"  {'done' if res['ok'] else 'FAILED'}: {name} ({res['duration']:.1f}s)")
+
+    out(format_table(sorted(results, key=lambda r: r["project"]), time.perf_counter() - started))
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+def format_table(results: List[Dict[str, Any]], wall: float) -> str:
+    width = max([len("project")] + [len(r["project"]) for r in results])
+    lines = [f"{'project':<{width}}  {'status':<7} {'time':>8}  failed steps / log"]
+    for r in results:
+        status = "ok" if r["ok"] else "FAILED"
+        detail = ", ".join(r["failed_steps"]) or "-"
+        if r.get("error"):
+            detail += f" ({r['error']})"
+        lines.append(
+            f"{r['project']:<{width}}  {status:<7} {r['duration']:7.1f}s  {detail}  {r['log']}"
+        )
+    failed = sum(1 for r in results if not r["ok"])
+    lines.append(f"{len(results)} project(s), {failed} failed, {wall:.1f}s wall-clock")
+    return "\n".join(lines)
@@ -0,0 +1,313 @@
+"""One view over every on-disk cache under ``cache_root()``.
+
+Each cache keeps its own layout in a namespace directory; this module adds what
+they share: atomic writes, hit/miss/byte counters, per-namespace usage, purging
+and a global size budget enforced by evicting least recently used entries.
+"""
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+
+from utils.cachePaths import cache_dir, cache_root
+
+try:
+    import fcntl
+except ImportError:  # Windows: counters are updated without a cross-process lock
+    fcntl = None
+
+STATS_FILE = "stats.json"
+# Last measured size of each "tree" namespace, so the budget need not re-walk them
+TREE_SIZES_FILE = "tree-sizes.json"
+# Leftover temporary files/dirs older than this are removed with the entries
+STALE_TMP_SECONDS = 3600
+# npm's cache holds tens of thousands of files; the budget reuses its size for this long
+TREE_SIZE_TTL = 600
+
+
+@dataclass(frozen=True)
+class Namespace:
+    name: str
+    title: str
+    # "files": every file (grouped by name up to the first dot) is an entry;
+    # "dirs": every directory holding ``marker`` is an entry;
+    # "tree": the namespace is managed by another tool and is one entry
+    layout: str
+    marker: str = ""
+    # Whether the global budget may evict it; pinned caches are only purged by hand
+    evictable: bool = True
+
+
+NAMESPACES = (
+    Namespace("readme", "Fetched README", "files"),
+    Namespace("markdown", "Parsed Markdown", "files"),
+    Namespace("venvs", "Python venv templates", "dirs", ".terminalik-venv.json"),
+    Namespace("snapshots", "Project snapshots", "dirs", ".terminalik-snapshot.json"),
+    Namespace("npm", "npm packages and Vite template", "tree", evictable=False),
+    Namespace("wheelhouse", "Python wheels", "tree", evictable=False),
+)
+_BY_NAME = {ns.name: ns for ns in NAMESPACES}
+
+
+def budget_mb():
+    """Global size budget from the saved settings (``cache_budget_mb``)."""
+    from utils import settings
+
+    return settings.load()["cache_budget_mb"]
+
+
+def namespace_dir(name):
+    if name == "wheelhouse":
+        # The wheelhouse may live outside the cache (TERMINALIK_WHEELHOUSE)
+        from utils.installers import wheelhouse_dir
+
+        return wheelhouse_dir()
+    return cache_dir(name)
+
+
+def is_managed(name):
+    """Whether a namespace lives under ``cache_root()``, and so may be purged."""
+    root = os.path.realpath(cache_root())
+    path = os.path.realpath(namespace_dir(name))
+    return os.path.commonpath([root, path]) == root
+
+
+def atomic_write(path, data):
+    """Write ``data`` (str or bytes) so readers see the old file or the new one, never half."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def touch(path):
+    """Mark an entry as recently used for LRU eviction."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def record_hit(namespace, nbytes=0):
+    _update_stats(namespace, hits=1, bytes_served=nbytes)
+
+
+def record_miss(namespace):
+    _update_stats(namespace, misses=1)
+
+
+def record_store(namespace, nbytes=0):
+    _update_stats(namespace, stores=1, bytes_stored=nbytes)
+
+
+def stats():
+    """Counters per namespace: hits, misses, stores, bytes_served, bytes_stored."""
+    try:
+        with open(os.path.join(cache_root(), STATS_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_stats(namespace, **deltas):
+    path = os.path.join(cache_root(), STATS_FILE)
+    try:
+        lock = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        data = stats()
+        counters = data.setdefault(namespace, {})
+        for name, value in deltas.items():
+            counters[name] = counters.get(name, 0) + value
+        atomic_write(path, json.dumps(data))
+    except OSError:
+        pass
+    finally:
+        os.close(lock)  # Also drops the flock
+
+
+def entries(name):
+    """``(path(s), size, last_used)`` for every entry of a namespace, least recently used first."""
+    ns = _BY_NAME[name]
+    root = namespace_dir(name)
+    found = []
+    if ns.layout == "tree":
+        size, newest = _tree_stats(root)
+        _record_tree_size(name, size)
+        if size:
+            found.append(([root], size, newest))
+        return found
+    groups = {}
+    now = time.time()
+    for entry in os.scandir(root):
+        if entry.name.endswith(".tmp"):
+            _remove_stale(entry.path, now)
+            continue
+        if ns.layout == "dirs":
+            marker = os.path.join(entry.path, ns.marker)
+            if not entry.is_dir(follow_symlinks=False) or not os.path.isfile(marker):
+                continue
+            try:
+                with open(marker, "r", encoding="utf-8") as f:
+                    size = int(json.load(f).get("size", 0))
+                found.append(([entry.path], size, os.path.getmtime(marker)))
+            except (OSError, ValueError):
+                continue
+        elif entry.is_file(follow_symlinks=False):
+            st = entry.stat(follow_symlinks=False)
+            group = groups.setdefault(entry.name.split(".", 1)[0], [[], 0, 0.0])
+            group[0].append(entry.path)
+            group[1] += st.st_size
+            group[2] = max(group[2], st.st_mtime)
+    found.extend(tuple(g) for g in groups.values())
+    return sorted(found, key=lambda item: item[2])
+
+
+def usage():
+    """Per-namespace size, entry count and counters, for the Settings dashboard."""
+    counters = stats()
+    rows = []
+    for ns in NAMESPACES:
+        try:
+            found = entries(ns.name)
+        except OSError:
+            found = []
+        c = counters.get(ns.name, {})
+        hits, misses = c.get("hits", 0), c.get("misses", 0)
+        rows.append({
+            "name": ns.name,
+            "title": ns.title,
+            "path": namespace_dir(ns.name),
+            "size": sum(size for _, size, _ in found),
+            "entries": len(found),
+            "evictable": ns.evictable,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "bytes_served": c.get("bytes_served", 0),
+            "bytes_stored": c.get("bytes_stored", 0),
+        })
+    return rows
+
+
+def purge(name):
+    """Remove every entry of a namespace. Returns ``(removed, bytes_freed)``.
+
+    Raises ``ValueError`` for a namespace outside ``cache_root()`` (a wheelhouse
+    set with ``TERMINALIK_WHEELHOUSE``): that directory is not ours to empty.
+    """
+    ns = _BY_NAME[name]
+    if not is_managed(name):
+        raise ValueError(f"{namespace_dir(name)} is outside the cache; remove it by hand")
+    removed = freed = 0
+    for paths, size, _ in entries(name):
+        if ns.layout == "tree":
+            # Keep the directory itself; tools expect it to exist
+            for child in os.listdir(paths[0]):
+                _remove(os.path.join(paths[0], child))
+            _record_tree_size(name, 0)
+        else:
+            for path in paths:
+                _remove(path)
+        removed += 1
+        freed += size
+    return removed, freed
+
+
+def enforce_budget(max_mb=None):
+    """Evict least recently used entries, across namespaces, until the caches fit.
+
+    Pinned namespaces (npm, wheelhouse) count towards the total but are never
+    evicted; their size is the one last measured if that is under
+    ``TREE_SIZE_TTL`` old, as this runs after every venv and snapshot store.
+    Returns ``(removed, bytes_freed)``.
+    """
+    limit = (budget_mb() if max_mb is None else max_mb) * 1024 * 1024
+    candidates = []
+    total = 0
+    for ns in NAMESPACES:
+        if ns.layout == "tree":
+            recent = _recent_tree_size(ns.name)
+            if recent is not None:
+                total += recent
+                continue
+        try:
+            found = entries(ns.name)
+        except OSError:
+            continue
+        total += sum(size for _, size, _ in found)
+        if ns.evictable:
+            candidates.extend(found)
+    removed = freed = 0
+    for paths, size, _ in sorted(candidates, key=lambda item: item[2]):
+        if total <= limit:
+            break
+        for path in paths:
+            _remove(path)
+        total -= size
+        removed += 1
+        freed += size
+    return removed, freed
+
+
+def _recent_tree_size(name):
+    try:
+        with open(os.path.join(cache_root(), TREE_SIZES_FILE), "r", encoding="utf-8") as f:
+            size, measured = json.load(f)[name]
+        return int(size) if time.time() - measured < TREE_SIZE_TTL else None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _record_tree_size(name, size):
+    path = os.path.join(cache_root(), TREE_SIZES_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            sizes = json.load(f)
+        if not isinstance(sizes, dict):
+            sizes = {}
+    except (OSError, ValueError):
+        sizes = {}
+    sizes[name] = [size, time.time()]
+    try:
+        atomic_write(path, json.dumps(sizes))
+    except OSError:
+        pass
+
+
+def _tree_stats(root):
+    total, newest = 0, 0.0
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            total += st.st_size
+            newest = max(newest, st.st_mtime)
+    return total, newest
+
+
+def _remove_stale(path, now):
+    try:
+        if now - os.lstat(path).st_mtime > STALE_TMP_SECONDS:
+            _remove(path)
+    except OSError:
+        pass
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
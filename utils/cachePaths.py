@@ -0,0 +1,27 @@
+import os
+
+
+def cache_root():
+    """Base directory for Terminalik's local caches (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("TERMINALIK_CACHE_DIR")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        base = os.path.join(xdg, "terminalik")
+    os.makedirs(base, exist_ok=True)
+    return base
+
+
+def config_dir():
+    """Directory for Terminalik's settings and credentials (honours XDG_CONFIG_HOME)."""
+    base = os.environ.get("TERMINALIK_CONFIG_DIR")
+    if not base:
+        xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+        base = os.path.join(xdg, "terminalik")
+    os.makedirs(base, mode=0o700, exist_ok=True)
+    return base
+
+
+def cache_dir(name):
+    path = os.path.join(cache_root(), name)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import signal
+import threading
+from typing import Optional, Set
+
+# Seconds a cancelled process group gets between SIGTERM and SIGKILL
+KILL_GRACE = 3.0
+
+
+class Cancelled(Exception):
+    """Raised inside a step or flow once its scope has been cancelled."""
+
+
+class CancelScope:
+    """Cancellation shared by one run: a flag, a cancellable timer and its processes.
+
+    Every command started under the scope runs in its own session, so ``cancel``
+    can signal the whole process group (npm and everything it spawned) instead
+    of only the direct child.
+    """
+
+    def __init__(self, event: Optional[threading.Event] = None) -> None:
+        self._event = event or threading.Event()
+        self._lock = threading.Lock()
+        self._pids: Set[int] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` seconds; returns True (early) once cancelled."""
+        return self._event.wait(timeout)
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise Cancelled("cancelled")
+
+    def register(self, pid: int) -> None:
+        with self._lock:
+            self._pids.add(pid)
+        # Started while cancel() was running: it missed this one
+        if self.cancelled:
+            _signal_group(pid, signal.SIGTERM)
+
+    def unregister(self, pid: int) -> None:
+        with self._lock:
+            self._pids.discard(pid)
+
+    def cancel(self) -> None:
+        self._event.set()
+        with self._lock:
+            pids = list(self._pids)
+        for pid in pids:
+            _signal_group(pid, signal.SIGTERM)
+        if pids:
+            timer = threading.Timer(KILL_GRACE, self._kill_remaining, args=(pids,))
+            timer.daemon = True
+            timer.start()
+
+    def _kill_remaining(self, pids) -> None:
+        with self._lock:
+            # Only groups whose leader we have not seen exit (its pid is not reused yet)
+            alive = [pid for pid in pids if pid in self._pids]
+        for pid in alive:
+            _signal_group(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+
+def _signal_group(pid: int, sig: int) -> None:
+    try:
+        if os.name == "nt":
+            os.kill(pid, sig)
+        else:
+            # Children run with start_new_session, so their pid is the group id
+            os.killpg(pid, sig)
+    except OSError:
+        pass
+
+
+_local = threading.local()
+
+
+def bind(scope: Optional[CancelScope]) -> None:
+    """Make ``scope`` the one commands started from this thread belong to."""
+    _local.scope = scope
+
+
+def current_scope() -> Optional[CancelScope]:
+    return getattr(_local, "scope", None)
@@ -0,0 +1,147 @@
+import json
+import os
+import stat
+import threading
+import time
+
+from utils.cachePaths import config_dir
+from utils.cancellation import Cancelled
+from utils.httpClient import session
+
+# Overridable so a local stand-in (benchmarks/fakeGithub.py) can replace GitHub
+GITHUB_URL = os.environ.get("TERMINALIK_GITHUB_URL", "https://github.com").rstrip("/")
+GITHUB_API_URL = os.environ.get("TERMINALIK_GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+# Seconds a cached /user profile is trusted without asking GitHub again
+PROFILE_TTL = int(os.environ.get("TERMINALIK_AUTH_TTL", "86400"))
+TOKEN_FILE = "github-token.json"
+TIMEOUT = 10
+
+
+class AuthError(RuntimeError):
+    pass
+
+
+def token_path():
+    return os.path.join(config_dir(), TOKEN_FILE)
+
+
+def load_token(path=None):
+    """Return the cached ``{token, user, etag, checked_at}`` or None.
+
+    The file is ignored unless it is a regular file owned by us and not readable
+    by group or others.
+    """
+    path = path or token_path()
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except OSError:
+        return None
+    with os.fdopen(fd, "r", encoding="utf-8") as f:
+        if os.name != "nt":
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                return None
+        try:
+            data = json.load(f)
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) and data.get("token") else None
+
+
+def save_token(token, user, etag=None, path=None):
+    path = path or token_path()
+    data = {"token": token, "user": user, "etag": etag, "checked_at": time.time()}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    # Created 0600 from the start; the token is never world-readable, even briefly
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+    return data
+
+
+def clear_token(path=None):
+    try:
+        os.remove(path or token_path())
+    except OSError:
+        pass
+
+
+def fetch_user(token, etag=None):
+    """GET /user. Returns ``(user, etag)``; ``user`` is None when GitHub answered 304."""
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"}
+    if etag:
+        headers["If-None-Match"] = etag
+    resp = session().get(f"{GITHUB_API_URL}/user", headers=headers, timeout=TIMEOUT)
+    if resp.status_code == 304:
+        return None, etag
+    if resp.status_code == 401:
+        raise AuthError("Cached token was rejected")
+    resp.raise_for_status()
+    return resp.json(), resp.headers.get("ETag")
+
+
+def cached_login(path=None):
+    """Log in from the token cache: no request while the profile is fresh, else one.
+
+    Returns the user profile, or None when the device flow is needed.
+    """
+    cached = load_token(path)
+    if not cached:
+        return None
+    if time.time() - cached.get("checked_at", 0) < PROFILE_TTL and cached.get("user"):
+        return cached["user"]
+    try:
+        user, etag = fetch_user(cached["token"], cached.get("etag"))
+    except AuthError:
+        clear_token(path)
+        return None
+    user = user or cached.get("user")
+    save_token(cached["token"], user, etag, path)
+    return user
+
+
+def request_device_code(client_id, scope="read:user"):
+    resp = session().post(
+        f"{GITHUB_URL}/login/device/code",
+        data={"client_id": client_id, "scope": scope},
+        headers={"Accept": "application/json"},
+        timeout=TIMEOUT,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def poll_access_token(client_id, device_code, interval, cancel=None):
+    """Poll until the user approves the device code; returns the access token.
+
+    Waits between polls on ``cancel`` (a ``threading.Event``), so setting it ends
+    the flow at once with ``Cancelled``.
+    """
+    cancel = cancel or threading.Event()
+    while True:
+        if cancel.is_set():
+            raise Cancelled("Device flow cancelled")
+        resp = session().post(
+            f"{GITHUB_URL}/login/oauth/access_token",
+            data={
+                "client_id": client_id,
+                "device_code": device_code,
+                "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
+            },
+            headers={"Accept": "application/json"},
+            timeout=TIMEOUT,
+        )
+        resp.raise_for_status()
+        token_data = resp.json()
+
+        if "access_token" in token_data:
+            return token_data["access_token"]
+        err = token_data.get("error")
+        if err == "slow_down":
+            interval += 5
+        if err in ("authorization_pending", "slow_down"):
+            cancel.wait(interval)
+            continue
+        raise AuthError(f"Device flow error: {token_data}")
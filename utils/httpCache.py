@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import time
+
+from utils import cacheManager
+from utils.cachePaths import cache_dir
+
+# Seconds a cached response is used without asking the server again
+DEFAULT_TTL = int(os.environ.get("TERMINALIK_HTTP_CACHE_TTL", "3600"))
+
+
+class HttpCache:
+    """Disk cache for small text documents, revalidated with ETag / Last-Modified."""
+
+    def __init__(self, namespace="http", ttl=DEFAULT_TTL):
+        self.namespace = namespace
+        self.root = cache_dir(namespace)
+        self.ttl = ttl
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.root, key + ".body"), os.path.join(self.root, key + ".json")
+
+    def load(self, url):
+        """Return ``(text, meta)`` from disk, or ``(None, None)`` when nothing is cached."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "r", encoding="utf-8") as f:
+                return f.read(), meta
+        except (OSError, ValueError):
+            return None, None
+
+    def is_fresh(self, meta):
+        return bool(meta) and time.time() - meta.get("fetched_at", 0) < self.ttl
+
+    def fetch(self, url, timeout=10):
+        """Fetch ``url``, sending validators from any cached copy.
+
+        Returns ``(text, changed)``; ``changed`` is False when the server answered
+        304 and the cached body is still current.
+        """
+        from utils.httpClient import session  # deferred: only needed once we go to the network
+
+        cached, meta = self.load(url)
+        headers = {}
+        if cached is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        resp = session().get(url, headers=headers, timeout=timeout)
+        if resp.status_code == 304 and cached is not None:
+            meta["fetched_at"] = time.time()
+            self._write(url, None, meta)
+            cacheManager.record_hit(self.namespace, len(cached))
+            return cached, False
+        resp.raise_for_status()
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self._write(url, resp.text, meta)
+        cacheManager.record_miss(self.namespace)
+        cacheManager.record_store(self.namespace, len(resp.content))
+        return resp.text, resp.text != cached
+
+    def _write(self, url, text, meta):
+        body_path, meta_path = self._paths(url)
+        if text is not None:
+            cacheManager.atomic_write(body_path, text)
+        cacheManager.atomic_write(meta_path, json.dumps(meta))
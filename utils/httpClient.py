@@ -0,0 +1,44 @@
+import threading
+
+# Idle connections kept per host, and hosts kept in the pool
+POOL_MAXSIZE = 8
+POOL_CONNECTIONS = 4
+USER_AGENT = "Terminalik"
+
+_session = None
+_lock = threading.Lock()
+
+
+def session():
+    """The app-wide ``requests.Session``.
+
+    Sharing one session keeps TCP/TLS connections alive between requests, so a
+    poll loop or a revalidation only pays for the handshake once per host.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _new_session()
+    return _session
+
+
+def _new_session():
+    # Deferred: requests is only imported once something goes to the network
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers["User-Agent"] = USER_AGENT
+    return s
+
+
+def close():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,129 @@
+import os
+import shutil
+import sys
+import time
+from abc import ABC, abstractmethod
+
+from utils import cacheManager
+from utils.cachePaths import cache_dir
+from utils.processRunner import run_and_log
+from utils.tracing import span
+
+# Values accepted by the form, the batch spec and TERMINALIK_INSTALLER
+INSTALLERS = ("auto", "uv", "pip")
+
+_BIN = "Scripts" if os.name == "nt" else "bin"
+_EXE = ".exe" if os.name == "nt" else ""
+
+
+def venv_executable(venv_dir, name):
+    return os.path.join(venv_dir, _BIN, name + _EXE)
+
+
+def wheelhouse_dir():
+    """Local wheels for offline installs; TERMINALIK_WHEELHOUSE overrides the cache location."""
+    return os.environ.get("TERMINALIK_WHEELHOUSE") or cache_dir("wheelhouse")
+
+
+def has_wheelhouse(path=None):
+    path = path or wheelhouse_dir()
+    try:
+        return any(name.endswith(".whl") for name in os.listdir(path))
+    except OSError:
+        return False
+
+
+class Installer(ABC):
+    """Creates a virtualenv and installs packages into it.
+
+    Subclasses only build the command lines; running, logging and timing are shared.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def venv_args(self, python, venv_dir, offline=False):
+        """Command line that creates ``venv_dir`` with ``python``."""
+
+    @abstractmethod
+    def install_args(self, venv_dir, packages, find_links=None):
+        """Command line that installs ``packages`` into ``venv_dir``."""
+
+    def create_venv(self, logger, python, venv_dir, cwd=None, offline=False):
+        return self._run(logger, "venv", self.venv_args(python, venv_dir, offline), cwd)
+
+    def install(self, logger, venv_dir, packages, cwd=None, find_links=None):
+        """Install ``packages``; with ``find_links`` only that directory is used (no index)."""
+        return self._run(logger, "install", self.install_args(venv_dir, packages, find_links), cwd,
+                         packages=len(packages), offline=bool(find_links))
+
+    def _run(self, logger, action, args, cwd, **extra):
+        with span(f"{self.name} {action}", cat="install", installer=self.name, **extra):
+            result = run_and_log(logger, args, cwd=cwd)
+        if result.ok:
+            logger(f"{self.name} {action}: {result.duration:.2f}s")
+        return result
+
+
+class PipInstaller(Installer):
+    name = "pip"
+
+    def venv_args(self, python, venv_dir, offline=False):
+        return [python, "-m", "venv", venv_dir]
+
+    def install_args(self, venv_dir, packages, find_links=None):
+        args = [venv_executable(venv_dir, "pip"), "install"]
+        if find_links:
+            args += ["--no-index", "--find-links", find_links]
+        return args + list(packages)
+
+
+class UvInstaller(Installer):
+    """``uv venv`` / ``uv pip install``: same result as pip, much faster resolver and installs."""
+
+    name = "uv"
+
+    def venv_args(self, python, venv_dir, offline=False):
+        # --seed puts pip into the venv like ``python -m venv`` does; it needs the index
+        args = ["uv", "venv", "--python", python]
+        return args + (["--offline"] if offline else ["--seed"]) + [venv_dir]
+
+    def install_args(self, venv_dir, packages, find_links=None):
+        args = ["uv", "pip", "install", "--python", venv_executable(venv_dir, "python")]
+        if find_links:
+            args += ["--offline", "--no-index", "--find-links", find_links]
+        return args + list(packages)
+
+
+_BACKENDS = {"pip": PipInstaller, "uv": UvInstaller}
+
+
+def get_installer(name=None):
+    """Resolve an installer name; ``auto`` prefers uv when it is on PATH, else pip."""
+    name = (name or os.environ.get("TERMINALIK_INSTALLER") or "auto").lower()
+    if name == "auto":
+        name = "uv" if shutil.which("uv") else "pip"
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown installer {name!r}; expected one of {', '.join(INSTALLERS)}")
+    return _BACKENDS[name]()
+
+
+def build_wheelhouse(dependencies, logger=print, python=None, dest=None):
+    """Build wheels for ``dependencies`` (and everything they need) into the wheelhouse.
+
+    Needs network access once; afterwards setups can install with ``offline``.
+    """
+    python = python or os.environ.get("TERMINALIK_PYTHON", sys.executable)
+    dest = dest or wheelhouse_dir()
+    os.makedirs(dest, exist_ok=True)
+    logger(f"Building wheels for {', '.join(dependencies)} into {dest}...")
+    started = time.perf_counter()
+    with span("build wheelhouse", cat="install", packages=len(dependencies)):
+        args = [python, "-m", "pip", "wheel", "--wheel-dir", dest] + list(dependencies)
+        result = run_and_log(logger, args)
+    if not result.ok:
+        logger("Building the wheelhouse failed.")
+        return False
+    cacheManager.record_store("wheelhouse")
+    logger(f"Wheelhouse ready in {time.perf_counter() - started:.1f}s: {dest}")
+    return True
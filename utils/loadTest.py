@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import telemetry
+from utils.cancellation import CancelScope
+
+HOST = "127.0.0.1"
+# Endpoints every generated backend has: (name, path)
+ENDPOINTS = (
+    ("admin login", "/admin/login/"),
+    ("health", "/api/health/"),
+)
+READY_PATH = "/api/health/"
+DEFAULT_DURATION = float(os.environ.get("TERMINALIK_LOADTEST_SECONDS", "10"))
+DEFAULT_CONCURRENCY = int(os.environ.get("TERMINALIK_LOADTEST_CONCURRENCY", "16"))
+# Seconds the server gets to answer its first health check, and each request
+READY_TIMEOUT = 60.0
+REQUEST_TIMEOUT = 10.0
+STOP_GRACE = 5.0
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    path: str
+    duration: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    # Failed requests by kind ("HTTP 500", "TimeoutError", "ConnectionRefusedError", ...)
+    error_kinds: Dict[str, int] = field(default_factory=dict)
+    # Seconds per successful request, in completion order; a refused connection
+    # or a timeout says nothing about how fast the app answers
+    latencies: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """Successful responses per second."""
+        return (self.requests - self.errors) / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of the latencies, in seconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "duration": round(self.duration, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "error_kinds": dict(self.error_kinds),
+            "throughput_rps": round(self.throughput, 1),
+            "latency_ms": {
+                "p50": round(self.percentile(50) * 1000, 2),
+                "p95": round(self.percentile(95) * 1000, 2),
+                "p99": round(self.percentile(99) * 1000, 2),
+                "max": round(max(self.latencies, default=0.0) * 1000, 2),
+            },
+        }
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def server_command(backend_dir: str, port: int) -> Tuple[List[str], str]:
+    """The command that serves ``backend_dir`` the way the project is set up to run.
+
+    The production profile (``gunicorn.conf.py``) is tested under gunicorn with
+    its generated settings; otherwise Django's development server is used.
+    """
+    bin_dir = os.path.join(backend_dir, "venv", "Scripts" if os.name == "nt" else "bin")
+    exe = ".exe" if os.name == "nt" else ""
+    python = os.path.join(bin_dir, "python" + exe)
+    gunicorn = os.path.join(bin_dir, "gunicorn" + exe)
+    if os.path.isfile(os.path.join(backend_dir, "gunicorn.conf.py")) and os.path.isfile(gunicorn):
+        # Access logs off: one line per request would measure the log, not the app
+        return [gunicorn, "-c", "gunicorn.conf.py", "--bind", f"{HOST}:{port}",
+                "--access-logfile", "/dev/null", "core.wsgi"], "gunicorn"
+    return [python, "manage.py", "runserver", f"{HOST}:{port}", "--noreload"], "runserver"
+
+
+async def _fetch(conn, port: int, path: str):
+    """One GET on a keep-alive connection. Returns ``(status, conn or None if closed)``."""
+    if conn is None:
+        conn = await asyncio.open_connection(HOST, port)
+    reader, writer = conn
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {HOST}:{port}\r\nUser-Agent: Terminalik-loadtest\r\n"
+        f"Accept: */*\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed before a response")
+    version, status = status_line.split(b" ", 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    keep = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        # Body runs until the server closes the connection
+        await reader.read()
+        keep = False
+    if not keep:
+        writer.close()
+        conn = None
+    return int(status), conn
+
+
+async def _load_endpoint(port: int, name: str, path: str, duration: float, concurrency: int,
+                         scope: Optional[CancelScope]) -> EndpointResult:
+    result = EndpointResult(name, path)
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        conn = None
+        while time.perf_counter() < deadline and not (scope is not None and scope.cancelled):
+            t0 = time.perf_counter()
+            try:
+                status, conn = await asyncio.wait_for(_fetch(conn, port, path), REQUEST_TIMEOUT)
+                error = f"HTTP {status}" if status >= 400 else None
+            except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                if conn is not None:
+                    conn[1].close()
+                conn, error = None, type(e).__name__
+            result.requests += 1
+            if error is None:
+                result.latencies.append(time.perf_counter() - t0)
+            else:
+                result.errors += 1
+                result.error_kinds[error] = result.error_kinds.get(error, 0) + 1
+        if conn is not None:
+            conn[1].close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.duration = time.perf_counter() - started
+    return result
+
+
+async def wait_ready(port: int, proc: subprocess.Popen, timeout: float = READY_TIMEOUT,
+                     scope: Optional[CancelScope] = None) -> bool:
+    """Poll the health view until it answers 200; False if the server exits or times out."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None or (scope is not None and scope.cancelled):
+            return False
+        try:
+            status, conn = await asyncio.wait_for(_fetch(None, port, READY_PATH), REQUEST_TIMEOUT)
+            if conn is not None:
+                conn[1].close()
+            if status == 200:
+                return True
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        await asyncio.sleep(0.2)
+    return False
+
+
+async def run_load(port: int, duration: float, concurrency: int,
+                   scope: Optional[CancelScope] = None,
+                   endpoints=ENDPOINTS) -> List[EndpointResult]:
+    """Load each endpoint in turn for ``duration`` seconds with ``concurrency`` connections."""
+    results = []
+    for name, path in endpoints:
+        if scope is not None and scope.cancelled:
+            break
+        results.append(await _load_endpoint(port, name, path, duration, concurrency, scope))
+    return results
+
+
+def format_results(results: List[EndpointResult]) -> str:
+    lines = [f"{'endpoint':<14} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+             f"{'errors':>8}"]
+    for r in results:
+        p50, p95, p99 = (r.percentile(p) * 1000 for p in (50, 95, 99))
+        lines.append(
+            f"{r.name:<14} {r.throughput:8.1f} {p50:8.2f} {p95:8.2f} {p99:8.2f} {r.error_rate:7.1%}"
+        )
+    # Latencies above are of successful responses only; say what the rest were
+    for r in results:
+        if r.error_kinds:
+            ranked = sorted(r.error_kinds.items(), key=lambda kv: -kv[1])
+            kinds = ", ".join(f"{kind} x{n}" for kind, n in ranked)
+            lines.append(f"{r.name} errors: {kinds}")
+    return "\n".join(lines)
+
+
+def run_benchmark(project_dir: str, logger: Callable[[str], None],
+                  duration: float = DEFAULT_DURATION, concurrency: int = DEFAULT_CONCURRENCY,
+                  scope: Optional[CancelScope] = None) -> Optional[dict]:
+    """Serve the project's backend on localhost, load it and report.
+
+    Returns the report (also written to ``.terminalik/benchmarks/``), or None
+    when the backend is missing or never became ready.
+    """
+    backend_dir = os.path.join(project_dir, "backend")
+    if not os.path.isfile(os.path.join(backend_dir, "manage.py")):
+        logger("No Django backend to benchmark; run the Django setup first.")
+        return None
+    out_dir = os.path.join(project_dir, ".terminalik", "benchmarks")
+    os.makedirs(out_dir, exist_ok=True)
+    port = free_port()
+    args, server = server_command(backend_dir, port)
+    server_log = os.path.join(out_dir, "server.log")
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    logger(f"Starting {server} on http://{HOST}:{port} (output in {server_log})...")
+    with open(server_log, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(args, cwd=backend_dir, env=env, stdin=subprocess.DEVNULL,
+                                stdout=log, stderr=subprocess.STDOUT,
+                                start_new_session=os.name != "nt")
+    if scope is not None:
+        scope.register(proc.pid)
+    try:
+        t0 = time.perf_counter()
+        if not asyncio.run(wait_ready(port, proc, scope=scope)):
+            if scope is None or not scope.cancelled:
+                logger(f"Backend did not become ready on {READY_PATH}; see {server_log}")
+            return None
+        logger(f"Ready in {time.perf_counter() - t0:.2f}s. Loading {len(ENDPOINTS)} endpoint(s) "
+               f"for {duration:.0f}s each with {concurrency} connection(s)...")
+        results = asyncio.run(run_load(port, duration, concurrency, scope))
+    finally:
+        _stop(proc)
+        if scope is not None:
+            scope.unregister(proc.pid)
+    if scope is not None and scope.cancelled:
+        logger("Benchmark cancelled.")
+        return None
+    logger(format_results(results))
+    report = {
+        "project": os.path.basename(os.path.abspath(project_dir)),
+        "server": server,
+        "command": " ".join(args),
+        "duration": duration,
+        "concurrency": concurrency,
+        "created": time.time(),
+        "python": sys.version.split()[0],
+        "host": telemetry.host_info(),
+        "endpoints": [r.to_dict() for r in results],
+    }
+    path = os.path.join(out_dir, f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger(f"Benchmark report written to {path}")
+    return report
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    if proc.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            proc.terminate()
+        else:
+            # gunicorn's workers and runserver's children go with the group
+            os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(STOP_GRACE)
+    except (OSError, subprocess.TimeoutExpired):
+        try:
+            if os.name == "nt":
+                proc.kill()
+            else:
+                os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        proc.wait()
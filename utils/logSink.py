@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Callable, List
+
+# How often buffered lines are pushed to the UI, and the most lines per push
+LOG_REFRESH_HZ = 30
+MAX_BATCH_LINES = 1000
+# Lines held while the UI falls behind; older ones are dropped (the run log keeps them)
+MAX_PENDING_LINES = 20000
+
+
+class BatchedLogSink:
+    """Thread-safe line buffer that is drained in batches on the UI thread.
+
+    Producers call ``push`` from any thread; the owning widget calls ``flush``
+    from a timer, so a burst of output becomes one write per tick instead of
+    one UI message per line. At most ``max_pending`` lines wait; when the UI
+    stalls the oldest are dropped and counted, so memory stays bounded.
+    """
+
+    def __init__(self, write_batch: Callable[[List[str]], None], max_batch: int = MAX_BATCH_LINES,
+                 max_pending: int = MAX_PENDING_LINES) -> None:
+        self._write_batch = write_batch
+        self._max_batch = max_batch
+        self._lines: deque[str] = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self._dropped_unreported = 0
+
+    def push(self, line: str) -> None:
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self.dropped += 1
+                self._dropped_unreported += 1
+            self._lines.append(line)
+
+    @property
+    def pending(self) -> int:
+        return len(self._lines)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._lines:
+                return
+            count = min(len(self._lines), self._max_batch)
+            batch = [self._lines.popleft() for _ in range(count)]
+            if self._dropped_unreported:
+                batch.insert(0, f"... {self._dropped_unreported} line(s) skipped while the display "
+                                "caught up (the run log has them all)")
+                self._dropped_unreported = 0
+        self._write_batch(batch)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import bisect
+import mmap
+import os
+import re
+import threading
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+
+class RunLog:
+    """Append-only log file for one setup run, with an in-memory line offset index.
+
+    Only the offsets (8 bytes per line) stay in memory; line text is read back
+    through ``mmap`` when the viewer jumps or searches.
+    """
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._file = open(path, "wb")
+        self._offsets = array("Q")
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_project(cls, project_dir: str) -> "RunLog":
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return cls(os.path.join(project_dir, ".terminalik", "logs", f"setup-{stamp}.log"))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def append(self, text: str) -> None:
+        """Append ``text``, indexing each of its physical lines as a line of its own."""
+        # splitlines matches how ``lines`` reads them back, so offsets and line numbers agree
+        chunks = [
+            line.encode("utf-8", errors="replace") + b"\n" for line in text.splitlines() or [""]
+        ]
+        with self._lock:
+            if self._file.closed:
+                return
+            for data in chunks:
+                self._offsets.append(self._size)
+                self._size += len(data)
+            self._file.write(b"".join(chunks))
+
+    def lines(self, start: int, count: int) -> List[str]:
+        """Return up to ``count`` lines starting at 0-based line ``start``."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+            end = min(len(self._offsets), start + count)
+            if start >= end:
+                return []
+            lo = self._offsets[start]
+            hi = self._offsets[end] if end < len(self._offsets) else self._size
+        with self._map() as mm:
+            chunk = mm[lo:hi] if mm is not None else b""
+        return chunk.decode("utf-8", errors="replace").splitlines()
+
+    def search(self, pattern: str, limit: int = 500, flags: int = 0) -> List[Tuple[int, str]]:
+        """Return ``(line_number, text)`` for the first ``limit`` lines matching ``pattern``."""
+        regex = re.compile(pattern.encode("utf-8"), flags | re.MULTILINE)
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+            offsets = self._offsets[:]
+            size = self._size
+        hits: List[Tuple[int, str]] = []
+        with self._map() as mm:
+            if mm is None:
+                return hits
+            last = -1
+            for match in regex.finditer(mm, 0, size):
+                lineno = bisect.bisect_right(offsets, match.start()) - 1
+                if lineno == last:
+                    continue
+                last = lineno
+                lo = offsets[lineno]
+                hi = mm.find(b"\n", lo)
+                line = mm[lo:hi if hi != -1 else len(mm)]
+                hits.append((lineno, line.decode("utf-8", errors="replace")))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def _map(self) -> "_MapContext":
+        return _MapContext(self.path)
+
+
+class _MapContext:
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None
+
+    def __enter__(self) -> Optional[mmap.mmap]:
+        self._fh = open(self._path, "rb")
+        if os.fstat(self._fh.fileno()).st_size == 0:
+            return None
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def __exit__(self, *exc) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        if self._fh is not None:
+            self._fh.close()
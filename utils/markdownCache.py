@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+
+from markdown_it import MarkdownIt
+from markdown_it import __version__ as MARKDOWN_IT_VERSION
+from markdown_it.token import Token
+
+from utils import cacheManager
+from utils.cachePaths import cache_dir
+
+# Parsed documents kept on disk; oldest are dropped past this
+MAX_ENTRIES = 32
+
+
+class CachedMarkdownIt(MarkdownIt):
+    """MarkdownIt whose ``parse`` results are stored on disk by source hash.
+
+    Pass as ``Markdown(parser_factory=CachedMarkdownIt)`` so an unchanged
+    document skips tokenizing on later launches.
+    """
+
+    def __init__(self, config="gfm-like", **kwargs):
+        super().__init__(config, **kwargs)
+        self._config_name = config if isinstance(config, str) else "custom"
+
+    def parse(self, src, env=None):
+        if env:
+            return super().parse(src, env)
+        ident = f"{MARKDOWN_IT_VERSION}\0{self._config_name}\0{src}"
+        digest = hashlib.sha256(ident.encode("utf-8")).hexdigest()
+        path = os.path.join(cache_dir("markdown"), digest + ".json")
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            tokens = [Token.from_dict(d) for d in json.loads(raw)]
+            cacheManager.touch(path)
+            cacheManager.record_hit("markdown", len(raw))
+            return tokens
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        tokens = super().parse(src, env)
+        cacheManager.record_miss("markdown")
+        try:
+            data = json.dumps([t.as_dict() for t in tokens])
+            cacheManager.atomic_write(path, data)
+            cacheManager.record_store("markdown", len(data))
+            _evict(os.path.dirname(path))
+        except OSError:
+            pass
+        return tokens
+
+
+def _evict(root):
+    entries = sorted(
+        (os.path.getmtime(os.path.join(root, name)), os.path.join(root, name))
+        for name in os.listdir(root)
+        if name.endswith(".json")
+    )
+    for _, path in entries[:-MAX_ENTRIES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
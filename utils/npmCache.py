@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import tempfile
+
+from utils import cacheManager
+from utils.cachePaths import cache_dir
+from utils.processRunner import run_and_log
+
+# Pinned create-vite release used for reproducible (and offline) frontends
+CREATE_VITE_VERSION = os.environ.get("TERMINALIK_CREATE_VITE_VERSION", "7.1.0")
+TEMPLATE = "vue-ts"
+WARM_MARKER = ".terminalik-warm.json"
+
+
+def npm_cache_dir():
+    """npm's content cache, kept inside the Terminalik cache so it can be shipped to CI."""
+    return cache_dir(os.path.join("npm", "_cacache"))
+
+
+def template_dir():
+    templates = cache_dir(os.path.join("npm", "templates"))
+    return os.path.join(templates, f"create-vite-{CREATE_VITE_VERSION}-{TEMPLATE}")
+
+
+def is_warm():
+    return os.path.isfile(os.path.join(template_dir(), WARM_MARKER))
+
+
+def warm_cache(logger=print):
+    """Fetch the pinned template, resolve its lockfile and fill the npm cache.
+
+    Needs network access once; afterwards ``install_args`` can run fully offline.
+    """
+    if not shutil.which("node") or not shutil.which("npm"):
+        logger("Node.js and npm are required to warm the npm cache.")
+        return False
+    target = template_dir()
+    with tempfile.TemporaryDirectory(prefix="terminalik-vite-") as tmp:
+        logger(f"Fetching create-vite@{CREATE_VITE_VERSION} ({TEMPLATE})...")
+        create = ["npm", "create", "--cache", npm_cache_dir(), f"vite@{CREATE_VITE_VERSION}",
+                  "frontend", "--", "--template", TEMPLATE]
+        ok = run_and_log(logger, create, cwd=tmp).ok
+        app_dir = os.path.join(tmp, "frontend")
+        # A full install (not just --package-lock-only) so every tarball lands in the cache
+        install = ["npm", "install", "--cache", npm_cache_dir()]
+        ok = ok and run_and_log(logger, install, cwd=app_dir).ok
+        if not ok or not os.path.isfile(os.path.join(app_dir, "package-lock.json")):
+            logger("Warming the npm cache failed.")
+            return False
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(app_dir, target, ignore=shutil.ignore_patterns("node_modules"))
+    with open(os.path.join(target, WARM_MARKER), "w", encoding="utf-8") as f:
+        json.dump({"create_vite": CREATE_VITE_VERSION, "template": TEMPLATE}, f)
+    cacheManager.record_store("npm")
+    logger(f"npm cache warm: {target}")
+    return True
+
+
+def materialize(frontend_dir):
+    """Copy the pinned template (with its package-lock.json) into ``frontend_dir``."""
+    shutil.copytree(template_dir(), frontend_dir, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns(WARM_MARKER))
+    cacheManager.record_hit("npm")
+
+
+def install_args():
+    """``npm ci`` fully offline against the local cache; call once ``is_warm()``."""
+    return ["npm", "ci", "--offline", "--no-audit", "--no-fund", "--cache", npm_cache_dir()]
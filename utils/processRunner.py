@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Iterable, List, Optional
+
+from utils import cancellation, resourceLimiter, telemetry, tracing
+
+# Longest single output line we accept before asyncio gives up on it
+LINE_LIMIT = 1024 * 1024
+
+
+class CommandFailed(Exception):
+    """Raised by ``CommandResult.check`` for a command that did not exit 0."""
+
+
+@dataclass
+class CommandResult:
+    args: List[str]
+    returncode: int
+    duration: float
+    # Total bytes of output seen, and the most we ever held in memory at once
+    output_bytes: int = 0
+    peak_output_bytes: int = 0
+    lines: int = 0
+    error: Optional[str] = None
+    # Seconds spent waiting for a heavy-command slot before it started
+    queue_wait: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    def check(self) -> "CommandResult":
+        """Return ``self``, or raise ``CommandFailed`` if the command failed."""
+        if not self.ok:
+            raise CommandFailed(f"{' '.join(self.args)} exited {self.returncode}")
+        return self
+
+    def summary(self) -> str:
+        status = "ok" if self.ok else f"exit {self.returncode}"
+        queued = f" after {self.queue_wait:.2f}s queued" if self.queue_wait >= 0.01 else ""
+        return (
+            f"$ {' '.join(self.args)} -> {status} in {self.duration:.2f}s{queued}, "
+            f"{self.lines} lines / {self.output_bytes} bytes (peak {self.peak_output_bytes} bytes)"
+        )
+
+
+async def stream_command(
+    args: List[str],
+    cwd: Optional[str] = None,
+    on_line: Optional[Callable[[str], None]] = None,
+    env: Optional[dict] = None,
+    scope: Optional[cancellation.CancelScope] = None,
+    on_spawn: Optional[Callable[[int], None]] = None,
+    on_exit: Optional[Callable[[int], Optional[Callable[[], None]]]] = None,
+) -> CommandResult:
+    """Run ``args`` and hand each output line to ``on_line`` as soon as it arrives.
+
+    stdout and stderr are merged. Only the current line is buffered, so memory use
+    stays flat no matter how chatty the command is. The command gets its own
+    session (process group), which ``scope.cancel()`` terminates as a whole;
+    ``on_spawn`` gets its pid, which is also that session's id, and ``on_exit``
+    gets it again once the output has closed, before the process is waited for.
+    ``on_exit`` runs on the event loop and must be quick; a callable it returns
+    runs in the loop's default executor, holding up only this command.
+    """
+    args = [str(a) for a in args]
+    started = time.perf_counter()
+    if scope is not None and scope.cancelled:
+        return CommandResult(args, -1, 0.0, error="cancelled")
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=cwd,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=LINE_LIMIT,
+            start_new_session=os.name != "nt",
+        )
+    except (OSError, ValueError) as e:
+        return CommandResult(args, 127, time.perf_counter() - started, error=str(e))
+
+    result = CommandResult(args, 0, 0.0)
+    assert proc.stdout is not None
+    if scope is not None:
+        scope.register(proc.pid)
+    if on_spawn is not None:
+        on_spawn(proc.pid)
+    try:
+        while True:
+            try:
+                raw = await proc.stdout.readline()
+            except ValueError:
+                # Line longer than LINE_LIMIT: take what is buffered and carry on
+                raw = await proc.stdout.read(LINE_LIMIT)
+            if not raw:
+                break
+            result.lines += 1
+            result.output_bytes += len(raw)
+            result.peak_output_bytes = max(result.peak_output_bytes, len(raw))
+            if on_line is not None:
+                on_line(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+        if on_exit is not None:
+            follow_up = on_exit(proc.pid)
+            if follow_up is not None:
+                await asyncio.get_running_loop().run_in_executor(None, follow_up)
+        result.returncode = await proc.wait()
+    finally:
+        if scope is not None:
+            scope.unregister(proc.pid)
+    if scope is not None and scope.cancelled:
+        result.error = "cancelled"
+    result.duration = time.perf_counter() - started
+    return result
+
+
+async def run_many(
+    commands: Iterable[tuple],
+    on_line: Optional[Callable[[str], None]] = None,
+) -> List[CommandResult]:
+    """Run several ``(args, cwd)`` commands concurrently on the current event loop."""
+    runs = (stream_command(args, cwd, on_line) for args, cwd in commands)
+    return list(await asyncio.gather(*runs))
+
+
+class _ProcessLoop:
+    """One background event loop that owns every child process we spawn.
+
+    Synchronous callers (the setup generators run in scheduler threads) submit
+    coroutines here instead of each blocking on its own ``subprocess.run``.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="terminalik-processes", daemon=True
+                ).start()
+            return self._loop
+
+    def submit(self, coro) -> "asyncio.Future":
+        return asyncio.run_coroutine_threadsafe(coro, self.get())
+
+
+process_loop = _ProcessLoop()
+
+
+def run_and_log(logger, args, cwd=None, env=None) -> CommandResult:
+    """Run a command on the shared process loop, streaming its output to ``logger``.
+
+    Must not be called from the process loop itself; async code should await
+    ``stream_command`` directly. Raises ``Cancelled`` when the thread's cancel
+    scope (see ``cancellation.bind``) was cancelled before or during the command.
+
+    Installs and builds (see ``resourceLimiter.is_heavy``) first wait for a
+    heavy-command slot (and a place in the thread's session limit, see
+    ``resourceLimiter.bind``) and run at the configured nice/ionice priority.
+    """
+    command = " ".join(str(a) for a in args)
+    scope = cancellation.current_scope()
+    monitor = telemetry.current_monitor()
+    on_spawn = on_exit = None
+    if monitor is not None:
+        on_spawn = partial(monitor.register, tracing.current_step())
+        on_exit = partial(monitor.command_exited, tracing.current_step())
+    slot = None
+    if resourceLimiter.is_heavy(args):
+        with tracing.span(f"queue {command}", cat="queue", command=command) as queue_args:
+            session = resourceLimiter.current_limit()
+            slot = resourceLimiter.acquire(scope, session)
+            queue_args.update(slot=slot.index, limit=slot.limit)
+        if slot.waited >= 0.01:
+            per_session = f", {session.limit} per session" if session is not None else ""
+            logger(f"Waited {slot.waited:.2f}s for a heavy-command slot "
+                   f"({slot.limit} at a time{per_session})")
+        args = slot.prefix + list(args)
+    try:
+        with tracing.span(command, cat="command", command=command, cwd=cwd) as span_args:
+            run = stream_command(args, cwd, logger, env, scope, on_spawn, on_exit)
+            result = process_loop.submit(run).result()
+            span_args.update(returncode=result.returncode, output_bytes=result.output_bytes)
+    finally:
+        if slot is not None:
+            slot.release()
+    if slot is not None:
+        result.queue_wait = slot.waited
+    if result.error:
+        logger(f"Command error: {' '.join(result.args)} -> {result.error}")
+    elif not result.ok:
+        logger(f"Command failed ({result.returncode}): {' '.join(result.args)}")
+    logger(result.summary())
+    if scope is not None:
+        scope.check()
+    return result
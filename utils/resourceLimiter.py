@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from typing import List, Optional
+
+from utils import settings
+from utils.cachePaths import cache_dir
+from utils.cancellation import CancelScope, Cancelled
+
+try:
+    import fcntl
+except ImportError:  # Windows: slots are only shared within this process
+    fcntl = None
+
+# Seconds between attempts to take a slot
+POLL_INTERVAL = 0.1
+
+# Commands that download, compile or write many files; everything else runs at once
+_HEAVY_SUBCOMMANDS = {
+    "npm": {"install", "i", "ci", "create", "run", "exec"},
+    "npx": None,
+    "pnpm": {"install", "i", "add", "create", "run"},
+    "yarn": {"install", "add", "create", "run"},
+    "pip": {"install", "wheel", "download"},
+    "uv": {"pip", "venv", "sync"},
+}
+_IONICE_ARGS = {"best-effort": ["-c", "2", "-n", "7"], "idle": ["-c", "3"]}
+
+_local_lock = threading.Lock()
+_local_held: set = set()
+_bound = threading.local()
+
+
+def is_heavy(args: List[str]) -> bool:
+    """Whether ``args`` is an install or a build that should wait for a slot."""
+    args = [str(a) for a in args]
+    if not args:
+        return False
+    name = os.path.basename(args[0]).lower()
+    if name.endswith(".exe"):
+        name = name[:-4]
+    rest = args[1:]
+    if name.startswith("python") and rest[:2] == ["-m", "pip"]:
+        name, rest = "pip", rest[2:]
+    elif name.startswith("pip"):
+        name = "pip"
+    if name not in _HEAVY_SUBCOMMANDS:
+        return False
+    subcommands = _HEAVY_SUBCOMMANDS[name]
+    first = next((a for a in rest if not a.startswith("-")), None)
+    return subcommands is None or first in subcommands
+
+
+def cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def available_memory() -> Optional[int]:
+    """MemAvailable in bytes, or None where /proc/meminfo does not exist."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def capacity(values: Optional[dict] = None) -> int:
+    values = values or settings.load()
+    return values["max_heavy_jobs"] or cpu_count()
+
+
+def priority_prefix(values: Optional[dict] = None) -> List[str]:
+    """``nice``/``ionice`` arguments to put in front of a heavy command."""
+    values = values or settings.load()
+    prefix: List[str] = []
+    if os.name == "nt":
+        return prefix
+    if values["nice"] and shutil.which("nice"):
+        prefix += ["nice", "-n", str(values["nice"])]
+    if values["ionice"] in _IONICE_ARGS and shutil.which("ionice"):
+        prefix += ["ionice"] + _IONICE_ARGS[values["ionice"]]
+    return prefix
+
+
+class SessionLimit:
+    """Heavy commands one session of a shared server may run at once.
+
+    Taken before a global slot, so one user scaffolding several projects cannot
+    hold every slot of the host while the other sessions queue behind them.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def acquire(self, scope: Optional[CancelScope] = None) -> None:
+        while not self._semaphore.acquire(timeout=POLL_INTERVAL):
+            if scope is not None and scope.cancelled:
+                raise Cancelled("cancelled while waiting for a slot")
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+def bind(limit: Optional[SessionLimit]) -> None:
+    """Make ``limit`` the session limit for heavy commands run by this thread."""
+    _bound.limit = limit
+
+
+def current_limit() -> Optional[SessionLimit]:
+    return getattr(_bound, "limit", None)
+
+
+class Slot:
+    """One heavy-command slot; ``release()`` hands it to the next waiter."""
+
+    def __init__(self, index: int, limit: int, waited: float, prefix: List[str], fd: Optional[int],
+                 session: Optional[SessionLimit] = None) -> None:
+        self.index = index
+        self.limit = limit
+        self.waited = waited
+        self.prefix = prefix
+        self._fd = fd
+        self._session = session
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)  # Closing drops the flock
+            self._fd = None
+        with _local_lock:
+            _local_held.discard(self.index)
+        if self._session is not None:
+            self._session.release()
+            self._session = None
+
+
+def acquire(scope: Optional[CancelScope] = None, session: Optional[SessionLimit] = None) -> Slot:
+    """Wait for a heavy-command slot under the saved limits.
+
+    Slots are lock files in the cache directory held with ``flock``, so the limit
+    covers every Terminalik process of this user on the host (batch workers,
+    several TUIs) and a crashed process frees its slot. Beyond the first slot,
+    one is only taken while ``memory_per_job_mb`` is still available. With a
+    ``session`` limit, one of its places is taken first. Raises ``Cancelled`` if
+    ``scope`` is cancelled while waiting.
+    """
+    values = settings.load()
+    limit = capacity(values)
+    needed = values["memory_per_job_mb"] * 1024 * 1024
+    started = time.perf_counter()
+    if session is not None:
+        session.acquire(scope)
+    try:
+        while True:
+            got = _try_acquire(limit, needed)
+            if got is not None:
+                index, fd = got
+                waited = time.perf_counter() - started
+                return Slot(index, limit, waited, priority_prefix(values), fd, session)
+            if scope is not None:
+                if scope.wait(POLL_INTERVAL):
+                    raise Cancelled("cancelled while waiting for a slot")
+            else:
+                time.sleep(POLL_INTERVAL)
+    except BaseException:
+        if session is not None:
+            session.release()
+        raise
+
+
+def _try_acquire(limit: int, needed: int):
+    for index in range(limit):
+        with _local_lock:
+            if index in _local_held:
+                continue
+            _local_held.add(index)
+        fd = _lock_slot(index)
+        if fd is False:
+            with _local_lock:
+                _local_held.discard(index)
+            continue
+        if index > 0:
+            # Others are running; only join them while there is memory to spare
+            free = available_memory()
+            if free is not None and free < needed:
+                if fd is not None:
+                    os.close(fd)
+                with _local_lock:
+                    _local_held.discard(index)
+                return None
+        return index, fd
+    return None
+
+
+def _lock_slot(index: int):
+    """An fd holding slot ``index``'s lock, False if it is taken, None without flock."""
+    if fcntl is None:
+        return None
+    path = os.path.join(cache_dir("slots"), f"heavy-{index}.lock")
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    return fd
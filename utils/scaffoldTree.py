@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from utils.tracing import span, write_text
+
+
+@dataclass
+class RenderResult:
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    # Files that only had patches and did not exist on disk
+    missing: List[str] = field(default_factory=list)
+    # Generated files taken back by ``revert``, and those kept because they were edited
+    reverted: List[str] = field(default_factory=list)
+    kept: List[str] = field(default_factory=list)
+
+
+class FileTree:
+    """In-memory description of a generator's output: whole files plus patches.
+
+    Nothing touches the disk until ``render``, which reads each file at most once,
+    applies all of its patches in order, and writes it only if the content hash
+    changed. Patches are written to be idempotent, so rendering the same tree
+    over an already generated project writes nothing.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._contents: Dict[str, str] = {}
+        self._patches: Dict[str, List[Callable[[str], str]]] = {}
+        self._order: List[str] = []
+        self._reverts: Dict[str, tuple] = {}
+
+    def _touch(self, path: str) -> None:
+        if path not in self._order:
+            self._order.append(path)
+
+    def add(self, path: str, content: str) -> "FileTree":
+        """Set the full content of ``path`` (relative to the root)."""
+        self._touch(path)
+        self._contents[path] = content
+        return self
+
+    def patch(self, path: str, fn: Callable[[str], str]) -> "FileTree":
+        self._touch(path)
+        self._patches.setdefault(path, []).append(fn)
+        return self
+
+    def replace(self, path: str, old: str, new: str) -> "FileTree":
+        """Replace ``old`` with ``new`` unless ``new`` is already there."""
+        return self.patch(path, lambda text: text if new in text else text.replace(old, new))
+
+    def sub(self, path: str, pattern: str, repl: str, count: int = 0, flags: int = 0) -> "FileTree":
+        return self.patch(path, lambda text: re.sub(pattern, repl, text, count=count, flags=flags))
+
+    def append(self, path: str, addition: str) -> "FileTree":
+        """Append ``addition`` unless the file already contains it."""
+        return self.patch(path, lambda text: text if addition in text else text + addition)
+
+    def block(self, path: str, begin: str, end: str, body: Optional[str],
+              after: Optional[str] = None) -> "FileTree":
+        """Keep exactly one ``begin``..``end`` block holding ``body``, or none if it is None.
+
+        Unlike ``replace``, this stays idempotent when ``body`` differs between
+        runs: the previous block is swapped out rather than added to.
+        """
+        return self.patch(path, lambda text: set_block(text, begin, end, body, after))
+
+    def revert(self, path: str, generated: str, original: Optional[str] = None) -> "FileTree":
+        """Take back a file a generator wrote as ``generated``: restore ``original``, or delete it.
+
+        A file that no longer matches ``generated`` was edited by the user and is kept.
+        """
+        self._reverts[path] = (generated, original)
+        return self
+
+    def render(self) -> RenderResult:
+        result = RenderResult()
+        with span(f"render {os.path.basename(self.root)}/", cat="file", files=len(self._order)):
+            for rel, (generated, original) in self._reverts.items():
+                _revert(os.path.join(self.root, rel), rel, generated, original, result)
+            for rel in self._order:
+                full = os.path.join(self.root, rel)
+                current = _read(full)
+                content: Optional[str] = self._contents.get(rel, current)
+                if content is None:
+                    result.missing.append(rel)
+                    continue
+                for fn in self._patches.get(rel, ()):
+                    content = fn(content)
+                if current is not None and content_hash(current) == content_hash(content):
+                    result.unchanged.append(rel)
+                    continue
+                os.makedirs(os.path.dirname(full) or ".", exist_ok=True)
+                write_text(full, content)
+                result.written.append(rel)
+        return result
+
+
+def set_block(text: str, begin: str, end: str, body: Optional[str],
+              after: Optional[str] = None) -> str:
+    """``text`` with the lines from ``begin`` to ``end`` replaced by a block holding ``body``.
+
+    ``begin`` and ``end`` are whole marker lines, indentation included. The block
+    is removed when ``body`` is None. A new block goes right after the first
+    line holding ``after``, or at the end of the text.
+    """
+    block = "" if body is None else f"{begin}\n{body.rstrip(chr(10))}\n{end}\n"
+    start = text.find(begin + "\n")
+    if start != -1 and (start == 0 or text[start - 1] == "\n"):
+        stop = text.find(end + "\n", start)
+        if stop != -1:
+            return text[:start] + block + text[stop + len(end) + 1:]
+    if after is not None and after in text:
+        line_end = text.find("\n", text.index(after))
+        at = len(text) if line_end == -1 else line_end + 1
+        if line_end == -1:
+            block = "\n" + block
+    else:
+        at = len(text)
+        if text and not text.endswith("\n"):
+            block = "\n" + block
+    return text[:at] + block + text[at:]
+
+
+def log_reverted(logger: Callable[[str], None], result: RenderResult) -> None:
+    """Report what ``revert`` took back, and what it left because it was edited."""
+    if result.reverted:
+        logger(f"Reverted generated files: {', '.join(result.reverted)}")
+    for rel in result.kept:
+        logger(f"Kept {rel}: it was edited after it was generated")
+
+
+def _revert(full: str, rel: str, generated: str, original: Optional[str],
+            result: RenderResult) -> None:
+    current = _read(full)
+    if current is None:
+        return
+    if current != generated:
+        if original is None or current != original:
+            result.kept.append(rel)
+        return
+    if original is not None:
+        write_text(full, original)
+    else:
+        os.remove(full)
+        if os.path.dirname(rel):
+            try:
+                # Drop a directory the generator created only for this file
+                os.rmdir(os.path.dirname(full))
+            except OSError:
+                pass
+    result.reverted.append(rel)
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
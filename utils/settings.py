@@ -0,0 +1,67 @@
+import json
+import os
+
+from utils.cachePaths import config_dir
+
+SETTINGS_FILE = "settings.json"
+IONICE_CLASSES = ("none", "best-effort", "idle")
+
+DEFAULTS = {
+    # Heavy commands (installs, builds) allowed at once across every Terminalik
+    # process of this user; 0 = one per CPU
+    "max_heavy_jobs": 0,
+    # Of those, how many one session of ``main.py serve`` may hold; 0 = no own limit
+    "session_heavy_jobs": 1,
+    # Free memory a heavy command needs before a second, third... one may start
+    "memory_per_job_mb": 1024,
+    # Priority heavy commands run at: nice 0-19 (0 = unchanged) and I/O class
+    "nice": 10,
+    "ionice": "best-effort",
+    # Size all caches together may take before least recently used entries go
+    "cache_budget_mb": 10240,
+}
+
+
+def settings_path():
+    return os.path.join(config_dir(), SETTINGS_FILE)
+
+
+def validate(values):
+    """Return ``values`` merged over the defaults; raises ValueError on a bad value."""
+    merged = dict(DEFAULTS)
+    for name, value in values.items():
+        if name not in DEFAULTS:
+            continue
+        if name == "ionice":
+            if value not in IONICE_CLASSES:
+                raise ValueError(f"ionice must be one of {', '.join(IONICE_CLASSES)}")
+            merged[name] = value
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a whole number")
+        if value < 0 or (name == "nice" and value > 19):
+            raise ValueError(f"{name} out of range: {value}")
+        merged[name] = value
+    return merged
+
+
+def load(path=None):
+    """The saved settings over the defaults; a missing or broken file gives the defaults."""
+    try:
+        with open(path or settings_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return validate(data if isinstance(data, dict) else {})
+    except (OSError, ValueError):
+        return dict(DEFAULTS)
+
+
+def save(values, path=None):
+    values = validate(values)
+    path = path or settings_path()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(values, f, indent=2)
+    os.replace(tmp, path)
+    return values
@@ -1,16 +1,169 @@
 import sys
 import os
-import subprocess
+import re
 import shutil
+from functools import partial
 
-def setup_django(self=None, is_unfold=False):
+from utils import cacheManager
+from utils import venvCache as venv_cache
+from utils.installers import get_installer, has_wheelhouse, wheelhouse_dir
+from utils.processRunner import run_and_log
+from utils.scaffoldTree import FileTree, log_reverted
+from utils.tracing import span
+
+# Bump when this generator's output changes; only its own step then reruns
+GENERATOR_VERSION = 5
+
+# PyPI packages installed into the backend venv (also what build-wheelhouse fetches)
+DEPENDENCIES = ["Django", "djangorestframework", "django-cors-headers"]
+UNFOLD_DEPENDENCIES = ["django-unfold"]
+# Production profile: WSGI server and the client for the Redis cache backend
+PRODUCTION_DEPENDENCIES = ["gunicorn", "redis"]
+
+GUNICORN_CONF = """import multiprocessing
+import os
+
+# Generated by Terminalik. Every value can be overridden from the environment.
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+# The usual (2 x CPU) + 1 sync workers; set WEB_CONCURRENCY to pin it
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+# e.g. "uvicorn.workers.UvicornWorker" with core.asgi (pip install uvicorn)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+# Recycle workers now and then so slow leaks never add up
+max_requests = 1000
+max_requests_jitter = 100
+preload_app = True
+accesslog = "-"
+errorlog = "-"
+if os.path.isdir("/dev/shm"):
+    # Heartbeat files on tmpfs; a disk-backed /tmp can stall workers
+    worker_tmp_dir = "/dev/shm"
+"""
+
+# A DRF health check (database round trip included) for probes and the load test
+HEALTH_VIEWS = """from django.db import connection
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def health(request):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return Response({"status": "ok"})
+"""
+
+APP_URLS = """from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("health/", views.health, name="health"),
+]
+"""
+
+# Bounds of the generated blocks in settings.py and admin.py; each is replaced or
+# removed as a whole, so toggling an option either way leaves one current copy
+APPS_BEGIN = "    # --- Terminalik apps ---"
+APPS_END = "    # --- End of Terminalik apps ---"
+UNFOLD_BEGIN = "# --- Unfold admin (generated by Terminalik) ---"
+UNFOLD_END = "# --- End of Unfold admin ---"
+
+UNFOLD_SETTINGS = """UNFOLD = {
+    "SITE_TITLE": "Terminalik Admin",
+    "SITE_HEADER": "Terminalik Admin",
+    "SITE_URL": "/",
+    "SITE_SYMBOL": "settings"
+}"""
+
+UNFOLD_ADMIN_IMPORT = """from unfold.admin import ModelAdmin
+
+#@admin.register(MyModel)
+#class CustomAdminClass(ModelAdmin):
+#    pass"""
+
+# What generator versions before the blocks wrote, unmarked
+_LEGACY_APPS = re.compile(
+    r"(INSTALLED_APPS = \[\n)"
+    r"(?:    '(?:corsheaders|rest_framework|unfold|unfold\.contrib\.forms)',\n)+"
+)
+_LEGACY_UNFOLD_SETTINGS = "from pathlib import Path\n\n\n" + UNFOLD_SETTINGS + "\n"
+_LEGACY_UNFOLD_ADMIN = "\n" + UNFOLD_ADMIN_IMPORT + "\n"
+
+PRODUCTION_BEGIN = "# --- Production profile (generated by Terminalik) ---"
+PRODUCTION_END = "# --- End of production profile ---"
+PRODUCTION_SETTINGS = """
+# --- Production profile (generated by Terminalik) ---
+import os
+
+DEBUG = os.environ.get("DJANGO_DEBUG", "0") == "1"
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", SECRET_KEY)
+
+# Keep database connections open between requests instead of reconnecting each time
+DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DJANGO_CONN_MAX_AGE", "60"))
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    # Per-process; set REDIS_URL to share the cache between gunicorn workers
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "terminalik",
+        }
+    }
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# The production frontend image is served on port 8080
+CORS_ALLOWED_ORIGINS += ["http://localhost:8080", "http://127.0.0.1:8080"]
+
+# collectstatic gathers hashed files here; the proxy serves them, not Django
+STATIC_ROOT = BASE_DIR / "staticfiles"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+}
+# --- End of production profile ---
+"""
+
+
+def _strip_legacy_settings(text):
+    text = _LEGACY_APPS.sub(r"\1", text)
+    return text.replace(_LEGACY_UNFOLD_SETTINGS, "from pathlib import Path")
+
+
+def _production_settings(production, text):
+    """``settings.py`` with exactly one current production block, or none."""
+    start = text.find("\n" + PRODUCTION_BEGIN)
+    if start != -1:
+        end = text.find(PRODUCTION_END, start)
+        # Blocks from before the end marker run to the end of the file
+        rest = text[end + len(PRODUCTION_END):].lstrip("\n") if end != -1 else ""
+        text = text[:start] + ("\n" + rest if rest else "")
+    return text + PRODUCTION_SETTINGS if production else text
+
+def setup_django(self=None, is_unfold=False, installer=None, offline=False, production=False):
     logger = getattr(self, "log_line", print)
     logger("Setting up Django Project...")
 
     # Check if python is available
     if not shutil.which("python") and not shutil.which("python3"):
-        print("Python is required to set up a Django project. Please install it and ensure it is available in PATH.")
-        return
+        raise RuntimeError(
+            "Python is required to set up a Django project. "
+            "Please install it and ensure it is available in PATH."
+        )
 
     # Determine project directory (supports being called with or without `self`)
     project_dir = getattr(self, "project_dir", os.getcwd())
@@ -19,20 +172,54 @@ def setup_django(self=None, is_unfold=False):
     backend_dir = os.path.join(project_dir, "backend")
     os.makedirs(backend_dir, exist_ok=True)
 
-    # Create virtual environment
-    _run_and_log(logger, [sys.executable, "-m", "venv", "venv"], cwd=backend_dir)
+    # Dependencies (PyPI package for Unfold is "django-unfold")
+    dependencies = list(DEPENDENCIES)
+    if is_unfold:
+        dependencies += UNFOLD_DEPENDENCIES
+    if production:
+        dependencies += PRODUCTION_DEPENDENCIES
 
-    # Determine pip executable
-    if os.name == "nt":
-        pip_executable = os.path.join(backend_dir, "venv", "Scripts", "pip.exe")
-    else:
-        pip_executable = os.path.join(backend_dir, "venv", "bin", "pip")
+    # uv when available (or as chosen), pip otherwise
+    installer = get_installer(installer)
+    find_links = None
+    if offline:
+        find_links = wheelhouse_dir()
+        if not has_wheelhouse(find_links):
+            cacheManager.record_miss("wheelhouse")
+            raise RuntimeError(
+                f"No wheels in {find_links}. Run `python main.py build-wheelhouse` first."
+            )
+        cacheManager.record_hit("wheelhouse")
+    logger(f"Installing with {installer.name}" + (f" from {find_links}" if find_links else ""))
 
-    # Install dependencies (PyPI package for Unfold is "django-unfold")
-    dependencies = ["Django", "djangorestframework", "django-cors-headers"]
-    if is_unfold:
-        dependencies.append("django-unfold")
-    _run_and_log(logger, [pip_executable, "install"] + dependencies, cwd=backend_dir)
+    # Reuse a cached venv template for this Python + dependency set if we have one
+    venv_dir = os.path.join(backend_dir, "venv")
+    # Interpreter used to create the venv (overridable, e.g. by the benchmark suite)
+    base_python = os.environ.get("TERMINALIK_PYTHON", sys.executable)
+    key = venv_cache.cache_key(dependencies, python=base_python, installer=installer.name)
+    cached = venv_cache.lookup(key)
+    venv_exists = os.path.isfile(os.path.join(venv_dir, "pyvenv.cfg"))
+    if cached and not os.path.exists(venv_dir):
+        logger(f"Cloning cached venv template {key}...")
+        with span("clone venv template", cat="cache", key=key):
+            venv_cache.clone(cached, venv_dir)
+    else:
+        # Create virtual environment (unless a previous run already did) and install dependencies
+        ok = venv_exists or installer.create_venv(
+            logger, base_python, venv_dir, cwd=backend_dir, offline=offline
+        ).ok
+        ok = ok and installer.install(
+            logger, venv_dir, dependencies, cwd=backend_dir, find_links=find_links
+        ).ok
+        if not ok:
+            raise RuntimeError(f"Could not create the backend venv with {installer.name}")
+        if not venv_exists:
+            try:
+                with span("store venv template", cat="cache", key=key):
+                    venv_cache.store(key, venv_dir)
+                logger(f"Stored venv template {key} in cache.")
+            except Exception as e:
+                logger(f"Could not cache venv template: {e}")
 
     # Create Django project
     if os.name == "nt":
@@ -40,38 +227,33 @@ def setup_django(self=None, is_unfold=False):
     else:
         django_admin = os.path.join(backend_dir, "venv", "bin", "django-admin")
 
-    _run_and_log(logger, [django_admin, "startproject", "core", "."], cwd=backend_dir)
+    # Both commands refuse to run over existing files, so skip them on a resumed run
+    if not os.path.exists(os.path.join(backend_dir, "manage.py")):
+        run_and_log(logger, [django_admin, "startproject", "core", "."], cwd=backend_dir).check()
 
-    # Create requirements.txt
-    with open(os.path.join(backend_dir, "requirements.txt"), "w") as f:
-        f.write("\n".join(dependencies))
+    # Create an app
+    if not os.path.exists(os.path.join(backend_dir, "terminalik")):
+        run_and_log(logger, [django_admin, "startapp", "terminalik"], cwd=backend_dir).check()
 
-    # Update settings.py
-    settings_path = os.path.join(backend_dir, "core", "settings.py")
-    with open(settings_path, "r") as f:
-        content = f.read()
+    # Describe every file edit, then write each file once
+    tree = FileTree(backend_dir)
+    tree.add("requirements.txt", "\n".join(dependencies))
 
+    # Update settings.py
+    settings = os.path.join("core", "settings.py")
+    tree.patch(settings, _strip_legacy_settings)
+    # Unfold must come before django.contrib.admin, so the block opens the list
+    apps = ["corsheaders", "rest_framework"]
     if is_unfold:
-        unfold_setting = """
-UNFOLD = {
-    "SITE_TITLE": "Terminalik Admin",
-    "SITE_HEADER": "Terminalik Admin",
-    "SITE_URL": "/",
-    "SITE_SYMBOL": "settings"
-}
-"""
-    content = content.replace(
-        "INSTALLED_APPS = [",
-        "INSTALLED_APPS = [\n    'corsheaders',\n    'rest_framework',\n    'unfold',\n    'unfold.contrib.forms',"
+        apps += ["unfold", "unfold.contrib.forms"]
+    apps_body = "\n".join(f"    '{app}'," for app in apps)
+    tree.block(settings, APPS_BEGIN, APPS_END, apps_body, after="INSTALLED_APPS = [")
+    unfold_settings = UNFOLD_SETTINGS if is_unfold else None
+    tree.block(
+        settings, UNFOLD_BEGIN, UNFOLD_END, unfold_settings, after="from pathlib import Path"
     )
-    if is_unfold:
-        content = content.replace(
-            "from pathlib import Path",
-            "from pathlib import Path\n\n" + unfold_setting
-        )
-    content = content.replace(
-        "MIDDLEWARE = [",
-        "MIDDLEWARE = [\n    'corsheaders.middleware.CorsMiddleware',"
+    tree.replace(
+        settings, "MIDDLEWARE = [", "MIDDLEWARE = [\n    'corsheaders.middleware.CorsMiddleware',"
     )
 
     # Add CORS settings at the end
@@ -83,47 +265,44 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 """
-    content += cors_settings
+    tree.append(settings, cors_settings)
 
     # Ensure ALLOWED_HOSTS allows dev via Docker
-    content = content.replace("ALLOWED_HOSTS = []", "ALLOWED_HOSTS = [\"*\", \"localhost\", \"127.0.0.1\"]")
-
-    with open(settings_path, "w") as f:
-        f.write(content)
+    tree.replace(
+        settings, "ALLOWED_HOSTS = []", "ALLOWED_HOSTS = [\"*\", \"localhost\", \"127.0.0.1\"]"
+    )
 
-    # Create an app
-    _run_and_log(logger, [django_admin, "startapp", "terminalik"], cwd=backend_dir)
+    # Health endpoint under /api/
+    tree.add(os.path.join("terminalik", "views.py"), HEALTH_VIEWS)
+    tree.add(os.path.join("terminalik", "urls.py"), APP_URLS)
+    urls = os.path.join("core", "urls.py")
+    tree.replace(urls, "from django.urls import path", "from django.urls import include, path")
+    tree.replace(
+        urls, "urlpatterns = [", 'urlpatterns = [\n    path("api/", include("terminalik.urls")),'
+    )
 
     # Add import to admin.py
-    if is_unfold:
-        unfold_admin_import = """from unfold.admin import ModelAdmin
+    admin = os.path.join("terminalik", "admin.py")
+    tree.patch(admin, lambda text: text.replace(_LEGACY_UNFOLD_ADMIN, ""))
+    tree.block(admin, UNFOLD_BEGIN, UNFOLD_END, UNFOLD_ADMIN_IMPORT if is_unfold else None)
 
-#@admin.register(MyModel)
-#class CustomAdminClass(ModelAdmin):
-#    pass"""
-
-    if is_unfold:
-        admin_path = os.path.join(backend_dir, "terminalik", "admin.py")
-        with open(admin_path, "a") as f:
-            f.write("\n" + unfold_admin_import + "\n")
+    tree.patch(settings, partial(_production_settings, production))
+    if production:
+        tree.add("gunicorn.conf.py", GUNICORN_CONF)
+    else:
+        tree.revert("gunicorn.conf.py", GUNICORN_CONF)
 
-    # Install requirements
-    _run_and_log(logger, [pip_executable, "install", "-r", "requirements.txt"], cwd=backend_dir)
+    rendered = tree.render()
+    if rendered.missing:
+        logger(f"Skipped edits to missing files: {', '.join(rendered.missing)}")
+    log_reverted(logger, rendered)
 
     # Migrate database
     py_exec = os.path.join(backend_dir, "venv", "bin", "python") if os.name != "nt" else os.path.join(backend_dir, "venv", "Scripts", "python.exe")
-    _run_and_log(logger, [py_exec, "manage.py", "migrate"], cwd=backend_dir)
+    run_and_log(logger, [py_exec, "manage.py", "migrate"], cwd=backend_dir).check()
+    if production:
+        collectstatic = [py_exec, "manage.py", "collectstatic", "--noinput"]
+        run_and_log(logger, collectstatic, cwd=backend_dir).check()
+        logger("Production profile: start with `gunicorn -c gunicorn.conf.py core.wsgi`.")
 
     logger("Django Project setup complete.")
-
-
-def _run_and_log(logger, args, cwd=None):
-    try:
-        res = subprocess.run(args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-        if res.stdout:
-            for line in res.stdout.splitlines():
-                logger(line)
-        if res.returncode != 0:
-            logger(f"Command failed ({res.returncode}): {' '.join(args)}")
-    except Exception as e:
-        logger(f"Command error: {' '.join(args)} -> {e}")
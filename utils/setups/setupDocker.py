@@ -1,54 +1,226 @@
 import os
 
-def setup_docker(self=None):
+from utils.scaffoldTree import FileTree, log_reverted
+
+# Bump when this generator's output changes; only its own step then reruns
+GENERATOR_VERSION = 4
+
+# Kept out of the build context: local envs, installed packages and build output
+BACKEND_DOCKERIGNORE = """venv/
+.venv/
+__pycache__/
+*.py[cod]
+db.sqlite3
+staticfiles/
+.terminalik/
+.git/
+.env
+Dockerfile
+.dockerignore
+"""
+
+# Production profile: static files straight from disk, everything else to gunicorn
+CADDYFILE_BACKEND = """{
+	admin off
+}
+
+:80 {
+	encode zstd gzip
+	handle_path /static/* {
+		root * /srv/static
+		# ManifestStaticFilesStorage puts a content hash in every file name
+		header Cache-Control "public, max-age=31536000, immutable"
+		file_server
+	}
+	reverse_proxy backend:8000
+}
+"""
+
+# Production profile: the built Vue app, precompressed, with long-lived caching for hashed assets
+CADDYFILE_FRONTEND = """{
+	admin off
+}
+
+:80 {
+	root * /srv
+	encode zstd gzip
+	handle /assets/* {
+		# Vite puts a content hash in every asset name
+		header Cache-Control "public, max-age=31536000, immutable"
+		file_server {
+			precompressed br gzip
+		}
+	}
+	handle {
+		# index.html (and client-side routes) must always be revalidated
+		header Cache-Control "no-cache"
+		try_files {path} /index.html
+		file_server {
+			precompressed br gzip
+		}
+	}
+}
+"""
+
+FRONTEND_DOCKERIGNORE = """node_modules/
+dist/
+.vite/
+coverage/
+.terminalik/
+.git/
+npm-debug.log*
+.env*.local
+Dockerfile
+.dockerignore
+"""
+
+def setup_docker(self=None, production=False):
     # Dockerfile in frontend
     logger = getattr(self, "log_line", print)
     project_dir = getattr(self, "project_dir", os.getcwd())
-    frontend_dir = os.path.join(project_dir, "frontend")
-    dockerfile_frontend = """
+    tree = FileTree(project_dir)
+    dockerfile_frontend = """# syntax=docker/dockerfile:1
 ARG NODE_VERSION=22-alpine
-FROM node:${NODE_VERSION}
+
+# Dependencies only: this layer is reused until package*.json changes
+FROM node:${NODE_VERSION} AS deps
+WORKDIR /app
+COPY package.json package-lock.json* ./
+RUN --mount=type=cache,target=/root/.npm \\
+    if [ -f package-lock.json ]; then npm ci --prefer-offline --no-audit --no-fund; \\
+    else npm install --no-audit --no-fund; fi
+
+# Production bundle (docker build --target build)
+FROM deps AS build
+COPY . .
+RUN npm run build
+
+# Dev server
+FROM node:${NODE_VERSION} AS dev
 WORKDIR /app
-COPY package*.json ./
-RUN npm install
+COPY --from=deps /app/node_modules ./node_modules
 COPY . .
 EXPOSE 5173
 CMD ["npm", "run", "dev", "--", "--host", "0.0.0.0", "--port", "5173"]
 """
-    with open(os.path.join(frontend_dir, "Dockerfile"), "w") as f:
-        f.write(dockerfile_frontend)
+    if production:
+        dockerfile_frontend += """
+# Runtime: only dist/ (with its .br/.gz siblings) behind Caddy; the default target
+FROM caddy:2-alpine AS runtime
+COPY Caddyfile /etc/caddy/Caddyfile
+COPY --from=build /app/dist /srv
+EXPOSE 80
+"""
+    tree.add(os.path.join("frontend", "Dockerfile"), dockerfile_frontend)
+    tree.add(os.path.join("frontend", ".dockerignore"), FRONTEND_DOCKERIGNORE)
+    if production:
+        tree.add(os.path.join("frontend", "Caddyfile"), CADDYFILE_FRONTEND)
+    else:
+        tree.revert(os.path.join("frontend", "Caddyfile"), CADDYFILE_FRONTEND)
 
     # Dockerfile in backend
-    backend_dir = os.path.join(project_dir, "backend")
-    dockerfile_backend = """
-FROM python:3.11-slim       
+    dockerfile_backend = """# syntax=docker/dockerfile:1
+ARG PYTHON_VERSION=3.11
+
+# Build the venv from requirements.txt alone so code changes reuse this layer
+FROM python:${PYTHON_VERSION}-slim AS builder
+ENV PIP_DISABLE_PIP_VERSION_CHECK=1
+RUN python -m venv /opt/venv
+ENV PATH="/opt/venv/bin:$PATH"
 WORKDIR /app
-COPY requirements.txt /app/
-RUN pip install --upgrade pip
-RUN pip install -r requirements.txt
-COPY . /app/
-EXPOSE 8000
-CMD ["python", "manage.py", "runserver", "0.0.0.0:8000"]       
+COPY requirements.txt .
+RUN --mount=type=cache,target=/root/.cache/pip \\
+    pip install -r requirements.txt
 """
-    with open(os.path.join(backend_dir, "Dockerfile"), "w") as f:
-        f.write(dockerfile_backend)
+    if production:
+        dockerfile_backend += """
+# Hashed static files, collected once per build
+FROM builder AS collect
+COPY . .
+RUN python manage.py collectstatic --noinput
 
-    logger("Dockerfiles created successfully.")
+# Static files are served by Caddy, not Django; it proxies everything else
+FROM caddy:2-alpine AS static
+COPY Caddyfile /etc/caddy/Caddyfile
+COPY --from=collect /app/staticfiles /srv/static
+"""
+    dockerfile_backend += """
+# Runtime: the venv and the code, no build caches or pip downloads
+FROM python:${PYTHON_VERSION}-slim AS runtime
+ENV PYTHONDONTWRITEBYTECODE=1 \\
+    PYTHONUNBUFFERED=1 \\
+    PATH="/opt/venv/bin:$PATH"
+WORKDIR /app
+COPY --from=builder /opt/venv /opt/venv
+COPY . .
+EXPOSE 8000
+"""
+    if production:
+        dockerfile_backend += """# The manifest lets {% static %} resolve hashed names
+COPY --from=collect /app/staticfiles /app/staticfiles
+CMD ["sh", "-c", \
+"python manage.py migrate --noinput && exec gunicorn -c gunicorn.conf.py core.wsgi"]
+"""
+    else:
+        dockerfile_backend += """CMD ["python", "manage.py", "runserver", "0.0.0.0:8000"]
+"""
+    tree.add(os.path.join("backend", "Dockerfile"), dockerfile_backend)
+    tree.add(os.path.join("backend", ".dockerignore"), BACKEND_DOCKERIGNORE)
+    if production:
+        tree.add(os.path.join("backend", "Caddyfile"), CADDYFILE_BACKEND)
+    else:
+        tree.revert(os.path.join("backend", "Caddyfile"), CADDYFILE_BACKEND)
 
     # Create docker-compose.yml in project root
-    docker_compose = """services:
-  frontend:
-    image: node:22-alpine
-    working_dir: /app
-    command: sh -lc \"(npm ci || npm install) && npm run dev -- --host 0.0.0.0 --port 5173\"
+    if production:
+        frontend_service = """  frontend:
+    build:
+      context: ./frontend
+      target: runtime
+    ports:
+      - "8080:80"
+    networks:
+      - app-network
+"""
+    else:
+        frontend_service = """  frontend:
+    build:
+      context: ./frontend
+      target: dev
     ports:
       - "5173:5173"
     networks:
       - app-network
     volumes:
       - ./frontend:/app
+      # Keep the image's node_modules instead of the host's
       - /app/node_modules
-  backend:
+"""
+    if production:
+        backend_service = """  backend:
+    build:
+      context: ./backend
+      target: runtime
+    environment:
+      - DJANGO_DEBUG=0
+      # - REDIS_URL=redis://redis:6379/0  # shared cache across workers
+    expose:
+      - "8000"
+    networks:
+      - app-network
+  proxy:
+    build:
+      context: ./backend
+      target: static
+    ports:
+      - "8000:80"
+    depends_on:
+      - backend
+    networks:
+      - app-network
+"""
+    else:
+        backend_service = """  backend:
     build: ./backend
     command: sh -lc \"python manage.py migrate && python manage.py runserver 0.0.0.0:8000\"
     ports:
@@ -56,15 +228,23 @@ CMD ["python", "manage.py", "runserver", "0.0.0.0:8000"]
     networks:
       - app-network
     volumes:
+      # The venv lives in /opt/venv, so mounting the code does not hide it
       - ./backend:/app
-
+"""
+    docker_compose = "services:\n" + frontend_service + backend_service + """
 networks:
   app-network:
     driver: bridge
 """
-    with open(os.path.join(project_dir, "docker-compose.yml"), "w") as f:
-        f.write(docker_compose)
+    tree.add("docker-compose.yml", docker_compose)
+
+    # Write all files in one pass; unchanged files are left alone
+    rendered = tree.render()
+    logger("Dockerfiles and .dockerignore files created successfully.")
     logger("docker-compose.yml created successfully.")
+    if rendered.unchanged:
+        logger(f"Already up to date: {', '.join(rendered.unchanged)}")
+    log_reverted(logger, rendered)
     logger("Docker setup complete.")
     
     
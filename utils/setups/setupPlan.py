@@ -0,0 +1,182 @@
+import os
+import time
+
+from utils.stepScheduler import Step, StepResult, format_summary, run_steps
+
+_BIN = "Scripts" if os.name == "nt" else "bin"
+_EXE = ".exe" if os.name == "nt" else ""
+
+DOCKER_FILES = (
+    os.path.join("backend", "Dockerfile"),
+    os.path.join("backend", ".dockerignore"),
+    os.path.join("frontend", "Dockerfile"),
+    os.path.join("frontend", ".dockerignore"),
+    "docker-compose.yml",
+)
+
+
+def build_steps(data):
+    """Turn the values collected by ``ProjectSetupForm`` into scheduler steps."""
+    # Generators (and what they import) load on first use, not at startup
+    from utils.setups import setupDjango, setupDocker, setupVue
+    from utils.installers import get_installer
+
+    steps = []
+    if data.get("backend_framework") == "django":
+        is_unfold = bool(data.get("include_unfold"))
+        installer = data.get("installer") or "auto"
+        production = bool(data.get("production"))
+        pip_offline = bool(data.get("pip_offline"))
+        outputs = [
+            os.path.join("backend", "manage.py"),
+            os.path.join("backend", "requirements.txt"),
+            os.path.join("backend", "core", "settings.py"),
+            os.path.join("backend", "terminalik", "urls.py"),
+            # Only present once Django is actually installed in the venv
+            os.path.join("backend", "venv", _BIN, "django-admin" + _EXE),
+        ]
+        if is_unfold:
+            outputs.append(os.path.join("backend", "terminalik", "admin.py"))
+        if production:
+            outputs.append(os.path.join("backend", "gunicorn.conf.py"))
+        steps.append(Step(
+            "django",
+            "Setting up Django",
+            lambda ctx: setupDjango.setup_django(
+                ctx,
+                is_unfold=is_unfold,
+                installer=installer,
+                offline=pip_offline,
+                production=production,
+            ),
+            inputs={
+                "version": setupDjango.GENERATOR_VERSION,
+                "is_unfold": is_unfold,
+                "production": production,
+                # "auto" resolves to uv or pip; switching installer or source reruns the install
+                "installer": get_installer(installer).name,
+                "offline": pip_offline,
+            },
+            outputs=tuple(outputs),
+            creates=("backend", os.path.join("backend", "venv")),
+        ))
+    if data.get("frontend_framework") == "vue":
+        vue_offline = bool(data.get("vue_offline"))
+        production = bool(data.get("production"))
+        outputs = (
+            os.path.join("frontend", "package.json"),
+            os.path.join("frontend", "index.html"),
+            # Written by npm only after a successful install
+            os.path.join("frontend", "node_modules", ".package-lock.json"),
+        )
+        if production:
+            outputs += (
+                os.path.join("frontend", "vite.config.ts"),
+                os.path.join("frontend", "scripts", "compress.mjs"),
+                os.path.join("frontend", "dist", "index.html"),
+            )
+        steps.append(Step(
+            "vue",
+            "Setting up Vue + Vite",
+            lambda ctx: setupVue.setup_vue(ctx, offline=vue_offline, production=production),
+            inputs={
+                "version": setupVue.GENERATOR_VERSION,
+                "offline": vue_offline,
+                "production": production,
+            },
+            outputs=outputs,
+            # A half-written node_modules is worse than none
+            creates=("frontend", os.path.join("frontend", "node_modules")),
+        ))
+    if data.get("include_docker"):
+        production = bool(data.get("production"))
+        docker_files = DOCKER_FILES
+        if production:
+            docker_files += (
+                os.path.join("backend", "Caddyfile"),
+                os.path.join("frontend", "Caddyfile"),
+            )
+        # Docker files go into backend/ and frontend/, so wait for those to exist
+        steps.append(Step(
+            "docker",
+            "Creating Docker files",
+            lambda ctx: setupDocker.setup_docker(ctx, production=production),
+            depends_on=("django", "vue"),
+            inputs={"version": setupDocker.GENERATOR_VERSION, "production": production},
+            outputs=docker_files,
+            creates=docker_files,
+        ))
+    return steps
+
+
+# Top-level paths the steps generate: a project with none of them counts as new,
+# and they are all a snapshot holds
+_PROJECT_ROOTS = ("backend", "frontend", "docker-compose.yml")
+
+
+def run_plan(
+    data, project_dir, logger, tracer=None, manifest=None, cancel=None, monitor=None, limit=None
+):
+    """Scaffold ``data`` into ``project_dir`` and return the step results.
+
+    A new project whose options match a stored snapshot is materialized from it
+    instead of running the steps; a fully successful run is stored for next time.
+    """
+    from utils import snapshotStore
+    from utils.installers import get_installer
+
+    steps = build_steps(data)
+    if not steps:
+        return []
+    key = None
+    if snapshotStore.enabled():
+        installer = get_installer(data.get("installer")).name
+        versions = {step.key: step.inputs["version"] for step in steps}
+        key = snapshotStore.snapshot_key(data, versions, installer)
+        entry = snapshotStore.lookup(key)
+        is_new = not any(os.path.lexists(os.path.join(project_dir, p)) for p in _PROJECT_ROOTS)
+        if entry and is_new and not (cancel is not None and cancel.cancelled):
+            return _restore(steps, entry, key, project_dir, logger, tracer, manifest)
+
+    results = run_steps(
+        steps,
+        project_dir,
+        logger,
+        tracer=tracer,
+        manifest=manifest,
+        cancel=cancel,
+        monitor=monitor,
+        limit=limit,
+    )
+    if key and all(r.ok for r in results) and not all(r.up_to_date for r in results):
+        try:
+            t0 = time.perf_counter()
+            snapshotStore.store(key, project_dir, _PROJECT_ROOTS)
+            logger(f"Stored snapshot {key} in {time.perf_counter() - t0:.2f}s")
+        except Exception as e:
+            logger(f"Could not store snapshot: {e}")
+    return results
+
+
+def _restore(steps, entry, key, project_dir, logger, tracer, manifest):
+    from utils import snapshotStore
+
+    logger(f"Materializing snapshot {key}...")
+    t0 = time.perf_counter()
+    if tracer is not None:
+        with tracer.span("materialize snapshot", cat="cache", key=key):
+            snapshotStore.materialize(entry, project_dir)
+    else:
+        snapshotStore.materialize(entry, project_dir)
+    elapsed = time.perf_counter() - t0
+    results = []
+    for step in steps:
+        if manifest is not None:
+            # Recorded as completed so later runs treat the restored files as current
+            manifest.start(step.key, step.inputs)
+            commands = [{"command": f"snapshot {key}", "cwd": None, "returncode": 0}]
+            manifest.finish(step.key, True, step.outputs, commands)
+        results.append(StepResult(step.key, step.title, True, skipped=True, from_snapshot=True))
+    logger(f"Restored from snapshot in {elapsed:.2f}s")
+    logger(format_summary(results, elapsed))
+    return results
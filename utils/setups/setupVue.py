@@ -1,84 +1,236 @@
+import json
 import os
-import subprocess
 import shutil
 import re
+import time
 
-def setup_vue(self=None):
+from utils import cacheManager
+from utils import npmCache as npm_cache
+from utils.processRunner import run_and_log
+from utils.scaffoldTree import FileTree, log_reverted
+from utils.tracing import span
+
+# Bump when this generator's output changes; only its own step then reruns
+GENERATOR_VERSION = 4
+
+# What create-vite's vue-ts template ships; restored when the production profile is off
+VITE_CONFIG_DEFAULT = """import { defineConfig } from 'vite'
+import vue from '@vitejs/plugin-vue'
+
+// https://vite.dev/config/
+export default defineConfig({
+  plugins: [vue()],
+})
+"""
+
+POSTBUILD = "node scripts/compress.mjs"
+
+# Production profile: vendor chunk, no sourcemaps, sizes reported by Terminalik
+VITE_CONFIG_PRODUCTION = """import { defineConfig } from 'vite'
+import vue from '@vitejs/plugin-vue'
+
+// Generated by Terminalik (production profile)
+export default defineConfig({
+  plugins: [vue()],
+  build: {
+    target: 'es2020',
+    sourcemap: false,
+    // Terminalik reports raw/gzip/brotli sizes after the build
+    reportCompressedSize: false,
+    rollupOptions: {
+      output: {
+        // Dependencies change less often than app code; keep them in a chunk of their own
+        manualChunks(id: string) {
+          if (id.includes('node_modules')) return 'vendor'
+        },
+      },
+    },
+  },
+})
+"""
+
+# Run by npm as "postbuild"; uses only node:zlib, so it adds no dependencies
+COMPRESS_SCRIPT = """// Generated by Terminalik: precompress dist/ so the static server \
+never compresses on the fly
+import { readdir, readFile, writeFile } from 'node:fs/promises'
+import { extname, join } from 'node:path'
+import { fileURLToPath } from 'node:url'
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib'
+
+const DIST = fileURLToPath(new URL('../dist/', import.meta.url))
+const TYPES = new Set(['.js', '.mjs', '.css', '.html', '.svg', '.json', '.txt', '.xml', '.wasm'])
+const MIN_SIZE = 1024
+
+async function* walk(dir) {
+  for (const entry of await readdir(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name)
+    if (entry.isDirectory()) yield* walk(path)
+    else yield path
+  }
+}
+
+for await (const file of walk(DIST)) {
+  if (!TYPES.has(extname(file))) continue
+  const data = await readFile(file)
+  if (data.length < MIN_SIZE) continue
+  await writeFile(`${file}.gz`, gzipSync(data, { level: 9 }))
+  await writeFile(`${file}.br`, brotliCompressSync(data, {
+    params: { [constants.BROTLI_PARAM_QUALITY]: 11, \
+[constants.BROTLI_PARAM_SIZE_HINT]: data.length },
+  }))
+}
+"""
+
+def setup_vue(self=None, offline=False, production=False):
     logger = getattr(self, "log_line", print)
     project_dir = getattr(self, "project_dir", os.getcwd())
 
     # Check if node and npm are available
     if not shutil.which("node") or not shutil.which("npm"):
-        logger("Node.js and npm are required to set up a Vue project. Please install them and ensure they are available in PATH.")
-        return
+        raise RuntimeError(
+            "Node.js and npm are required to set up a Vue project. "
+            "Please install them and ensure they are available in PATH."
+        )
 
     # Create project directory
     frontend_dir = os.path.join(project_dir, "frontend")
     os.makedirs(frontend_dir, exist_ok=True)
+    # On a resumed run the app is already scaffolded; only the install is repeated
+    scaffolded = os.path.exists(os.path.join(frontend_dir, "package.json"))
 
-    # Create Vue-ts project with Vite
-    _run_and_log(logger, ["npm", "create", "vite@latest", "frontend", "--", "--template", "vue-ts"], cwd=project_dir)
+    if offline:
+        # Pinned template + lockfile from the local cache, installed without the registry
+        if not npm_cache.is_warm():
+            cacheManager.record_miss("npm")
+            if not npm_cache.warm_cache(logger):
+                raise RuntimeError(
+                    "Cannot use the offline npm cache; it is not warm and warming failed."
+                )
+        if not scaffolded:
+            with span("materialize pinned template", cat="cache"):
+                npm_cache.materialize(frontend_dir)
+        run_and_log(logger, npm_cache.install_args(), cwd=frontend_dir).check()
+    else:
+        # Create Vue-ts project with Vite
+        if not scaffolded:
+            create = ["npm", "create", "vite@latest", "frontend", "--", "--template", "vue-ts"]
+            run_and_log(logger, create, cwd=project_dir).check()
 
-    # Install dependencies
-    _run_and_log(logger, ["npm", "install"], cwd=frontend_dir)
+        # Install dependencies
+        run_and_log(logger, ["npm", "install"], cwd=frontend_dir).check()
 
-    # Change content to reflect Terminalik
+    # Change content to reflect Terminalik; all edits are applied in memory, one write per file
+    tree = FileTree(frontend_dir)
     # Update <title> in index.html (handle variations of the default title)
-    index_html_path = os.path.join(frontend_dir, "index.html")
-    if os.path.exists(index_html_path):
-        with open(index_html_path, "r", encoding="utf-8") as f:
-            idx_content = f.read()
-        # Replace any title content with "Terminalik"
-        idx_content_new = re.sub(r"<title>.*?</title>", "<title>Terminalik</title>", idx_content, count=1, flags=re.IGNORECASE|re.DOTALL)
-        if idx_content_new != idx_content:
-            with open(index_html_path, "w", encoding="utf-8") as f:
-                f.write(idx_content_new)
+    tree.sub(
+        "index.html", r"<title>.*?</title>", "<title>Terminalik</title>",
+        count=1, flags=re.IGNORECASE | re.DOTALL,
+    )
 
     # Update HelloWorld message in App.vue if present
-    appvue_path = os.path.join(frontend_dir, "src", "App.vue")
-    if os.path.exists(appvue_path):
-        with open(appvue_path, "r", encoding="utf-8") as f:
-            app_content = f.read()
-        # Replace the msg attribute value on HelloWorld component if found
-        app_content_new = re.sub(r"(<HelloWorld\s+msg=)\"[^\"]*\"", r'\1"Terminalik + Vite + Vue"', app_content, count=1)
-        if app_content_new != app_content:
-            with open(appvue_path, "w", encoding="utf-8") as f:
-                f.write(app_content_new)
+    tree.sub(
+        os.path.join("src", "App.vue"),
+        r"(<HelloWorld\s+msg=)\"[^\"]*\"",
+        r'\1"Terminalik + Vite + Vue"',
+        count=1,
+    )
 
     # Ensure Node engine requirement for Vite 7+
-    pkg_json_path = os.path.join(frontend_dir, "package.json")
-    if os.path.exists(pkg_json_path):
-        try:
-            import json
-            with open(pkg_json_path, "r", encoding="utf-8") as f:
-                pkg = json.load(f)
-            engines = pkg.get("engines", {})
-            # Set a conservative engine range matching Vite's requirement
-            engines["node"] = ">=20.19 <21 || >=22.12"
-            pkg["engines"] = engines
-            with open(pkg_json_path, "w", encoding="utf-8") as f:
-                json.dump(pkg, f, indent=2)
-        except Exception:
-            pass
+    tree.patch("package.json", _set_node_engine)
 
     # Write a simple .nvmrc to hint local Node version
+    tree.add(".nvmrc", "22\n")
+
+    compress = os.path.join("scripts", "compress.mjs")
+    if production:
+        tree.add("vite.config.ts", VITE_CONFIG_PRODUCTION)
+        tree.add(compress, COMPRESS_SCRIPT)
+        tree.patch("package.json", _add_postbuild)
+    else:
+        # Take the profile back out, leaving anything the user has edited since
+        tree.revert("vite.config.ts", VITE_CONFIG_PRODUCTION, original=VITE_CONFIG_DEFAULT)
+        tree.revert(compress, COMPRESS_SCRIPT)
+        tree.patch("package.json", _remove_postbuild)
+
     try:
-        with open(os.path.join(frontend_dir, ".nvmrc"), "w", encoding="utf-8") as f:
-            f.write("22\n")
-    except Exception:
-        pass
+        log_reverted(logger, tree.render())
+    except Exception as e:
+        logger(f"Could not update frontend files: {e}")
 
+    if production:
+        run_and_log(logger, ["npm", "run", "build"], cwd=frontend_dir).check()
+        report_bundle_size(logger, project_dir, os.path.join(frontend_dir, "dist"))
 
     logger("Vue project setup complete.")
 
 
-def _run_and_log(logger, args, cwd=None):
+def _add_postbuild(text):
     try:
-        res = subprocess.run(args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-        if res.stdout:
-            for line in res.stdout.splitlines():
-                logger(line)
-        if res.returncode != 0:
-            logger(f"Command failed ({res.returncode}): {' '.join(args)}")
-    except Exception as e:
-        logger(f"Command error: {' '.join(args)} -> {e}")
+        pkg = json.loads(text)
+    except ValueError:
+        return text
+    pkg.setdefault("scripts", {})["postbuild"] = POSTBUILD
+    return json.dumps(pkg, indent=2)
+
+
+def _remove_postbuild(text):
+    try:
+        pkg = json.loads(text)
+    except ValueError:
+        return text
+    scripts = pkg.get("scripts")
+    if not isinstance(scripts, dict) or scripts.get("postbuild") != POSTBUILD:
+        return text
+    del scripts["postbuild"]
+    return json.dumps(pkg, indent=2)
+
+
+def bundle_size(dist_dir):
+    """Raw, gzip and brotli totals for ``dist_dir``, plus the largest files.
+
+    Files without a precompressed sibling count at their raw size.
+    """
+    files = []
+    for root, _dirs, names in os.walk(dist_dir):
+        for name in names:
+            if name.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(root, name)
+            raw = os.path.getsize(path)
+            sizes = {"raw": raw}
+            for enc, ext in (("gzip", ".gz"), ("br", ".br")):
+                sizes[enc] = os.path.getsize(path + ext) if os.path.exists(path + ext) else raw
+            files.append((os.path.relpath(path, dist_dir), sizes))
+    files.sort(key=lambda item: item[1]["raw"], reverse=True)
+    totals = {enc: sum(sizes[enc] for _, sizes in files) for enc in ("raw", "gzip", "br")}
+    return {"files": len(files), **totals, "largest": [{"path": p, **s} for p, s in files[:5]]}
+
+
+def report_bundle_size(logger, project_dir, dist_dir):
+    """Log the bundle size and append it to ``.terminalik/bundle-sizes.jsonl`` for tracking."""
+    report = bundle_size(dist_dir)
+    logger(f"Bundle: {report['files']} files, {report['raw'] / 1024:.1f} KiB "
+           f"(gzip {report['gzip'] / 1024:.1f} KiB, brotli {report['br'] / 1024:.1f} KiB)")
+    for item in report["largest"][:3]:
+        raw_kib, br_kib = item["raw"] / 1024, item["br"] / 1024
+        logger(f"  {item['path']}: {raw_kib:.1f} KiB (brotli {br_kib:.1f} KiB)")
+    history = os.path.join(project_dir, ".terminalik", "bundle-sizes.jsonl")
+    try:
+        os.makedirs(os.path.dirname(history), exist_ok=True)
+        with open(history, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": time.time(), **report}) + "\n")
+    except OSError as e:
+        logger(f"Could not record bundle size: {e}")
+    return report
+
+
+def _set_node_engine(text):
+    try:
+        pkg = json.loads(text)
+    except ValueError:
+        return text
+    engines = pkg.get("engines", {})
+    # Set a conservative engine range matching Vite's requirement
+    engines["node"] = ">=20.19 <21 || >=22.12"
+    pkg["engines"] = engines
+    return json.dumps(pkg, indent=2)
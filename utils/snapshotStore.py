@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import platform
+import re
+import secrets
+import shutil
+import sys
+import time
+
+from utils import cacheManager
+from utils.cachePaths import cache_dir
+from utils.venvCache import _link_or_copy, _marker_size, _relocate_file, _tree_size
+
+# Store size limit in MB; least recently used snapshots are evicted past it
+MAX_STORE_MB = int(os.environ.get("TERMINALIK_SNAPSHOT_CACHE_MB", "4096"))
+MARKER = ".terminalik-snapshot.json"
+# Package trees managed by pip/npm, which replace files rather than edit them in
+# place, so they can share inodes with the store; everything else is cloned
+HARDLINK_DIRS = (os.path.join("backend", "venv"), os.path.join("frontend", "node_modules"))
+# Holds the key startproject generated; every restored project gets a fresh one
+SECRET_KEY_FILE = os.path.join("backend", "core", "settings.py")
+_SECRET_KEY = re.compile(r"^(SECRET_KEY = )(['\"])[^'\"\n]*\2", re.MULTILINE)
+# The alphabet of django.core.management.utils.get_random_secret_key
+_SECRET_KEY_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*(-_=+)"
+# Options that change the generated tree; the project name and offline flags do not
+KEY_OPTIONS = (
+    "frontend_framework",
+    "backend_framework",
+    "include_docker",
+    "include_unfold",
+    "production",
+)
+
+_FICLONE = 0x40049409 if sys.platform.startswith("linux") else None
+
+
+def enabled():
+    return os.environ.get("TERMINALIK_SNAPSHOTS", "1") != "0"
+
+
+def snapshot_key(data, generator_versions, installer):
+    """Key a scaffold by its options, the versions of its generators, installer and interpreter."""
+    ident = {
+        "options": {name: data.get(name) for name in KEY_OPTIONS},
+        "generator": generator_versions,
+        "installer": installer,
+        "python": os.path.realpath(os.environ.get("TERMINALIK_PYTHON", sys.executable)),
+        "version": sys.version,
+        "machine": platform.machine(),
+    }
+    return hashlib.sha256(json.dumps(ident, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+
+def lookup(key):
+    """Return the stored snapshot for ``key`` or None. Marks it as recently used."""
+    entry = os.path.join(cache_dir("snapshots"), key)
+    marker = os.path.join(entry, MARKER)
+    if not os.path.isfile(marker):
+        cacheManager.record_miss("snapshots")
+        return None
+    cacheManager.touch(marker)
+    cacheManager.record_hit("snapshots", _marker_size(marker))
+    return entry
+
+
+def store(key, project_dir, roots, max_mb=None):
+    """Record the generated ``roots`` of a completed scaffold, then evict down to the size limit.
+
+    Only those top-level paths are copied; anything else in ``project_dir``
+    (``.git``, ``.env``, the run logs) never enters the shared store.
+    """
+    root = cache_dir("snapshots")
+    final = os.path.join(root, key)
+    if os.path.isfile(os.path.join(final, MARKER)):
+        return final
+    project_dir = os.path.abspath(project_dir)
+    tmp = os.path.join(root, f".{key}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    copy = _copier(project_dir)
+    os.makedirs(os.path.join(tmp, "tree"))
+    for name in roots:
+        src = os.path.join(project_dir, name)
+        dst = os.path.join(tmp, "tree", name)
+        if os.path.isdir(src) and not os.path.islink(src):
+            shutil.copytree(src, dst, symlinks=True, copy_function=copy)
+        elif os.path.lexists(src):
+            shutil.copy2(src, dst, follow_symlinks=False)
+    meta = {
+        "prefix": project_dir,
+        "relocate": _files_with(os.path.join(tmp, "tree"), project_dir.encode()),
+        "size": _tree_size(tmp),
+        "created": time.time(),
+    }
+    with open(os.path.join(tmp, MARKER), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp, final)
+    except OSError:
+        # Another run stored the same snapshot first
+        shutil.rmtree(tmp, ignore_errors=True)
+    else:
+        cacheManager.record_store("snapshots", meta["size"])
+    evict(max_mb if max_mb is not None else MAX_STORE_MB)
+    cacheManager.enforce_budget()
+    return final
+
+
+def materialize(entry, project_dir):
+    """Recreate a stored scaffold in ``project_dir`` and point it at its new location.
+
+    Package trees are hardlinked and other files cloned (reflink where the
+    filesystem supports it). The generators only embed the project through its
+    absolute path (venv scripts, ``pyvenv.cfg``), so that is the one substitution;
+    each such file is rewritten as a fresh copy and the stored one stays untouched.
+    The project name appears nowhere in the tree (the apps are always ``core``
+    and ``frontend``). Django's ``SECRET_KEY`` is the one per-project secret, so
+    it is regenerated rather than shared by every project restored from ``entry``.
+    """
+    with open(os.path.join(entry, MARKER), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    src = os.path.join(entry, "tree")
+    shutil.copytree(
+        src, project_dir, symlinks=True, copy_function=_copier(src), dirs_exist_ok=True
+    )
+    new_prefix = os.path.abspath(project_dir)
+    for rel in meta.get("relocate", []):
+        _relocate_file(os.path.join(project_dir, rel), meta["prefix"], new_prefix)
+    _renew_secret_key(os.path.join(project_dir, SECRET_KEY_FILE))
+    return meta
+
+
+def entries():
+    """``(path, size, last_used)`` for every stored snapshot, least recently used first."""
+    root = cache_dir("snapshots")
+    found = []
+    for name in os.listdir(root):
+        marker = os.path.join(root, name, MARKER)
+        if not os.path.isfile(marker):
+            continue
+        try:
+            with open(marker, "r", encoding="utf-8") as f:
+                size = int(json.load(f).get("size", 0))
+            found.append((os.path.join(root, name), size, os.path.getmtime(marker)))
+        except (OSError, ValueError):
+            continue
+    return sorted(found, key=lambda item: item[2])
+
+
+def evict(max_mb):
+    """Drop least recently used snapshots until the store fits in ``max_mb``.
+
+    Returns ``(removed, bytes_freed)``.
+    """
+    found = entries()
+    total = sum(size for _, size, _ in found)
+    limit = max_mb * 1024 * 1024
+    removed = freed = 0
+    for path, size, _ in found:
+        if total <= limit:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+        freed += size
+    return removed, freed
+
+
+def purge():
+    """Remove every snapshot. Returns ``(removed, bytes_freed)``."""
+    return evict(0)
+
+
+def _renew_secret_key(path):
+    """Give the settings at ``path`` a new key in startproject's format."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        return
+    key = "django-insecure-" + "".join(secrets.choice(_SECRET_KEY_CHARS) for _ in range(50))
+    text, found = _SECRET_KEY.subn(lambda m: f"{m.group(1)}{m.group(2)}{key}{m.group(2)}", text)
+    if found:
+        cacheManager.atomic_write(path, text)
+
+
+def _copier(root):
+    def copy(src, dst):
+        rel = os.path.relpath(src, root)
+        if any(rel == d or rel.startswith(d + os.sep) for d in HARDLINK_DIRS):
+            _link_or_copy(src, dst)
+        else:
+            _clone_file(src, dst)
+    return copy
+
+
+def _files_with(root, needle):
+    """Relative paths of files to relocate: venv scripts and small text files holding ``needle``."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        if any(rel_dir == d or rel_dir.startswith(d + os.sep) for d in HARDLINK_DIRS):
+            # Inside package trees only the venv's entry points and config embed the prefix
+            base = os.path.basename(dirpath)
+            if base == "venv":
+                filenames = [name for name in filenames if name == "pyvenv.cfg"]
+                dirnames[:] = [name for name in dirnames if name in ("bin", "Scripts")]
+            elif base not in ("bin", "Scripts"):
+                dirnames[:] = []
+                continue
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.islink(path) or os.path.getsize(path) > 1024 * 1024:
+                    continue
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            # Text only: a byte substitution would corrupt a binary file
+            if needle in data and b"\0" not in data:
+                found.append(os.path.relpath(path, root))
+    return found
+
+
+def _clone_file(src, dst):
+    """Copy-on-write clone where the filesystem supports it (btrfs, XFS), else a plain copy."""
+    if _FICLONE is not None:
+        try:
+            import fcntl
+
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
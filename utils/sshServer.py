@@ -0,0 +1,396 @@
+"""Serve Terminalik to many SSH users from one long-lived process (``main.py serve``).
+
+Every connection runs its own ``TerminalikApp`` on the server's event loop,
+drawn through ``SSHDriver`` instead of a local terminal. Sessions share what a
+process holds once: the modules imported before the first user connects, the
+README and the other caches, the loop that runs commands and the host-wide
+heavy-command slots. Each session gets a work directory of its own and its own
+``resourceLimiter.SessionLimit``.
+
+Needs the optional ``asyncssh`` dependency (``pip install terminalikssh[server]``).
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import math
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from textual import constants, events, messages
+from textual._xterm_parser import XTermParser
+from textual.driver import Driver
+from textual.geometry import Size
+
+from utils import resourceLimiter, settings, telemetry
+from utils.cacheManager import atomic_write
+from utils.cachePaths import config_dir
+
+DEFAULT_MAX_SESSIONS = int(os.environ.get("TERMINALIK_MAX_SESSIONS", "32"))
+HOST_KEY_FILE = "ssh_host_ed25519_key"
+# Imported before listening, so no session pays for them
+WARM_MODULES = (
+    "pages.readmeMarkdown",
+    "pages.projectSetup",
+    "pages.settings",
+    "components.projectSetupForm",
+    "utils.processRunner",
+    "utils.setups.setupPlan",
+    "utils.setups.setupDjango",
+    "utils.setups.setupVue",
+    "utils.setups.setupDocker",
+)
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]")
+
+_MOUSE_ON = "\x1b[?1000h\x1b[?1003h\x1b[?1015h\x1b[?1006h"
+_MOUSE_OFF = "\x1b[?1000l\x1b[?1003l\x1b[?1015l\x1b[?1006l"
+
+
+class SSHDriver(Driver):
+    """Textual driver for one SSH channel, running on the server's event loop.
+
+    Output goes straight to the channel (asyncssh buffers it) and input is read
+    by a task on the same loop rather than by LinuxDriver's thread, so an idle
+    session costs no threads. The channel comes from the app's ``ssh_process``.
+    """
+
+    def __init__(self, app, *, debug: bool = False, mouse: bool = True, size=None) -> None:
+        super().__init__(app, debug=debug, mouse=mouse, size=size)
+        self._process = app.ssh_process
+        self._parser = XTermParser(debug)
+        self._reader: Optional[asyncio.Task] = None
+        self._tick: Optional[asyncio.TimerHandle] = None
+
+    def write(self, data: str) -> None:
+        if self._process.is_closing():
+            return
+        try:
+            self._process.stdout.write(data)
+        except (OSError, RuntimeError):
+            pass  # The client went away; the reader ends the app
+
+    def flush(self) -> None:
+        pass
+
+    def start_application_mode(self) -> None:
+        self.write("\x1b[?1049h")  # Alt screen
+        if self._mouse:
+            self.write(_MOUSE_ON)
+        self.write("\x1b[?25l")  # Hide cursor
+        self.write("\x1b[?1004h")  # FocusIn/FocusOut
+        self.write("\x1b[?2004h")  # Bracketed paste
+        self._resize(*(self._size or (80, 24)))
+        self._reader = asyncio.create_task(self._read_input())
+
+    def disable_input(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._tick is not None:
+            self._tick.cancel()
+            self._tick = None
+
+    def stop_application_mode(self) -> None:
+        self.disable_input()
+        self.write("\x1b[?2004l")
+        if self._mouse:
+            self.write(_MOUSE_OFF)
+        self.write("\x1b[?1004l")
+        self.write("\x1b[?1049l")  # Back to the normal screen
+        self.write("\x1b[?25h")
+
+    async def _read_input(self) -> None:
+        import asyncssh
+
+        stdin = self._process.stdin
+        while True:
+            try:
+                data = await stdin.read(4096)
+            except asyncssh.TerminalSizeChanged as e:
+                self._resize(e.width, e.height)
+                continue
+            except (asyncssh.BreakReceived, asyncssh.SignalReceived):
+                continue
+            except (asyncssh.Error, OSError, UnicodeDecodeError):
+                break
+            if not data:
+                break
+            for event in self._parser.feed(data):
+                self.process_message(event)
+            if self._tick is None:
+                # A lone Escape is only a key once ESCDELAY passes without more input
+                self._tick = self._loop.call_later(
+                    constants.ESCAPE_DELAY + 0.01, self._flush_parser
+                )
+        self.send_message(messages.ExitApp())
+
+    def _flush_parser(self) -> None:
+        self._tick = None
+        for event in self._parser.tick():
+            self.process_message(event)
+
+    def _resize(self, width: int, height: int) -> None:
+        size = Size(width or 80, height or 24)
+        self.send_message(events.Resize(size, size))
+
+
+@dataclass
+class SessionStats:
+    id: int
+    user: str
+    peer: str
+    started: float
+    # Seconds from the session request to the app's first frame
+    startup: Optional[float] = None
+    # Growth of the process RSS while the session started; with sessions
+    # starting at the same time this includes some of theirs
+    rss_delta: Optional[int] = None
+    ended: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        if self.ended is not None:
+            data["duration"] = round(self.ended - self.started, 3)
+        return data
+
+
+def _percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+class TerminalikServer:
+    """Runs one app per SSH session and keeps per-session metrics.
+
+    ``<root>/.terminalik/server/server.json`` is rewritten on every session
+    start and end; each finished session is appended to ``sessions.jsonl``.
+    """
+
+    def __init__(self, app_class, root: str, max_sessions: int,
+                 session_heavy_jobs: Optional[int] = None) -> None:
+        self.app_class = app_class
+        self.root = os.path.abspath(root)
+        self.max_sessions = max_sessions
+        self.session_heavy_jobs = session_heavy_jobs
+        self.sessions: Dict[int, SessionStats] = {}
+        self.startups: List[float] = []
+        self.total = 0
+        self.baseline_rss: Optional[int] = None
+        self.started = time.time()
+        self.stats_dir = os.path.join(self.root, ".terminalik", "server")
+
+    def warm(self) -> float:
+        """Import everything a session needs; returns the seconds it took."""
+        t0 = time.perf_counter()
+        for name in WARM_MODULES:
+            importlib.import_module(name)
+        self.baseline_rss = telemetry.process_rss()
+        return time.perf_counter() - t0
+
+    async def handle(self, process) -> None:
+        """asyncssh ``process_factory``: one call per session, returns when it ends."""
+        t0 = time.perf_counter()
+        user = process.get_extra_info("username") or "anonymous"
+        peer = (process.get_extra_info("peername") or ("?",))[0]
+        if len(self.sessions) >= self.max_sessions:
+            process.stdout.write("Terminalik: every session is taken, try again later.\r\n")
+            process.exit(1)
+            return
+        if process.term_type is None:
+            process.stdout.write("Terminalik needs a terminal; connect with ssh -t.\r\n")
+            process.exit(1)
+            return
+        work_dir = self.session_dir(user)
+        if work_dir is None:
+            self._log(f"refused {user!r}@{peer}: no workspace for that name under {self.root}")
+            process.stdout.write("Terminalik: this user name cannot have a workspace.\r\n")
+            process.exit(1)
+            return
+        self.total += 1
+        stats = self.sessions[self.total] = SessionStats(self.total, user, peer, time.time())
+        rss_before = telemetry.process_rss()
+
+        def first_frame() -> None:
+            stats.startup = time.perf_counter() - t0
+            rss = telemetry.process_rss()
+            if rss is not None and rss_before is not None:
+                stats.rss_delta = rss - rss_before
+            self.startups.append(stats.startup)
+            memory = ""
+            if stats.rss_delta is not None:
+                memory = f", +{telemetry.format_bytes(stats.rss_delta)} RSS"
+            self._log(f"session {stats.id} {user}@{peer}: "
+                      f"first frame in {stats.startup:.2f}s{memory}")
+            self._write_stats()
+
+        heavy_jobs = self.session_heavy_jobs
+        if heavy_jobs is None:
+            heavy_jobs = settings.load()["session_heavy_jobs"]
+        try:
+            os.makedirs(work_dir, exist_ok=True)
+            app = self.app_class(
+                work_dir=work_dir,
+                session_limit=resourceLimiter.SessionLimit(heavy_jobs) if heavy_jobs else None,
+                shared=True,
+                on_first_frame=first_frame,
+                driver_class=SSHDriver,
+            )
+            app.ssh_process = process
+            width, height = process.term_size[:2]
+            self._log(f"session {stats.id} {user}@{peer}: opened in {work_dir} "
+                      f"({len(self.sessions)} active)")
+            await app.run_async(size=(width or 80, height or 24))
+        except Exception as e:
+            self._log(f"session {stats.id} {user}@{peer}: failed: {e}")
+        finally:
+            stats.ended = time.time()
+            del self.sessions[stats.id]
+            self._log(f"session {stats.id} {user}@{peer}: closed after "
+                      f"{stats.ended - stats.started:.0f}s ({len(self.sessions)} active)")
+            self._append_session(stats)
+            self._write_stats()
+            if not process.is_closing():
+                process.exit(0)
+
+    def session_dir(self, user: str) -> Optional[str]:
+        """The workspace of ``user`` directly under the root, or None if it would land elsewhere."""
+        name = _UNSAFE_NAME.sub("_", user)
+        # "." and ".." leave the root, and other dot names would share its .terminalik
+        if not name or name.startswith("."):
+            return None
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, name))
+        # A symlink under the root may still point outside it
+        return path if os.path.dirname(path) == root else None
+
+    def summary(self) -> dict:
+        """Process-wide numbers: memory per active session and startup latency percentiles."""
+        rss = telemetry.process_rss()
+        active = len(self.sessions)
+        per_session = None
+        if active and rss is not None and self.baseline_rss is not None:
+            per_session = max(0, rss - self.baseline_rss) // active
+        free = resourceLimiter.available_memory()
+        return {
+            "pid": os.getpid(),
+            "started": self.started,
+            "updated": time.time(),
+            "active": active,
+            "max_sessions": self.max_sessions,
+            "sessions_total": self.total,
+            "rss": rss,
+            "baseline_rss": self.baseline_rss,
+            "rss_per_session": per_session,
+            # More sessions the free memory would hold at today's cost each
+            "more_sessions_fit": free // per_session if free is not None and per_session else None,
+            "startup_s": {
+                "p50": _percentile(self.startups, 50),
+                "p95": _percentile(self.startups, 95),
+                "max": max(self.startups, default=None),
+            },
+            "host": telemetry.host_info(),
+            "sessions": [s.to_dict() for s in self.sessions.values()],
+        }
+
+    def _write_stats(self) -> None:
+        try:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            path = os.path.join(self.stats_dir, "server.json")
+            atomic_write(path, json.dumps(self.summary(), indent=2))
+        except OSError as e:
+            self._log(f"Could not write server stats: {e}")
+
+    def _append_session(self, stats: SessionStats) -> None:
+        try:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            with open(os.path.join(self.stats_dir, "sessions.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(stats.to_dict()) + "\n")
+        except OSError as e:
+            self._log(f"Could not record session {stats.id}: {e}")
+
+    @staticmethod
+    def _log(text: str) -> None:
+        # Running apps capture sys.stdout
+        print(f"{time.strftime('%H:%M:%S')} {text}", file=sys.__stdout__, flush=True)
+
+
+def load_host_key(path: Optional[str] = None):
+    """The server's host key, generated (ed25519, mode 0600) on first use."""
+    import asyncssh
+
+    path = path or os.path.join(config_dir(), HOST_KEY_FILE)
+    if not os.path.exists(path):
+        key = asyncssh.generate_private_key("ssh-ed25519")
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key.export_private_key())
+        print(f"Generated host key {path}")
+    return asyncssh.read_private_key(path)
+
+
+def serve(app_class, host: str, port: int, root: str, host_key: Optional[str] = None,
+          authorized_keys: Optional[str] = None, no_auth: bool = False,
+          max_sessions: int = DEFAULT_MAX_SESSIONS,
+          session_heavy_jobs: Optional[int] = None) -> int:
+    """Listen for SSH sessions until interrupted. Returns an exit code."""
+    try:
+        import asyncssh
+    except ImportError:
+        print("The SSH server needs asyncssh: pip install 'terminalikssh[server]'", file=sys.stderr)
+        return 2
+    if not no_auth:
+        authorized_keys = authorized_keys or os.path.expanduser("~/.ssh/authorized_keys")
+        if not os.path.isfile(authorized_keys):
+            print(f"No authorized keys at {authorized_keys}; pass --authorized-keys or --no-auth",
+                  file=sys.stderr)
+            return 2
+
+    class _Server(asyncssh.SSHServer):
+        def begin_auth(self, username: str) -> bool:
+            return not no_auth
+
+    # Apps pick their color system from the environment, which the clients cannot set here
+    os.environ.setdefault("COLORTERM", "truecolor")
+    server = TerminalikServer(app_class, root, max_sessions, session_heavy_jobs)
+    took = server.warm()
+    baseline = "unknown"
+    if server.baseline_rss is not None:
+        baseline = telemetry.format_bytes(server.baseline_rss)
+    print(f"Imported {len(WARM_MODULES)} modules in {took:.2f}s; RSS before sessions {baseline}")
+
+    async def _listen() -> None:
+        try:
+            key = load_host_key(host_key)
+        except (OSError, asyncssh.KeyImportError) as e:
+            raise SystemExit(f"Could not load the host key: {e}")
+        await asyncssh.create_server(
+            _Server,
+            host,
+            port,
+            server_host_keys=[key],
+            authorized_client_keys=None if no_auth else authorized_keys,
+            process_factory=server.handle,
+            # Keys go to the app as typed; asyncssh's line editor would echo them
+            line_editor=False,
+            encoding="utf-8",
+            errors="replace",
+        )
+        print(f"Serving Terminalik on ssh://{host}:{port} (up to {max_sessions} sessions, "
+              f"stats in {server.stats_dir})", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_listen())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Could not listen on {host}:{port}: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,73 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+_FIRST_FRAME = re.compile(r"^terminalik: first frame ([\d.]+)s")
+
+
+# What the app imports before its first frame: main and the first tab's page
+_IMPORT_SCRIPT = "import importlib, main; importlib.import_module(main.TAB_CONTENT['general'][0])"
+
+
+def profile_startup(main_path, top=25):
+    """Summarise where startup time went: per-module imports and time to first frame.
+
+    ``-X importtime`` reports on stderr, where Textual draws the UI, so imports
+    are measured in a separate interpreter that only imports what the app
+    loads at startup. The app then runs normally and writes its first-frame
+    time to the file named by ``TERMINALIK_STARTUP_PROFILE``; the report is
+    printed once it exits.
+    """
+    with tempfile.TemporaryDirectory(prefix="terminalik-profile-") as tmp:
+        imports_path = os.path.join(tmp, "importtime.log")
+        frame_path = os.path.join(tmp, "first-frame.log")
+        with open(imports_path, "w", encoding="utf-8") as log:
+            subprocess.call([sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT],
+                            stderr=log, cwd=os.path.dirname(main_path))
+        env = dict(os.environ, TERMINALIK_STARTUP_PROFILE=frame_path)
+        rc = subprocess.call([sys.executable, main_path], env=env)
+        text = ""
+        for path in (imports_path, frame_path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text += f.read()
+            except OSError:
+                pass
+        print(format_report(text, top))
+    return rc
+
+
+def format_report(text, top=25):
+    modules = []
+    first_frame = None
+    other = []
+    for line in text.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, name = m.groups()
+            # Top-level imports (one space of indent) sum to the total import time
+            modules.append((int(cumulative_us), int(self_us), len(indent) == 1, name))
+            continue
+        m = _FIRST_FRAME.match(line)
+        if m:
+            first_frame = float(m.group(1))
+        elif line.strip() and not line.startswith("import time:"):
+            other.append(line)
+
+    total_us = sum(cum for cum, _, top_level, _ in modules if top_level)
+    lines = ["Startup profile", "---------------"]
+    if first_frame is not None:
+        lines.append(f"Time to first frame: {first_frame * 1000:.1f} ms")
+    lines.append(f"Imports: {len(modules)} modules, {total_us / 1000:.1f} ms")
+    lines.append(f"{'cumulative':>12} {'self':>10}  module")
+    for cum, self_us, _, name in sorted(modules, reverse=True)[:top]:
+        lines.append(f"{cum / 1000:10.1f}ms {self_us / 1000:8.1f}ms  {name}")
+    # Anything else written while importing (tracebacks etc.)
+    if other:
+        lines.append("")
+        lines.extend(other)
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+MANIFEST_PATH = os.path.join(".terminalik", "manifest.json")
+MANIFEST_VERSION = 1
+
+
+class StepManifest:
+    """Per-project record of which setup steps ran, with what inputs and outputs.
+
+    Stored at ``.terminalik/manifest.json``. A step is up to date when it completed,
+    its inputs are unchanged and every output file still has the recorded hash.
+    """
+
+    def __init__(self, project_dir: str) -> None:
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, MANIFEST_PATH)
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self._steps = data.get("steps", {})
+        except (OSError, ValueError):
+            pass
+
+    def entry(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._steps.get(key)
+
+    def is_current(self, key: str, inputs: Dict[str, Any]) -> bool:
+        entry = self._steps.get(key)
+        if not entry or not entry.get("completed") or entry.get("inputs") != inputs:
+            return False
+        # A missing output (recorded or current) always means the step must run again
+        return all(
+            digest is not None and self._hash(rel) == digest
+            for rel, digest in entry.get("outputs", {}).items()
+        )
+
+    def start(self, key: str, inputs: Dict[str, Any]) -> None:
+        with self._lock:
+            self._steps[key] = {
+                "inputs": inputs,
+                "completed": False,
+                "started_at": time.time(),
+                "commands": [],
+                "outputs": {},
+            }
+            self._save()
+
+    def finish(
+        self,
+        key: str,
+        ok: bool,
+        outputs: Iterable[str] = (),
+        commands: Optional[List[Dict[str, Any]]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            entry = self._steps.setdefault(key, {"inputs": {}})
+            entry["completed"] = ok
+            entry["finished_at"] = time.time()
+            entry["commands"] = commands or []
+            entry["outputs"] = {rel: self._hash(rel) for rel in outputs} if ok else {}
+            if error:
+                entry["error"] = error
+            else:
+                entry.pop("error", None)
+            self._save()
+
+    def _hash(self, rel: str) -> Optional[str]:
+        digest = hashlib.sha256()
+        try:
+            with open(os.path.join(self.project_dir, rel), "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "steps": self._steps}, f, indent=2)
+        os.replace(tmp, self.path)
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import cancellation, resourceLimiter, telemetry, tracing
+from utils.stepManifest import StepManifest
+
+
+class StepContext:
+    """Stand-in for the ``self`` the setup generators expect.
+
+    Generators only look up ``log_line`` and ``project_dir`` on the object they
+    are given, so each step gets its own context that prefixes its log lines
+    with the step key. That keeps interleaved output from parallel steps readable.
+    """
+
+    def __init__(self, step: str, project_dir: str, logger: Callable[[str], None]) -> None:
+        self.step = step
+        self.project_dir = project_dir
+        self._logger = logger
+
+    def log_line(self, text: str) -> None:
+        self._logger(f"[{self.step}] {text}")
+
+
+@dataclass
+class Step:
+    key: str
+    title: str
+    run: Callable[[StepContext], None]
+    # Keys of steps that must finish before this one starts
+    depends_on: tuple = ()
+    # Options that change what the step produces, and the files (relative to the
+    # project) it produces; together they decide whether a rerun can skip it
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    outputs: tuple = ()
+    # Paths (relative to the project) the step creates; those that did not exist
+    # before it started are removed again if it is cancelled
+    creates: tuple = ()
+
+
+@dataclass
+class StepResult:
+    key: str
+    title: str
+    ok: bool
+    duration: float = 0.0
+    error: Optional[str] = None
+    skipped: bool = False
+    # Skipped because the manifest says it is already done
+    up_to_date: bool = False
+    cancelled: bool = False
+    # Materialized from the snapshot store instead of being run
+    from_snapshot: bool = False
+    # Peak CPU/RSS and disk I/O of the step's processes, when a monitor ran
+    usage: Optional[telemetry.StepUsage] = None
+    # Seconds its commands waited for a heavy-command slot
+    queue_wait: float = 0.0
+
+
+def run_steps(
+    steps: List[Step],
+    project_dir: str,
+    logger: Callable[[str], None],
+    max_workers: Optional[int] = None,
+    tracer: Optional[tracing.Tracer] = None,
+    manifest: Optional[StepManifest] = None,
+    cancel: Optional[cancellation.CancelScope] = None,
+    monitor: Optional[telemetry.ResourceMonitor] = None,
+    limit: Optional[resourceLimiter.SessionLimit] = None,
+) -> List[StepResult]:
+    """Run ``steps`` respecting their dependencies, independent ones in parallel.
+
+    Dependencies on steps that are not part of this run are ignored (e.g. Docker
+    without a Django step). A step fails when it raises or when any command it
+    ran exited non-zero; the steps depending on it are then skipped.
+    With a ``tracer``, each step and everything it runs is recorded as spans.
+
+    With a ``manifest``, steps whose inputs and outputs still match the last
+    completed run are skipped (unless a step they depend on ran again), and every
+    step that runs records its commands and output hashes.
+
+    Cancelling ``cancel`` kills the running steps' process groups, removes what
+    they had started to create and skips every step that has not started.
+
+    With a ``monitor``, the processes each step starts are sampled while it
+    runs and their peaks are attached to its result.
+
+    With a ``limit``, heavy commands of all the steps share its places on top
+    of the host-wide slots (one session of ``main.py serve``).
+    """
+    if tracer is None:
+        # Commands and queue waits are read back from the trace
+        tracer = tracing.Tracer()
+    by_key = {step.key: step for step in steps}
+    deps: Dict[str, set] = {
+        step.key: {d for d in step.depends_on if d in by_key} for step in steps
+    }
+    for key in deps:
+        _check_cycle(key, deps, [])
+
+    results: Dict[str, StepResult] = {}
+    running: Dict[Future, Step] = {}
+    ran: set = set()
+    started = time.perf_counter()
+
+    def _run_one(step: Step) -> StepResult:
+        ctx = StepContext(step.key, project_dir, logger)
+        if manifest is not None:
+            manifest.start(step.key, step.inputs)
+        new_paths = [
+            rel for rel in step.creates if not os.path.lexists(os.path.join(project_dir, rel))
+        ]
+        tracing.bind(tracer, step.key)
+        cancellation.bind(cancel)
+        telemetry.bind(monitor)
+        resourceLimiter.bind(limit)
+        if monitor is not None:
+            monitor.begin(step.key)
+        t0 = time.perf_counter()
+        try:
+            with tracing.span(step.title, cat="step"):
+                step.run(ctx)
+            res = StepResult(step.key, step.title, True, time.perf_counter() - t0)
+        except Exception as e:
+            res = StepResult(step.key, step.title, False, time.perf_counter() - t0, str(e))
+        finally:
+            tracing.bind(None)
+            cancellation.bind(None)
+            telemetry.bind(None)
+            resourceLimiter.bind(None)
+        if monitor is not None:
+            res.usage = monitor.end(step.key)
+        res.queue_wait = sum(s.duration for s in tracer.spans_for(step.key, "queue"))
+        command_spans = tracer.spans_for(step.key, "command")
+        failed = [s for s in command_spans if s.args.get("returncode") != 0]
+        if res.ok and failed:
+            # Generators log a failed command and may carry on; the step still did not complete
+            res.ok = False
+            res.error = f"{failed[0].name} exited {failed[0].args.get('returncode')}"
+            if len(failed) > 1:
+                res.error += f" (and {len(failed) - 1} more failed command(s))"
+        if cancel is not None and cancel.cancelled:
+            res.ok, res.error, res.cancelled = False, "cancelled", True
+            _remove_partial(project_dir, new_paths, ctx.log_line)
+        if manifest is not None:
+            commands = [
+                {
+                    "command": s.args.get("command"),
+                    "cwd": s.args.get("cwd"),
+                    "returncode": s.args.get("returncode"),
+                }
+                for s in command_spans
+            ]
+            manifest.finish(step.key, res.ok, step.outputs, commands, res.error)
+        return res
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(steps))) as pool:
+        pending = [step.key for step in steps]
+        while pending or running:
+            if cancel is not None and cancel.cancelled:
+                for key in pending:
+                    logger(f"[{key}] Cancelled before it started")
+                    results[key] = StepResult(
+                        key, by_key[key].title, False, skipped=True, cancelled=True
+                    )
+                pending = []
+            for key in list(pending):
+                if not deps[key] <= set(results):
+                    continue
+                pending.remove(key)
+                failed = [d for d in deps[key] if not results[d].ok]
+                if failed:
+                    step = by_key[key]
+                    blockers = ", ".join(sorted(failed))
+                    logger(f"[{key}] Skipped: depends on failed step(s) {blockers}")
+                    results[key] = StepResult(key, step.title, False, skipped=True)
+                    continue
+                step = by_key[key]
+                if (
+                    manifest is not None
+                    and not deps[key] & ran
+                    and manifest.is_current(key, step.inputs)
+                ):
+                    logger(f"[{key}] Up to date; skipped")
+                    results[key] = StepResult(key, step.title, True, skipped=True, up_to_date=True)
+                    continue
+                ran.add(key)
+                logger(f"[{key}] {step.title}...")
+                running[pool.submit(_run_one, step)] = step
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                step = running.pop(fut)
+                res = fut.result()
+                results[step.key] = res
+                if res.ok:
+                    logger(f"[{step.key}] Done in {res.duration:.2f}s")
+                elif res.cancelled:
+                    logger(f"[{step.key}] Cancelled after {res.duration:.2f}s")
+                else:
+                    logger(f"[{step.key}] {step.title} failed: {res.error}")
+
+    ordered = [results[step.key] for step in steps]
+    logger(format_summary(ordered, time.perf_counter() - started))
+    return ordered
+
+
+def format_summary(results: List[StepResult], wall: float) -> str:
+    busy = sum(r.duration for r in results)
+    lines = [
+        f"Finished {len(results)} step(s) in {wall:.2f}s wall-clock ({busy:.2f}s of step time)"
+    ]
+    for r in results:
+        if r.from_snapshot:
+            status = "snapshot"
+        elif r.up_to_date:
+            status = "current"
+        elif r.cancelled:
+            status = "cancelled"
+        else:
+            status = "skipped" if r.skipped else ("ok" if r.ok else "failed")
+        line = f"  {r.key:<10} {status:<9} {r.duration:7.2f}s"
+        u = r.usage
+        if u is not None and u.samples:
+            line += (
+                f"  peak CPU {u.peak_cpu_percent:4.0f}%  RSS {telemetry.format_bytes(u.peak_rss)}"
+                f"  disk r {telemetry.format_bytes(u.read_bytes)}"
+                f" / w {telemetry.format_bytes(u.write_bytes)}"
+            )
+        if r.queue_wait >= 0.01:
+            line += f"  queued {r.queue_wait:.2f}s"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _remove_partial(project_dir: str, paths: List[str], logger: Callable[[str], None]) -> None:
+    # Outermost first; anything nested under an already removed path is gone too
+    for rel in sorted(paths, key=len):
+        full = os.path.join(project_dir, rel)
+        if not os.path.lexists(full):
+            continue
+        try:
+            if os.path.isdir(full) and not os.path.islink(full):
+                shutil.rmtree(full)
+            else:
+                os.remove(full)
+            logger(f"Removed partial output {rel}")
+        except OSError as e:
+            logger(f"Could not remove partial output {rel}: {e}")
+
+
+def _check_cycle(key: str, deps: Dict[str, set], path: list) -> None:
+    if key in path:
+        raise ValueError(f"Step dependency cycle: {' -> '.join(path + [key])}")
+    for dep in deps[key]:
+        _check_cycle(dep, deps, path + [key])
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds between /proc samples
+SAMPLE_INTERVAL = float(os.environ.get("TERMINALIK_TELEMETRY_INTERVAL", "1.0"))
+PROC = "/proc"
+
+try:
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _CLK_TCK, _PAGE_SIZE = 100, 4096
+# CPU time is counted in clock ticks, so a rate over a shorter window is noise
+_MIN_RATE_WINDOW = 5 / _CLK_TCK
+
+
+@dataclass
+class StepUsage:
+    """Resource use of one step's child processes, current values and peaks."""
+
+    key: str
+    started: float
+    ended: Optional[float] = None
+    cpu_percent: float = 0.0
+    rss: int = 0
+    processes: int = 0
+    # Totals over the step's lifetime, kept after its processes exit
+    cpu_seconds: float = 0.0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    peak_cpu_percent: float = 0.0
+    peak_rss: int = 0
+    peak_processes: int = 0
+    samples: int = 0
+    # (pid, start time) -> last (cpu seconds, read bytes, write bytes) seen
+    _seen: Dict[Tuple[int, int], Tuple[float, int, int]] = field(default_factory=dict, repr=False)
+    # When cpu_percent was last computed, and the CPU total at that point
+    _rate_time: float = field(default_factory=time.perf_counter, repr=False)
+    _rate_cpu: float = field(default=0.0, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.ended or time.time()) - self.started
+
+    def to_dict(self) -> dict:
+        data = {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+        data["elapsed"] = round(self.elapsed, 3)
+        return data
+
+
+def available() -> bool:
+    return os.path.isfile(os.path.join(PROC, "self", "stat"))
+
+
+class ResourceMonitor:
+    """Samples the process trees of running setup steps from ``/proc``.
+
+    Every command a step starts runs in its own session (see ``stream_command``),
+    so a step's tree is every process whose session id is one of its commands'
+    pids, including grandchildren that npm or pip spawned. CPU and disk I/O are
+    summed from each process's last sample, so work done by processes that have
+    already exited still counts towards the step's totals.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.enabled = available()
+        self._usage: Dict[str, StepUsage] = {}
+        self._sessions: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        # Serializes whole samples, so an older /proc read never lands after a newer one
+        self._sample_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ResourceMonitor":
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name="terminalik-telemetry", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def begin(self, step: str) -> None:
+        with self._lock:
+            self._usage[step] = StepUsage(step, time.time())
+
+    def register(self, step: Optional[str], pid: int) -> None:
+        """Count ``pid``'s session towards ``step``."""
+        if step is None:
+            return
+        with self._lock:
+            self._sessions[pid] = step
+
+    def end(self, step: str) -> Optional[StepUsage]:
+        if self.enabled:
+            self.sample(step)
+        with self._lock:
+            self._sessions = {sid: s for sid, s in self._sessions.items() if s != step}
+            usage = self._usage.get(step)
+            if usage is not None:
+                usage.ended = time.time()
+                usage.cpu_percent, usage.rss, usage.processes = 0.0, 0, 0
+            return usage
+
+    def usage(self) -> List[StepUsage]:
+        with self._lock:
+            return list(self._usage.values())
+
+    def sample(self, step: Optional[str] = None, exited: Iterable[tuple] = ()) -> None:
+        """Read the process trees of every running step, or only of ``step``.
+
+        ``exited`` holds last readings of processes that may be reaped by now;
+        they count wherever ``/proc`` no longer has them.
+        """
+        with self._sample_lock:
+            with self._lock:
+                sessions = {
+                    sid: s for sid, s in self._sessions.items() if step is None or s == step
+                }
+            if not sessions:
+                return
+            procs = _read_processes(sessions)
+            seen = {(proc[0], proc[2]) for proc in procs}
+            procs += [p for p in exited if p[1] in sessions and (p[0], p[2]) not in seen]
+            live: Dict[str, List[tuple]] = {}
+            for proc in procs:
+                live.setdefault(sessions[proc[1]], []).append(proc)
+            now = time.perf_counter()
+            with self._lock:
+                for key in set(sessions.values()):
+                    usage = self._usage.get(key)
+                    if usage is not None:
+                        _update(usage, live.get(key, []), now)
+
+    def command_exited(self, step: Optional[str], pid: int) -> Optional[Callable[[], None]]:
+        """Read ``pid`` once more as its command closes its output, before we reap it.
+
+        A process's CPU and I/O totals vanish from ``/proc`` with the reap, so
+        without this a command shorter than the interval would count as idle.
+        Only ``pid`` itself is read here; the returned callable samples the rest
+        of ``step``'s tree and is slow enough to belong off the event loop.
+        """
+        if step is None or not self.enabled:
+            return None
+        last = _read_process(str(pid))
+        return partial(self.sample, step, [last] if last is not None else [])
+
+    def report(self) -> dict:
+        return {
+            "host": host_info(),
+            "interval": self.interval,
+            "steps": [u.to_dict() for u in self.usage()],
+        }
+
+    def write_report(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                pass
+
+
+def _update(usage: StepUsage, procs: List[tuple], now: float) -> None:
+    rss = 0
+    for pid, _sid, start, cpu, proc_rss, read, write in procs:
+        usage._seen[(pid, start)] = (cpu, read, write)
+        rss += proc_rss
+    usage.cpu_seconds = sum(v[0] for v in usage._seen.values())
+    usage.read_bytes = sum(v[1] for v in usage._seen.values())
+    usage.write_bytes = sum(v[2] for v in usage._seen.values())
+    # Each step keeps its own clock: it may have been sampled on its own since
+    wall = now - usage._rate_time
+    if wall >= _MIN_RATE_WINDOW:
+        usage.cpu_percent = max(0.0, (usage.cpu_seconds - usage._rate_cpu) / wall * 100)
+        usage._rate_time, usage._rate_cpu = now, usage.cpu_seconds
+    usage.rss, usage.processes = rss, len(procs)
+    usage.peak_cpu_percent = max(usage.peak_cpu_percent, usage.cpu_percent)
+    usage.peak_rss = max(usage.peak_rss, rss)
+    usage.peak_processes = max(usage.peak_processes, len(procs))
+    usage.samples += 1
+
+
+def _read_processes(sessions: Dict[int, str]) -> List[tuple]:
+    """``(pid, sid, start, cpu_seconds, rss, read_bytes, write_bytes)`` per session process."""
+    found = []
+    try:
+        pids = [name for name in os.listdir(PROC) if name.isdigit()]
+    except OSError:
+        return found
+    for pid in pids:
+        proc = _read_process(pid, sessions)
+        if proc is not None:
+            found.append(proc)
+    return found
+
+
+def _read_process(pid: str, sessions: Optional[Dict[int, str]] = None) -> Optional[tuple]:
+    """One ``_read_processes`` tuple, or None if ``pid`` is gone or outside ``sessions``."""
+    try:
+        with open(os.path.join(PROC, pid, "stat"), "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses; fields follow the last ")"
+    fields = raw[raw.rfind(b")") + 2:].split()
+    try:
+        sid = int(fields[3])
+        if sessions is not None and sid not in sessions:
+            return None
+        cpu = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+        start = int(fields[19])
+        rss = int(fields[21]) * _PAGE_SIZE
+    except (IndexError, ValueError):
+        return None
+    read, write = _read_io(pid)
+    return (int(pid), sid, start, cpu, rss, read, write)
+
+
+def _read_io(pid: str) -> Tuple[int, int]:
+    read = write = 0
+    try:
+        with open(os.path.join(PROC, pid, "io"), "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name == "read_bytes":
+                    read = int(value)
+                elif name == "write_bytes":
+                    write = int(value)
+    except (OSError, ValueError):
+        pass
+    return read, write
+
+
+def host_info() -> dict:
+    info = {"cpus": os.cpu_count(), "memory": None}
+    try:
+        with open(os.path.join(PROC, "meminfo"), "r") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    info["memory"] = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError):
+        pass
+    return info
+
+
+def process_rss(pid: str = "self") -> Optional[int]:
+    """Resident set size of a process in bytes, or None without ``/proc``."""
+    try:
+        with open(os.path.join(PROC, pid, "statm"), "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def format_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def format_panel(usages: List[StepUsage]) -> str:
+    """Text for the live telemetry panel: running steps first, then finished ones."""
+    if not usages:
+        return "Resources\n\nWaiting for the first step..."
+    lines = ["Resources"]
+    for u in sorted(usages, key=lambda u: (u.ended is not None, u.started)):
+        minutes, seconds = divmod(int(u.elapsed), 60)
+        state = "done" if u.ended is not None else f"{u.processes} proc"
+        lines += [
+            "",
+            f"{u.key}  {minutes:02d}:{seconds:02d}  {state}",
+            f"  CPU  {u.cpu_percent:5.0f}%  peak {u.peak_cpu_percent:.0f}%",
+            f"  RSS  {format_bytes(u.rss):>9}  peak {format_bytes(u.peak_rss)}",
+            f"  read {format_bytes(u.read_bytes):>9}",
+            f"  write {format_bytes(u.write_bytes):>8}",
+        ]
+    return "\n".join(lines)
+
+
+_local = threading.local()
+
+
+def bind(monitor: Optional[ResourceMonitor]) -> None:
+    """Make ``monitor`` the one commands started from this thread report to."""
+    _local.monitor = monitor
+
+
+def current_monitor() -> Optional[ResourceMonitor]:
+    return getattr(_local, "monitor", None)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+_local = threading.local()
+
+
+@dataclass
+class Span:
+    name: str
+    cat: str
+    start: float
+    end: float
+    step: Optional[str]
+    tid: int
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    """Collects timing spans for one setup run."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "op", **args: Any) -> Iterator[Dict[str, Any]]:
+        """Time the ``with`` body. The yielded dict can be filled with extra args."""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            record = Span(name, cat, start, end, current_step(), threading.get_ident(), args)
+            with self._lock:
+                self.spans.append(record)
+
+    def slowest(self, n: int = 10, exclude: tuple = ("step",)) -> List[Span]:
+        with self._lock:
+            spans = [s for s in self.spans if s.cat not in exclude]
+        return sorted(spans, key=lambda s: s.duration, reverse=True)[:n]
+
+    def spans_for(self, step: str, cat: str) -> List[Span]:
+        with self._lock:
+            return [s for s in self.spans if s.step == step and s.cat == cat]
+
+    def format_top(self, n: int = 10) -> str:
+        # Steps contain everything else, so rank the operations inside them
+        lines = [f"Slowest {n} operations:"]
+        for s in self.slowest(n):
+            lines.append(f"  {s.duration:8.2f}s  {s.cat:<8} [{s.step or '-'}] {s.name}")
+        return "\n".join(lines)
+
+    def export_chrome(self, path: str) -> str:
+        """Write the spans as Chrome/Perfetto trace JSON (complete "X" events)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                "name": s.name,
+                "cat": s.cat,
+                "ph": "X",
+                "ts": round((s.start - self._origin) * 1e6, 1),
+                "dur": round(s.duration * 1e6, 1),
+                "pid": pid,
+                "tid": s.tid,
+                "args": {"step": s.step, **{k: _jsonable(v) for k, v in s.args.items()}},
+            }
+            for s in spans
+        ]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+class _NullTracer(Tracer):
+    @contextmanager
+    def span(self, name: str, cat: str = "op", **args: Any) -> Iterator[Dict[str, Any]]:
+        yield args
+
+
+_null = _NullTracer()
+
+
+def bind(tracer: Optional[Tracer], step: Optional[str] = None) -> None:
+    """Attach ``tracer`` and the current step name to the calling thread."""
+    _local.tracer = tracer
+    _local.step = step
+
+
+def current_tracer() -> Tracer:
+    return getattr(_local, "tracer", None) or _null
+
+
+def current_step() -> Optional[str]:
+    return getattr(_local, "step", None)
+
+
+def span(name: str, cat: str = "op", **args: Any):
+    """Record a span on the tracer bound to this thread (no-op when none is)."""
+    return current_tracer().span(name, cat, **args)
+
+
+def write_text(path: str, content: str, mode: str = "w", encoding: str = "utf-8") -> None:
+    """Write a generated file, recorded as a "file" span."""
+    label = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+    with span(f"write {label}", cat="file", path=path, bytes=len(content)):
+        with open(path, mode, encoding=encoding) as f:
+            f.write(content)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
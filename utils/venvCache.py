@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+from utils import cacheManager
+from utils.cachePaths import cache_dir
+
+# Cache size limit in MB; least recently used templates are evicted past it
+MAX_CACHE_MB = int(os.environ.get("TERMINALIK_VENV_CACHE_MB", "2048"))
+MARKER = ".terminalik-venv.json"
+# (real path, mtime) of an interpreter -> what _interpreter_ident reported for it
+_IDENT_CACHE = {}
+_IDENT_SCRIPT = (
+    "import json, platform, sys; "
+    "print(json.dumps([sys.version, platform.python_implementation(), platform.machine()]))"
+)
+
+
+def cache_key(dependencies, python=None, installer="pip"):
+    """Key a venv template by interpreter build, installer and the exact dependency set.
+
+    The build is that of ``python``, which need not be the interpreter running us.
+    """
+    python = python or sys.executable
+    version, impl, machine = _interpreter_ident(python)
+    ident = {
+        # uv and pip lay out the venv differently, so their templates are not shared
+        "installer": installer,
+        "python": os.path.realpath(python),
+        "version": version,
+        "impl": impl,
+        "machine": machine,
+        "dependencies": sorted(d.strip().lower() for d in dependencies),
+    }
+    return hashlib.sha256(json.dumps(ident, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def _interpreter_ident(python):
+    """``(sys.version, implementation, machine)`` of ``python``, asked once per build.
+
+    An interpreter that cannot be asked falls back to the version in its venv's
+    ``pyvenv.cfg``, if any, so a rebuilt venv still gets a new key.
+    """
+    real = os.path.realpath(python)
+    if real == os.path.realpath(sys.executable):
+        return sys.version, platform.python_implementation(), platform.machine()
+    try:
+        stamp = (real, os.path.getmtime(real))
+    except OSError:
+        stamp = (real, None)
+    ident = _IDENT_CACHE.get(stamp)
+    if ident is None:
+        ident = _probe_interpreter(python) or (_pyvenv_version(python), "", "")
+        _IDENT_CACHE[stamp] = ident
+    return ident
+
+
+def _probe_interpreter(python):
+    try:
+        out = subprocess.run(
+            [python, "-c", _IDENT_SCRIPT],
+            stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=30,
+        )
+        version, impl, machine = json.loads(out.stdout.strip().splitlines()[-1])
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError, TypeError):
+        return None
+    return str(version), str(impl), str(machine)
+
+
+def _pyvenv_version(python):
+    # <venv>/bin/python -> <venv>/pyvenv.cfg
+    cfg = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(python))), "pyvenv.cfg")
+    try:
+        with open(cfg, "r", encoding="utf-8") as f:
+            for line in f:
+                name, _, value = line.partition("=")
+                if name.strip() in ("version", "version_info"):
+                    return value.strip()
+    except OSError:
+        pass
+    return ""
+
+
+def lookup(key):
+    """Return the cached template path for ``key`` or None. Marks it as recently used."""
+    entry = os.path.join(cache_dir("venvs"), key)
+    marker = os.path.join(entry, MARKER)
+    if not os.path.isfile(marker):
+        cacheManager.record_miss("venvs")
+        return None
+    cacheManager.touch(marker)
+    cacheManager.record_hit("venvs", _marker_size(marker))
+    return entry
+
+
+def store(key, venv_dir, max_mb=None):
+    """Copy a freshly built venv into the cache, then evict down to the size limit."""
+    root = cache_dir("venvs")
+    final = os.path.join(root, key)
+    if os.path.isfile(os.path.join(final, MARKER)):
+        return final
+    tmp = os.path.join(root, f".{key}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(venv_dir, tmp, symlinks=True, copy_function=_link_or_copy)
+    meta = {
+        "prefix": os.path.abspath(venv_dir),
+        "size": _tree_size(tmp),
+        "created": time.time(),
+    }
+    with open(os.path.join(tmp, MARKER), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp, final)
+    except OSError:
+        # Another run stored the same template first
+        shutil.rmtree(tmp, ignore_errors=True)
+    else:
+        cacheManager.record_store("venvs", meta["size"])
+    evict(max_mb if max_mb is not None else MAX_CACHE_MB)
+    cacheManager.enforce_budget()
+    return final
+
+
+def clone(entry, venv_dir):
+    """Materialize a cached template at ``venv_dir`` and fix up absolute paths.
+
+    Files are hardlinked where the filesystem allows it and copied otherwise.
+    Scripts and ``pyvenv.cfg`` that embed the template's original location are
+    rewritten as fresh files so the cached copy is never modified.
+    """
+    with open(os.path.join(entry, MARKER), "r", encoding="utf-8") as f:
+        old_prefix = json.load(f)["prefix"]
+    new_prefix = os.path.abspath(venv_dir)
+    shutil.copytree(
+        entry,
+        venv_dir,
+        symlinks=True,
+        copy_function=_link_or_copy,
+        ignore=shutil.ignore_patterns(MARKER),
+    )
+    bin_dir = os.path.join(venv_dir, "Scripts" if os.name == "nt" else "bin")
+    candidates = [os.path.join(venv_dir, "pyvenv.cfg")]
+    if os.path.isdir(bin_dir):
+        candidates += [os.path.join(bin_dir, name) for name in os.listdir(bin_dir)]
+    for path in candidates:
+        if os.path.islink(path) or not os.path.isfile(path):
+            continue
+        _relocate_file(path, old_prefix, new_prefix)
+
+
+def evict(max_mb):
+    """Drop least recently used templates until the cache fits in ``max_mb``."""
+    root = cache_dir("venvs")
+    entries = []
+    for name in os.listdir(root):
+        marker = os.path.join(root, name, MARKER)
+        if not os.path.isfile(marker):
+            continue
+        try:
+            with open(marker, "r", encoding="utf-8") as f:
+                size = int(json.load(f).get("size", 0))
+            entries.append((os.path.getmtime(marker), size, os.path.join(root, name)))
+        except (OSError, ValueError):
+            continue
+    total = sum(size for _, size, _ in entries)
+    limit = max_mb * 1024 * 1024
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def _marker_size(marker):
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            return int(json.load(f).get("size", 0))
+    except (OSError, ValueError):
+        return 0
+
+
+def _relocate_file(path, old_prefix, new_prefix):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return
+    old, new = old_prefix.encode(), new_prefix.encode()
+    if old not in data:
+        return
+    mode = os.stat(path).st_mode
+    # Break the hardlink before writing so the template stays untouched
+    os.unlink(path)
+    with open(path, "wb") as f:
+        f.write(data.replace(old, new))
+    os.chmod(path, mode)
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _tree_size(path):
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total